@@ -0,0 +1,138 @@
+#!/usr/bin/env -S python3 -S
+"""
+codeforge-hook — thin client for the CodeForge hook daemon.
+
+Usage: codeforge-hook <script.py> [args...]
+
+Drop-in replacement for `python3 <script.py> [args...]` in hook commands.
+Forwards the invocation to codeforge-hookd over its Unix socket and replays
+the script's stdout, stderr and exit code. When the daemon is not running,
+or reports it cannot serve the script, the script is run with python3
+directly — hook behaviour never depends on the daemon being up. Once the
+request has been sent the daemon may already be running the script, so a
+lost or late reply is reported as a hook error (exit NO_REPLY) instead of
+running the script a second time.
+
+Runs with -S (no site import) and imports only os, sys and socket so the
+client's own startup stays as small as the interpreter allows.
+"""
+
+import os
+import socket
+import sys
+
+NOT_HANDLED = -1
+
+# Exit code when the daemon took the request but no usable reply came back;
+# like any non-2 code, Claude Code shows it as a non-blocking hook error.
+NO_REPLY = 1
+
+# Bounds a hung daemon; the hook's own timeout still applies on top of this.
+RESPONSE_TIMEOUT = 4.0
+
+
+def socket_path() -> str:
+    """Return the daemon socket path (shared with hookd.py)."""
+    override = os.environ.get("CODEFORGE_HOOKD_SOCKET")
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"codeforge-hookd-{os.getuid()}.sock")
+
+
+def run_direct(script: str, args: list[str], stdin: bytes | None = None) -> None:
+    """Run the script with python3, bypassing the daemon. Never returns."""
+    python = sys.executable or "python3"
+    if stdin is None:
+        # stdin untouched — hand the whole process over to the script
+        os.execvp(python, [python, script, *args])
+
+    import subprocess
+
+    result = subprocess.run([python, script, *args], input=stdin, capture_output=True)
+    sys.stdout.buffer.write(result.stdout)
+    sys.stderr.buffer.write(result.stderr)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(result.returncode)
+
+
+def _no_reply(reason: str) -> tuple[int, bytes, bytes]:
+    return (NO_REPLY, b"", f"codeforge-hook: {reason}\n".encode())
+
+
+def request(
+    path: str, script: str, args: list[str], stdin: bytes
+) -> tuple[int, bytes, bytes] | None:
+    """Send one invocation to the daemon.
+
+    Returns None if the daemon could not be reached. After connecting, a
+    failed or malformed reply comes back as a NO_REPLY result.
+    """
+    header = "\0".join([os.getcwd(), script, *args]).encode("utf-8", "surrogateescape")
+    frame = b"%d %d\n" % (len(header), len(stdin)) + header + stdin
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(RESPONSE_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError:
+            return None
+        try:
+            sock.sendall(frame)
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except TimeoutError:
+            return _no_reply(f"no reply from hook daemon within {RESPONSE_TIMEOUT}s")
+        except OSError as e:
+            return _no_reply(f"hook daemon connection failed: {e}")
+    finally:
+        sock.close()
+
+    data = b"".join(chunks)
+    line, sep, rest = data.partition(b"\n")
+    try:
+        code, out_len, err_len = (int(n) for n in line.split())
+    except ValueError:
+        sep = b""
+    if not sep or len(rest) != out_len + err_len:
+        return _no_reply("malformed reply from hook daemon")
+    return (code, rest[:out_len], rest[out_len:])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: codeforge-hook <script.py> [args...]", file=sys.stderr)
+        sys.exit(2)
+
+    script = os.path.abspath(sys.argv[1])
+    args = sys.argv[2:]
+    path = socket_path()
+
+    # No daemon socket — skip reading stdin so the script can inherit it
+    if not os.path.exists(path):
+        run_direct(script, args)
+
+    stdin = sys.stdin.buffer.read()
+    response = request(path, script, args, stdin)
+    if response is None or response[0] == NOT_HANDLED:
+        run_direct(script, args, stdin)
+
+    code, out, err = response
+    if out:
+        sys.stdout.buffer.write(out)
+        sys.stdout.flush()
+    if err:
+        sys.stderr.buffer.write(err)
+        sys.stderr.flush()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
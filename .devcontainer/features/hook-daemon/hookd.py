@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+CodeForge hook daemon — keeps plugin hook scripts warm between tool calls.
+
+Listens on a Unix socket and runs hook scripts in-process, so a guard's
+imports and compiled pattern tables are paid for once per container instead
+of once per tool call. The codeforge-hook client forwards one invocation
+(cwd, script path, argv, stdin) and replays the script's exit code, stdout
+and stderr exactly as if `python3 <script>` had run.
+
+Scripts are loaded by absolute path and reloaded when their mtime changes.
+Helper modules they import from their own directory are tracked per
+directory: only the requesting script's helpers are left in sys.modules, so
+a helper vendored into several plugins resolves to the requesting plugin's
+copy, and a change to any helper reloads that directory's helpers and
+scripts.
+
+Requests are served one at a time: hook scripts read sys.argv, sys.stdin and
+os.getcwd(), so each request swaps that process-wide state around main().
+A slow script would hold up every guard queued behind it, so only hooks
+that finish in milliseconds are registered through the daemon.
+
+Wire format (both directions are a single frame per connection):
+  request:  b"<header_len> <body_len>\\n" + header + body
+            header = NUL-joined [cwd, script, *args]; body = raw hook stdin
+  response: b"<exit_code> <stdout_len> <stderr_len>\\n" + stdout + stderr
+            exit_code NOT_HANDLED tells the client to run the script itself.
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+# Exit code reserved for "daemon could not run this script" — the client then
+# falls back to executing the script with python3 directly.
+NOT_HANDLED = -1
+
+# Per-connection socket timeout. Guard scripts finish in well under a
+# millisecond once warm; this only bounds a stalled client.
+CONNECTION_TIMEOUT = 5.0
+
+# Upper bound on a single request frame (hook payloads are a few KB).
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# script path -> (mtime_ns, module)
+_modules: dict[str, tuple[int, object]] = {}
+
+# script dir -> {module name: (mtime_ns, module)} for helper modules imported
+# from that dir; only the active dir's helpers are in sys.modules
+_helpers: dict[str, dict[str, tuple[int | None, object]]] = {}
+_active_dir: str | None = None
+
+
+def socket_path() -> str:
+    """Return the daemon socket path (shared with the client)."""
+    override = os.environ.get("CODEFORGE_HOOKD_SOCKET")
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"codeforge-hookd-{os.getuid()}.sock")
+
+
+# ---------------------------------------------------------------------------
+# Script loading and execution
+# ---------------------------------------------------------------------------
+
+
+def _module_mtime(module) -> int | None:
+    try:
+        return os.stat(module.__file__).st_mtime_ns
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+def activate_dir(script_dir: str) -> None:
+    """Make `import` resolve helper modules the way a direct run would.
+
+    python3 puts the script's directory first on sys.path, so its helpers
+    shadow same-named copies vendored into other plugins. The previously
+    active dir's helpers are taken out of sys.modules and this dir's are put
+    back; if any of them changed on disk they are all dropped, along with the
+    dir's cached scripts that hold references to them.
+    """
+    global _active_dir
+    if _active_dir is not None:
+        for name in _helpers.get(_active_dir, ()):
+            sys.modules.pop(name, None)
+
+    helpers = _helpers.setdefault(script_dir, {})
+    if any(_module_mtime(m) != mtime for mtime, m in helpers.values()):
+        helpers.clear()
+        for path in [p for p in _modules if os.path.dirname(p) == script_dir]:
+            del _modules[path]
+
+    if sys.path[:1] != [script_dir]:
+        if script_dir in sys.path:
+            sys.path.remove(script_dir)
+        sys.path.insert(0, script_dir)
+    for name, (_mtime, module) in helpers.items():
+        sys.modules[name] = module
+    _active_dir = script_dir
+
+
+def record_helpers(script_dir: str) -> None:
+    """Track modules imported from script_dir since it was activated."""
+    helpers = _helpers.setdefault(script_dir, {})
+    prefix = script_dir + os.sep
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if name not in helpers and file and file.startswith(prefix):
+            helpers[name] = (_module_mtime(module), module)
+
+
+def load_script(path: str):
+    """Import a hook script by path, reusing the cached module if unchanged."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _modules.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    name = "hookd_" + hashlib.sha1(path.encode()).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    _modules[path] = (mtime, module)
+    return module
+
+
+def _exit_code(code, stderr: io.StringIO) -> int:
+    """Translate a SystemExit code the way the interpreter would."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+
+def run_script(
+    path: str, args: list[str], cwd: str, stdin: bytes
+) -> tuple[int, str, str]:
+    """Run a hook script's main() in-process.
+
+    Returns:
+        (exit_code, stdout, stderr). exit_code is NOT_HANDLED when the
+        script cannot be served here and should be run directly instead.
+    """
+    if not (os.path.isabs(path) and path.endswith(".py") and os.path.isfile(path)):
+        return (NOT_HANDLED, "", "")
+
+    script_dir = os.path.dirname(path)
+    activate_dir(script_dir)
+    loaded = len(sys.modules)
+    try:
+        return _run_main(path, args, cwd, stdin)
+    finally:
+        # Only scan sys.modules when the request imported something
+        if len(sys.modules) != loaded:
+            record_helpers(script_dir)
+
+
+def _run_main(
+    path: str, args: list[str], cwd: str, stdin: bytes
+) -> tuple[int, str, str]:
+    try:
+        module = load_script(path)
+    except Exception:
+        _modules.pop(path, None)
+        return (NOT_HANDLED, "", "")
+
+    main = getattr(module, "main", None)
+    if not callable(main):
+        return (NOT_HANDLED, "", "")
+
+    saved_cwd = os.getcwd()
+    try:
+        os.chdir(cwd)
+    except OSError:
+        return (NOT_HANDLED, "", "")
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    saved_argv, saved_stdin = sys.argv, sys.stdin
+    sys.argv = [path, *args]
+    sys.stdin = io.TextIOWrapper(io.BytesIO(stdin), encoding="utf-8")
+    code = 0
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                main()
+            except SystemExit as e:
+                code = _exit_code(e.code, stderr)
+            except Exception:
+                # Same outcome as an uncaught exception in a standalone run
+                traceback.print_exc(file=stderr)
+                code = 1
+    finally:
+        sys.argv, sys.stdin = saved_argv, saved_stdin
+        os.chdir(saved_cwd)
+
+    return (code, stdout.getvalue(), stderr.getvalue())
+
+
+# ---------------------------------------------------------------------------
+# Framing
+# ---------------------------------------------------------------------------
+
+
+def _recv_exact(conn: socket.socket, size: int, buf: bytearray) -> bytes:
+    """Read exactly *size* bytes, starting with any already-buffered data."""
+    while len(buf) < size:
+        chunk = conn.recv(max(65536, size - len(buf)))
+        if not chunk:
+            raise ConnectionError("client closed connection mid-frame")
+        buf.extend(chunk)
+    data = bytes(buf[:size])
+    del buf[:size]
+    return data
+
+
+def read_request(conn: socket.socket) -> tuple[str, str, list[str], bytes]:
+    """Read one request frame. Returns (cwd, script, args, stdin)."""
+    buf = bytearray()
+    while b"\n" not in buf:
+        chunk = conn.recv(4096)
+        if not chunk:
+            raise ConnectionError("client closed connection before header")
+        buf.extend(chunk)
+        if len(buf) > 64:
+            break
+    line, _, rest = bytes(buf).partition(b"\n")
+    header_len, body_len = (int(n) for n in line.split())
+    if header_len + body_len > MAX_FRAME_BYTES:
+        raise ValueError("request frame too large")
+    buf = bytearray(rest)
+    header = _recv_exact(conn, header_len, buf)
+    body = _recv_exact(conn, body_len, buf)
+
+    fields = header.decode("utf-8", "surrogateescape").split("\0")
+    if len(fields) < 2:
+        raise ValueError("malformed request header")
+    return (fields[0], fields[1], fields[2:], body)
+
+
+def encode_response(code: int, stdout: str, stderr: str) -> bytes:
+    out = stdout.encode("utf-8", "surrogateescape")
+    err = stderr.encode("utf-8", "surrogateescape")
+    return b"%d %d %d\n" % (code, len(out), len(err)) + out + err
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+def _peer_uid(conn: socket.socket) -> int | None:
+    """Return the connecting process's uid (Linux SO_PEERCRED), if known."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12)
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid
+
+
+def handle_connection(conn: socket.socket) -> None:
+    """Serve a single request on an accepted connection."""
+    conn.settimeout(CONNECTION_TIMEOUT)
+    peer = _peer_uid(conn)
+    if peer is not None and peer != os.getuid():
+        conn.sendall(encode_response(NOT_HANDLED, "", ""))
+        return
+    try:
+        cwd, script, args, stdin = read_request(conn)
+    except (OSError, ValueError, ConnectionError):
+        return
+    code, out, err = run_script(script, args, cwd, stdin)
+    conn.sendall(encode_response(code, out, err))
+
+
+def bind_socket(path: str) -> socket.socket | None:
+    """Bind the listening socket. Returns None if a daemon is already live."""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return None  # another daemon owns the socket
+        except OSError:
+            os.unlink(path)  # stale socket from a previous container run
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    return server
+
+
+def serve(server: socket.socket, path: str) -> None:
+    """Accept and serve connections until interrupted."""
+    os.chdir("/")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    handle_connection(conn)
+                except OSError:
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def main():
+    path = socket_path()
+    server = bind_socket(path)
+    if server is None:
+        print(f"[hookd] already running on {path}", file=sys.stderr)
+        return
+
+    def _shutdown(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    serve(server, path)
+
+
+if __name__ == "__main__":
+    main()
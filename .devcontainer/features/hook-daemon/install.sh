@@ -0,0 +1,45 @@
+#!/bin/bash
+# SPDX-License-Identifier: GPL-3.0-only
+# Copyright (c) 2026 Marcus Krueger
+set -euo pipefail
+
+VERSION="${VERSION:-latest}"
+
+# Skip installation if version is "none"
+if [ "${VERSION}" = "none" ]; then
+    echo "[hook-daemon] Skipping installation (version=none)"
+    exit 0
+fi
+
+echo "[hook-daemon] Starting installation..."
+
+if ! command -v python3 &>/dev/null; then
+    echo "[hook-daemon] ERROR: python3 is not available"
+    exit 1
+fi
+
+FEATURE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+install -m 755 "${FEATURE_DIR}/hookd.py" /usr/local/bin/codeforge-hookd
+install -m 755 "${FEATURE_DIR}/hook-client.py" /usr/local/bin/codeforge-hook
+
+# Plugin hooks run "${CODEFORGE_HOOK_RUNNER:-python3} <script>", so they only
+# route through the daemon client when this feature is installed.
+cat > /etc/profile.d/hook-daemon.sh << 'PROFILE_EOF'
+export CODEFORGE_HOOK_RUNNER="/usr/local/bin/codeforge-hook"
+PROFILE_EOF
+
+# Start the daemon on every container start (runs as the container user)
+mkdir -p /usr/local/devcontainer-poststart.d
+cat > /usr/local/devcontainer-poststart.d/30-hook-daemon.sh << 'HOOK_EOF'
+#!/bin/bash
+# Start codeforge-hookd detached; it exits immediately if already running.
+setsid nohup /usr/local/bin/codeforge-hookd > /dev/null 2>&1 < /dev/null &
+echo "[hook-daemon] codeforge-hookd started"
+HOOK_EOF
+chmod +x /usr/local/devcontainer-poststart.d/30-hook-daemon.sh
+
+echo "[hook-daemon] Installation complete"
+echo "  - Daemon: /usr/local/bin/codeforge-hookd"
+echo "  - Client: /usr/local/bin/codeforge-hook"
+echo "  - Started by: /usr/local/devcontainer-poststart.d/30-hook-daemon.sh"
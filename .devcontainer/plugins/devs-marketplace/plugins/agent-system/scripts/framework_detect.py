@@ -0,0 +1,201 @@
+"""
+Shared, cached test-framework detection.
+
+Vendored identically into auto-code-quality and agent-system, whose test
+hooks (advisory-test-runner.py, verify-no-regression.py, verify-tests-pass.py,
+task-completed-check.py) all need to know how to run a project's tests.
+
+detect_test_framework(cwd) returns (framework, full-suite command). The
+answer is cached per directory in /tmp/claude-test-framework-{uid}.json and
+reused while the fingerprint still matches:
+
+  - mtime of cwd itself, which changes whenever a file is added, removed or
+    renamed there (pytest.ini, conftest.py, test_*.py, vitest/jest configs,
+    go.mod, Cargo.toml, ...)
+  - mtime and size of every manifest whose content is inspected
+    (CONTENT_MANIFESTS)
+
+A cache hit costs a handful of stat() calls: no directory listing and no
+parsing of package.json or pyproject.toml.
+"""
+
+import json
+import os
+
+CACHE_PATH = f"/tmp/claude-test-framework-{os.getuid()}.json"
+
+# Files whose contents (not just presence) decide the framework
+CONTENT_MANIFESTS = (
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+    "vite.config.ts",
+    "vite.config.js",
+    "package.json",
+)
+
+# Oldest entries are dropped beyond this many directories
+MAX_ENTRIES = 200
+
+
+# ── Detection ───────────────────────────────────────────────────────
+
+
+def scan_test_framework(cwd: str) -> tuple[str, list[str]]:
+    """Detect which test framework is available in the project (uncached).
+
+    Checks for: pytest, vitest, jest, mocha, go test, cargo test.
+    Falls back to npm test if a test script is defined.
+
+    Returns:
+        Tuple of (framework_name, command_list) or ("", []) if none found.
+    """
+    try:
+        entries = set(os.listdir(cwd))
+    except OSError:
+        return ("", [])
+
+    # --- Python: pytest ---
+    if "pytest.ini" in entries or "conftest.py" in entries:
+        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
+
+    for cfg_name in ("pyproject.toml", "setup.cfg", "tox.ini"):
+        cfg_path = os.path.join(cwd, cfg_name)
+        if os.path.isfile(cfg_path):
+            try:
+                with open(cfg_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                if (
+                    "[tool.pytest" in content
+                    or "[pytest]" in content
+                    or "[tool:pytest]" in content
+                ):
+                    return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
+            except OSError:
+                pass
+
+    if "tests" in entries and os.path.isdir(os.path.join(cwd, "tests")):
+        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
+
+    for entry in entries:
+        if entry.startswith("test_") and entry.endswith(".py"):
+            return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
+
+    # --- JavaScript: vitest ---
+    for name in entries:
+        if name.startswith("vitest.config"):
+            return ("vitest", ["npx", "vitest", "run", "--reporter=verbose"])
+
+    for vite_cfg in ("vite.config.ts", "vite.config.js"):
+        cfg_path = os.path.join(cwd, vite_cfg)
+        if os.path.isfile(cfg_path):
+            try:
+                with open(cfg_path, "r", encoding="utf-8") as f:
+                    if "test" in f.read():
+                        return (
+                            "vitest",
+                            ["npx", "vitest", "run", "--reporter=verbose"],
+                        )
+            except OSError:
+                pass
+
+    # --- JavaScript: jest ---
+    for name in entries:
+        if name.startswith("jest.config"):
+            return ("jest", ["npx", "jest", "--verbose"])
+
+    pkg_json = os.path.join(cwd, "package.json")
+    if os.path.isfile(pkg_json):
+        try:
+            with open(pkg_json, "r", encoding="utf-8") as f:
+                pkg = json.loads(f.read())
+
+            if "jest" in pkg:
+                return ("jest", ["npx", "jest", "--verbose"])
+
+            dev_deps = pkg.get("devDependencies", {})
+            deps = pkg.get("dependencies", {})
+
+            if "mocha" in dev_deps or "mocha" in deps:
+                return ("mocha", ["npx", "mocha", "--reporter", "spec"])
+
+            test_script = pkg.get("scripts", {}).get("test", "")
+            if test_script and "no test specified" not in test_script:
+                return ("npm-test", ["npm", "test"])
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    # --- Go ---
+    if "go.mod" in entries:
+        return ("go", ["go", "test", "./...", "-count=1"])
+
+    # --- Rust ---
+    if "Cargo.toml" in entries:
+        return ("cargo", ["cargo", "test"])
+
+    return ("", [])
+
+
+# ── Cache ───────────────────────────────────────────────────────────
+
+
+def _fingerprint(cwd: str) -> list | None:
+    try:
+        fingerprint: list = [os.stat(cwd).st_mtime_ns]
+    except OSError:
+        return None
+    for name in CONTENT_MANIFESTS:
+        try:
+            st = os.stat(os.path.join(cwd, name))
+            fingerprint.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+
+def _load() -> dict:
+    try:
+        with open(CACHE_PATH) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(entries: dict) -> None:
+    if len(entries) > MAX_ENTRIES:
+        entries = dict(list(entries.items())[-MAX_ENTRIES:])
+    tmp = f"{CACHE_PATH}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def detect_test_framework(cwd: str) -> tuple[str, list[str]]:
+    """Detect the project's test framework, reusing a cached answer.
+
+    Returns:
+        Tuple of (framework_name, command_list) or ("", []) if none found.
+        command_list runs the whole suite.
+    """
+    key = os.path.realpath(cwd)
+    fingerprint = _fingerprint(key)
+    if fingerprint is None:
+        return ("", [])
+
+    entries = _load()
+    entry = entries.get(key)
+    if isinstance(entry, dict) and entry.get("fp") == fingerprint:
+        return (entry.get("framework", ""), list(entry.get("cmd", [])))
+
+    framework, cmd = scan_test_framework(cwd)
+    entries.pop(key, None)
+    entries[key] = {"fp": fingerprint, "framework": framework, "cmd": cmd}
+    _save(entries)
+    return (framework, cmd)
@@ -18,9 +18,13 @@ Exit 2: Command would modify state (blocked)
 """
 
 import json
-import re
 import sys
 
+import bash_policy
+
+POLICY_GENERAL = "agent-system:general-readonly"
+POLICY_GIT = "agent-system:git-readonly"
+
 # ---------------------------------------------------------------------------
 # General-readonly blocklist
 # ---------------------------------------------------------------------------
@@ -320,22 +324,9 @@ READONLY_UTILITIES = frozenset(
 # ---------------------------------------------------------------------------
 
 
-def _split_segments(command: str) -> list[str]:
-    """Split command on ;  &&  ||  & (background) into segments.
-
-    Handles line continuations (backslash-newline).  Does not attempt
-    to parse quoted strings — intentionally over-splits for safety.
-    """
-    command = command.replace("\\\n", " ")
-    # Split on ;  &&  ||  and lone & (not &&)
-    segments = re.split(r"\s*(?:;|&&|\|\||(?<![&])&(?![&]))\s*", command)
-    return [s.strip() for s in segments if s.strip()]
-
-
-def _split_pipes(segment: str) -> list[str]:
-    """Split a segment on | (single pipe, not ||)."""
-    parts = re.split(r"(?<!\|)\|(?!\|)", segment)
-    return [p.strip() for p in parts if p.strip()]
+# Segment/pipe splitting is shared with the other Bash guards via bash_policy
+_split_segments = bash_policy.split_segments
+_split_pipes = bash_policy.split_pipes
 
 
 def _get_cmd_words(stage: str) -> list[str]:
@@ -378,31 +369,8 @@ def _resolve_prefix(words: list[str]) -> tuple[str, list[str]]:
     return (base, words)
 
 
-def _has_redirect(command: str) -> bool:
-    """Detect output redirections (> or >>) excluding >/dev/null.
-
-    Returns True if the command writes to a file via shell redirection.
-    May produce false positives for '>' inside quoted strings — this is
-    intentional (safe-side).
-    """
-    # Strip harmless /dev/null redirections first
-    cleaned = re.sub(r"[12]?>{1,2}\s*/dev/null", "", command)
-    return bool(re.search(r"(?:^|[\s)])(?:[12])?>{1,2}\s*[^\s&|;]", cleaned))
-
-
-def _has_command_substitution(command: str) -> bool:
-    """Check if command contains $() or backtick command substitution."""
-    return "$(" in command or "`" in command
-
-
-def _extract_substitution_commands(command: str) -> list[str]:
-    """Extract inner commands from $() and backtick substitutions."""
-    inner: list[str] = []
-    for m in re.finditer(r"\$\(([^)]+)\)", command):
-        inner.append(m.group(1))
-    for m in re.finditer(r"`([^`]+)`", command):
-        inner.append(m.group(1))
-    return inner
+_has_redirect = bash_policy.has_redirect
+_extract_substitution_commands = bash_policy.extract_substitution_commands
 
 
 def _has_sed_inplace(words: list[str]) -> bool:
@@ -435,20 +403,21 @@ def check_general_readonly(command: str) -> str | None:
     Returns:
         Error message if blocked, None if allowed.
     """
+    parsed = bash_policy.parse(command)
+
     # Global checks on the raw command string
-    if _has_redirect(command):
+    if parsed.has_redirect:
         return "Blocked: output redirection (> or >>) is not allowed in read-only mode"
 
     # Recursively check command substitutions
-    if _has_command_substitution(command):
-        for inner in _extract_substitution_commands(command):
-            result = check_general_readonly(inner)
-            if result:
-                return "Blocked: command substitution contains a write operation"
+    for inner in parsed.substitutions:
+        result = check_general_readonly(inner)
+        if result:
+            return "Blocked: command substitution contains a write operation"
 
     # Check each segment and pipe stage
-    for segment in _split_segments(command):
-        for i, stage in enumerate(_split_pipes(segment)):
+    for stages in parsed.stages:
+        for i, stage in enumerate(stages):
             words = _get_cmd_words(stage)
             if not words:
                 continue
@@ -486,17 +455,18 @@ def check_git_readonly(command: str) -> str | None:
     Returns:
         Error message if blocked, None if allowed.
     """
-    if _has_redirect(command):
+    parsed = bash_policy.parse(command)
+
+    if parsed.has_redirect:
         return "Blocked: output redirection is not allowed in read-only mode"
 
-    if _has_command_substitution(command):
-        for inner in _extract_substitution_commands(command):
-            result = check_git_readonly(inner)
-            if result:
-                return "Blocked: command substitution contains a blocked operation"
+    for inner in parsed.substitutions:
+        result = check_git_readonly(inner)
+        if result:
+            return "Blocked: command substitution contains a blocked operation"
 
-    for segment in _split_segments(command):
-        for i, stage in enumerate(_split_pipes(segment)):
+    for stages in parsed.stages:
+        for i, stage in enumerate(stages):
             words = _get_cmd_words(stage)
             if not words:
                 continue
@@ -576,6 +546,12 @@ def check_git_readonly(command: str) -> str | None:
     return None
 
 
+bash_policy.register(
+    POLICY_GENERAL, lambda parsed, cwd: check_general_readonly(parsed.raw)
+)
+bash_policy.register(POLICY_GIT, lambda parsed, cwd: check_git_readonly(parsed.raw))
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -599,10 +575,8 @@ def main():
     if not command or not command.strip():
         sys.exit(0)
 
-    if mode == "git-readonly":
-        error = check_git_readonly(command)
-    else:
-        error = check_general_readonly(command)
+    policy = POLICY_GIT if mode == "git-readonly" else POLICY_GENERAL
+    error = bash_policy.check(policy, command)
 
     if error:
         print(error, file=sys.stderr)
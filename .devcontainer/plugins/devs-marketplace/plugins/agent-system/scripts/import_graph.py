@@ -0,0 +1,302 @@
+"""
+Import-graph index for pytest test selection and result caching.
+
+Vendored identically into auto-code-quality (advisory-test-runner.py's test
+selection) and agent-system, where pytest_results.py uses it to key cached
+test passes on the modules each test file imports.
+
+A static AST scan records what every Python file in the project imports.
+Only the import statements are parsed: lines starting with `import` or
+`from` (plus their parenthesised or backslash continuations) are cut out and
+handed to ast.parse one statement at a time, which is ~15x cheaper than
+parsing whole modules.
+
+The raw import statements are cached on disk per project
+(/tmp/claude-cq-imports-{uid}-{project-hash}.json) and re-parsed only for
+files whose mtime or size changed, so after the first Stop an update costs
+one directory walk plus a parse of whatever was edited.
+
+Imports are resolved to project files at query time:
+  import a.b / from a.b import c      → a/b.py or a/b/__init__.py (and
+                                        a/b/c.py if c is a submodule),
+                                        searched under the project root,
+                                        src/ and the importing file's own
+                                        directory, plus the parent
+                                        packages' __init__.py
+  from . import x / from ..y import z → relative to the importing package
+
+affected_tests(edited) walks the reverse graph from the edited files and
+returns every test module that imports one of them, directly or
+transitively. A conftest.py that is reached selects every test under its
+directory, since pytest applies it to all of them. dependencies(file) walks
+the forward graph: everything a file imports, directly or transitively.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+
+CACHE_DIR = "/tmp"
+CACHE_VERSION = 1
+
+# Directories never scanned (besides hidden ones)
+SKIP_DIRS = {
+    "node_modules",
+    "__pycache__",
+    "venv",
+    "build",
+    "dist",
+    "site-packages",
+}
+
+# Projects larger than this fall back to directory mirroring
+MAX_FILES = 20000
+
+
+def cache_path(root: str) -> str:
+    digest = hashlib.sha1(os.path.realpath(root).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"claude-cq-imports-{os.getuid()}-{digest}.json")
+
+
+def is_test_file(path: str) -> bool:
+    """pytest's default test module pattern (test_*.py / *_test.py)."""
+    name = os.path.basename(path)
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py")
+    )
+
+
+_IMPORT_LINE = re.compile(r"^[ \t]*(?:import|from)[ \t]")
+
+
+def _import_statements(source: str) -> list[str]:
+    """Source of every import statement, dedented and joined onto one line."""
+    lines = source.splitlines()
+    statements = []
+    i = 0
+    while i < len(lines):
+        if _IMPORT_LINE.match(lines[i]):
+            parts = [lines[i].strip()]
+            while i + 1 < len(lines) and (
+                parts[-1].endswith("\\")
+                or ("(" in parts[0] and ")" not in parts[-1])
+            ):
+                i += 1
+                parts.append(lines[i].strip())
+            statements.append(" ".join(p.rstrip("\\") for p in parts))
+        i += 1
+    return statements
+
+
+def parse_imports(path: str) -> list[list]:
+    """Import statements of a file as [level, module, [names]] triples."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    except OSError:
+        return []
+
+    specs: list[list] = []
+    for statement in _import_statements(source):
+        try:
+            # Several statements may share the line (`import a; import b`)
+            nodes = ast.parse(statement).body
+        except (SyntaxError, ValueError):
+            # Not really an import (e.g. prose in a docstring)
+            continue
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                specs.extend([0, alias.name, []] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                names = [alias.name for alias in node.names if alias.name != "*"]
+                specs.append([node.level, node.module or "", names])
+    return specs
+
+
+def _scan(root: str) -> dict[str, tuple[int, int]] | None:
+    """relpath → (mtime_ns, size) of every .py file, or None if too many."""
+    found: dict[str, tuple[int, int]] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS
+        ]
+        for name in filenames:
+            if not name.endswith(".py"):
+                continue
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            found[os.path.relpath(full, root)] = (st.st_mtime_ns, st.st_size)
+            if len(found) > MAX_FILES:
+                return None
+    return found
+
+
+def load(root: str) -> "ImportGraph | None":
+    """Build the graph for root, re-parsing only files that changed.
+
+    Returns None if the project is too large to index.
+    """
+    path = cache_path(root)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        cached = data["files"] if data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        cached = {}
+
+    stats = _scan(root)
+    if stats is None:
+        return None
+
+    files: dict[str, list] = {}
+    changed = len(cached) != len(stats)
+    for rel, (mtime, size) in stats.items():
+        entry = cached.get(rel)
+        if entry and entry[0] == mtime and entry[1] == size:
+            files[rel] = entry
+        else:
+            files[rel] = [mtime, size, parse_imports(os.path.join(root, rel))]
+            changed = True
+
+    if changed:
+        tmp = f"{path}.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"version": CACHE_VERSION, "files": files}, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    return ImportGraph(root, {rel: entry[2] for rel, entry in files.items()})
+
+
+class ImportGraph:
+    """Project files and the project files each of them imports."""
+
+    def __init__(self, root: str, imports: dict[str, list[list]]):
+        self.root = root
+        self.imports = imports
+        self._files = set(imports)
+        self._direct: dict[str, set[str]] | None = None
+        self._dependents: dict[str, set[str]] | None = None
+
+    # ── Resolution ──────────────────────────────────────────────────
+
+    def _lookup(self, base: str, parts: list[str]) -> set[str]:
+        """Files executed by importing base/parts: module + parent inits."""
+        stem = os.path.normpath(os.path.join(base, *parts)) if parts else base
+        module = None
+        for candidate in (f"{stem}.py", os.path.join(stem, "__init__.py")):
+            candidate = os.path.normpath(candidate)
+            if candidate in self._files:
+                module = candidate
+                break
+        if module is None:
+            return set()
+
+        found = {module}
+        for i in range(1, len(parts)):
+            init = os.path.normpath(os.path.join(base, *parts[:i], "__init__.py"))
+            if init in self._files:
+                found.add(init)
+        return found
+
+    def resolve(self, importer: str, spec: list) -> set[str]:
+        """Project files an import statement in importer refers to."""
+        level, module, names = spec
+        importer_dir = os.path.dirname(importer)
+        if level:
+            base = importer_dir
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            bases = [base]
+        else:
+            bases = list(dict.fromkeys(["", "src", importer_dir]))
+
+        parts = module.split(".") if module else []
+        for base in bases:
+            found = self._lookup(base, parts)
+            for name in names:
+                found |= self._lookup(base, parts + [name])
+            if found:
+                # First matching root wins, like sys.path order
+                return found
+        return set()
+
+    def direct_imports(self) -> dict[str, set[str]]:
+        """Forward graph: file → project files it imports directly."""
+        if self._direct is None:
+            forward: dict[str, set[str]] = {}
+            for importer, specs in self.imports.items():
+                targets = set()
+                for spec in specs:
+                    targets |= self.resolve(importer, spec)
+                targets.discard(importer)
+                forward[importer] = targets
+            self._direct = forward
+        return self._direct
+
+    def dependents(self) -> dict[str, set[str]]:
+        """Reverse graph: file → files that import it directly."""
+        if self._dependents is None:
+            reverse: dict[str, set[str]] = {}
+            for importer, targets in self.direct_imports().items():
+                for target in targets:
+                    reverse.setdefault(target, set()).add(importer)
+            self._dependents = reverse
+        return self._dependents
+
+    def dependencies(self, rel: str) -> set[str]:
+        """Project files rel imports, directly or transitively (plus rel)."""
+        forward = self.direct_imports()
+        seen = {rel}
+        queue = [rel]
+        while queue:
+            for target in forward.get(queue.pop(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+    # ── Selection ───────────────────────────────────────────────────
+
+    def test_files(self) -> list[str]:
+        """Relative paths of every test module in the project."""
+        return sorted(f for f in self._files if is_test_file(f))
+
+    def affected_tests(self, edited: list[str]) -> list[str]:
+        """Absolute paths of test modules affected by the edited files."""
+        start = set()
+        for path in edited:
+            rel = os.path.relpath(os.path.abspath(path), self.root)
+            if rel in self._files:
+                start.add(rel)
+
+        dependents = self.dependents()
+        seen = set(start)
+        queue = list(start)
+        while queue:
+            for importer in dependents.get(queue.pop(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+
+        tests = {f for f in seen if is_test_file(f)}
+        for f in seen:
+            if os.path.basename(f) == "conftest.py":
+                scope = os.path.dirname(f)
+                tests.update(
+                    t
+                    for t in self._files
+                    if is_test_file(t)
+                    and (not scope or t.startswith(scope + os.sep))
+                )
+        return [os.path.join(self.root, t) for t in sorted(tests)]
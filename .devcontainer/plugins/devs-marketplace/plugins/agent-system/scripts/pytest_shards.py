@@ -0,0 +1,101 @@
+"""
+Parallel pytest runs without pytest-xdist.
+
+Used by advisory-test-runner.py and agent-system's task-completed-check.py;
+vendored identically into auto-code-quality and agent-system.
+
+plan() splits the test files a run would execute into one shard per CPU
+(up to MAX_WORKERS), balancing shards by file size as a proxy for runtime:
+
+  explicit test files → each shard gets its share of the files
+  whole suite         → the test files come from import_graph; every shard
+                        but one gets its share of them as an explicit file
+                        list, and the lightest shard runs the suite with the
+                        other shards' files passed as --ignore, so a test
+                        file the graph does not know runs there and only
+                        there, under pytest's own collection rules
+
+Each shard is an ordinary pytest process; result_stream.run_shards() (and
+its non-streaming form, run_shards_completed()) runs them together under
+one deadline and merges their output.
+"""
+
+import os
+
+import import_graph
+
+# Never start more pytest processes than this
+MAX_WORKERS = 8
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+# ── Planning ────────────────────────────────────────────────────────
+
+
+def _size(path: str) -> int:
+    try:
+        return max(os.path.getsize(path), 1)
+    except OSError:
+        return 1
+
+
+def _balance(files: list[str], count: int) -> list[list[str]]:
+    """Largest file first onto the lightest shard."""
+    sizes = {path: _size(path) for path in files}
+    shards: list[list[str]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for path in sorted(files, key=sizes.__getitem__, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(path)
+        loads[lightest] += sizes[path]
+    return [sorted(shard) for shard in shards if shard]
+
+
+def plan(
+    options: list[str],
+    tests: list[str] | None,
+    cwd: str,
+    graph: import_graph.ImportGraph | None = None,
+) -> list[list[str]] | None:
+    """Shard commands for options + tests (tests=None: the whole suite).
+
+    Returns None when sharding would not help: a single CPU, fewer than two
+    test files, or a whole-suite run without an import graph.
+    """
+    if tests is None:
+        if graph is None:
+            return None
+        ignored = {
+            arg.partition("=")[2] for arg in options if arg.startswith("--ignore=")
+        }
+        files = [
+            path
+            for path in (os.path.join(graph.root, t) for t in graph.test_files())
+            if path not in ignored
+        ]
+    else:
+        files = list(dict.fromkeys(os.path.abspath(t) for t in tests))
+
+    count = min(cpu_count(), MAX_WORKERS, len(files))
+    if count < 2:
+        return None
+
+    shards = _balance(files, count)
+    if tests is not None:
+        return [options + shard for shard in shards]
+    # The catch-all shard also runs whatever the graph missed
+    catch_all = min(shards, key=lambda shard: sum(map(_size, shard)))
+    commands = []
+    for shard in shards:
+        if shard is catch_all:
+            others = [path for other in shards if other is not shard for path in other]
+            commands.append(options + [f"--ignore={path}" for path in sorted(others)])
+        else:
+            commands.append(options + shard)
+    return commands
@@ -0,0 +1,415 @@
+"""
+Streaming test runs for advisory-test-runner.py, and the sharded pytest
+runner shared with agent-system's task-completed-check.py; vendored
+identically into auto-code-quality and agent-system.
+
+run() reads the test runner's combined stdout/stderr as it is produced and
+feeds each line to a Tally, which counts passed and failed tests:
+
+  pytest             progress lines ("tests/test_a.py ..F   [ 40%]"), -v
+                     lines ("tests/test_a.py::test_x FAILED") and the
+                     FAILED/ERROR summary
+  vitest, jest,      ✓ / ✕ / × result lines from the verbose reporters,
+  mocha, npm-test    numbered mocha failures ("1) name") and the final
+                     "Tests:" / "N passing" totals
+  go                 --- PASS / --- FAIL lines (go test -v)
+  cargo              "test name ... ok" / "test name ... FAILED"
+
+Once a failure is seen the runner gets FAILURE_GRACE seconds to finish
+printing its report, then it is stopped; at the deadline it is stopped
+outright. Either way the caller gets the output and counts so far
+("12 passed, 1 failed: test_x") instead of a bare timeout. STREAM_FLAGS
+also asks each runner to stop at the first failure by itself.
+
+run_shards() runs pytest_shards.py's shard commands side by side and merges
+them into one result; a failure in any shard stops all of them. With
+fail_fast=False every shard runs to completion instead, and
+run_shards_completed() wraps that as a drop-in for subprocess.run for
+callers that only want the final result.
+"""
+
+import os
+import re
+import selectors
+import signal
+import subprocess
+import threading
+import time
+
+# Appended to the framework's base command: stop at the first failure, and
+# report each test as it finishes where the default output does not
+STREAM_FLAGS = {
+    "pytest": ["-x"],
+    "vitest": ["--bail=1"],
+    "jest": ["--bail"],
+    "mocha": ["--bail"],
+    "go": ["-v", "-failfast"],
+}
+
+# Seconds a runner may keep printing after its first failure
+FAILURE_GRACE = 2.0
+
+# Failed test names listed in a summary
+MAX_NAMES = 5
+
+# How often parallel runs check whether another one has failed
+POLL_INTERVAL = 0.1
+
+# pytest's exit code for a run (or shard) that collected no tests
+NO_TESTS_COLLECTED = 5
+
+
+# ── Parsing ─────────────────────────────────────────────────────────
+
+_PYTEST_PROGRESS = re.compile(
+    r"^(?:(?P<file>\S+\.py) )?(?P<marks>[.sxXFE]+)\s*(?:\[\s*\d+%\])?$"
+)
+_PYTEST_VERBOSE = re.compile(r"^(?P<name>\S+::\S+) (?P<outcome>PASSED|FAILED|ERROR)\b")
+_PYTEST_SUMMARY = re.compile(r"^(?:FAILED|ERROR) (?P<name>\S+)")
+# "=== 1 failed, 12 passed in 0.52s ===" (undecorated with -q)
+_PYTEST_TOTALS = re.compile(
+    r"^=*\s*(?P<totals>\d+ [a-z]+(?:, \d+ [a-z]+)*) in [\d.]+s\b"
+)
+
+_GLYPH_PASS = re.compile(r"^\s*[✓✔√]\s+(?P<name>.+)$")
+_GLYPH_FAIL = re.compile(r"^\s*[✕×✗✖]\s+(?P<name>.+)$")
+_MOCHA_FAIL = re.compile(r"^\s+\d+\) (?P<name>.+)$")
+_MOCHA_TOTALS = re.compile(r"^\s+(?P<count>\d+) (?P<kind>passing|failing)\b")
+_JS_TOTALS = re.compile(r"^\s*Tests:?\s+(?P<totals>.*\d+ (?:passed|failed).*)$")
+# Per-file lines ("✓ src/a.test.ts (3 tests) 5ms") and durations
+_FILE_COUNT = re.compile(r"\(\d+(?: tests?)?(?: \| \d+ \w+)*\)")
+_DURATION = re.compile(r"\s+\(?\d+(?:\.\d+)?\s*m?s\)?$")
+
+_GO_RESULT = re.compile(r"^\s*--- (?P<outcome>PASS|FAIL): (?P<name>\S+)")
+_GO_BUILD_FAIL = re.compile(r"^FAIL\s+(?P<name>\S+)\s+\[(?:build|setup) failed\]")
+
+_CARGO_RESULT = re.compile(r"^test (?P<name>\S+) \.\.\. (?P<outcome>ok|FAILED)$")
+
+
+def _totals(text: str) -> dict[str, int]:
+    """'3 failed, 12 passed, 1 error' → {'failed': 3, 'passed': 12, 'error': 1}"""
+    return {
+        kind.rstrip("s") if kind.startswith("error") else kind: int(count)
+        for count, kind in re.findall(r"(\d+) (passed|failed|errors?)", text)
+    }
+
+
+class Tally:
+    """Passed/failed counts and failed test names, built line by line."""
+
+    def __init__(self, framework: str):
+        self.framework = framework
+        self.passed = 0
+        self.failed: list[str] = []
+        self._failures = 0
+        self._in_progress = True
+        self._file = ""
+        self._mocha_done = False
+
+    @property
+    def failures(self) -> int:
+        return max(self._failures, len(self.failed))
+
+    def _fail(self, name: str, count: bool = True) -> None:
+        if name and name not in self.failed:
+            self.failed.append(name)
+        if count:
+            self._failures += 1
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip()
+        if self.framework == "pytest":
+            self._feed_pytest(line)
+        elif self.framework == "go":
+            self._feed_go(line)
+        elif self.framework == "cargo":
+            self._feed_cargo(line)
+        else:
+            self._feed_js(line)
+
+    def _feed_pytest(self, line: str) -> None:
+        match = _PYTEST_TOTALS.match(line)
+        if match:
+            # The final banner is authoritative
+            totals = _totals(match.group("totals"))
+            self.passed = totals.get("passed", 0)
+            self._failures = totals.get("failed", 0) + totals.get("error", 0)
+            return
+        if line.startswith("=") and "test session starts" not in line:
+            # FAILURES, warnings summary, ...: the progress section is over
+            self._in_progress = False
+            return
+        match = _PYTEST_SUMMARY.match(line)
+        if match:
+            self._fail(match.group("name"), count=False)
+            return
+        if not self._in_progress:
+            return
+
+        match = _PYTEST_VERBOSE.match(line)
+        if match:
+            if match.group("outcome") == "PASSED":
+                self.passed += 1
+            else:
+                self._fail(match.group("name"))
+            return
+        match = _PYTEST_PROGRESS.match(line)
+        if match:
+            self._file = match.group("file") or self._file
+            marks = match.group("marks")
+            self.passed += marks.count(".")
+            # Named later by the summary; the file is the fallback
+            self._failures += marks.count("F") + marks.count("E")
+
+    def _feed_js(self, line: str) -> None:
+        match = _JS_TOTALS.match(line)
+        if match:
+            totals = _totals(match.group("totals"))
+            self.passed = totals.get("passed", self.passed)
+            self._failures = totals.get("failed", self._failures)
+            return
+        match = _MOCHA_TOTALS.match(line)
+        if match:
+            self._mocha_done = True
+            if match.group("kind") == "passing":
+                self.passed = int(match.group("count"))
+            else:
+                self._failures = int(match.group("count"))
+            return
+
+        for pattern, passed in ((_GLYPH_PASS, True), (_GLYPH_FAIL, False)):
+            match = pattern.match(line)
+            if match:
+                name = match.group("name")
+                if _FILE_COUNT.search(name):
+                    return
+                if passed:
+                    self.passed += 1
+                else:
+                    self._fail(_DURATION.sub("", name))
+                return
+
+        # Mocha repeats "1) name" in its failure details after the totals
+        match = _MOCHA_FAIL.match(line)
+        if match and not self._mocha_done:
+            self._fail(match.group("name").rstrip(":"))
+
+    def _feed_go(self, line: str) -> None:
+        match = _GO_RESULT.match(line)
+        if match:
+            if match.group("outcome") == "PASS":
+                self.passed += 1
+            else:
+                self._fail(match.group("name"))
+            return
+        match = _GO_BUILD_FAIL.match(line)
+        if match:
+            self._fail(match.group("name"))
+
+    def _feed_cargo(self, line: str) -> None:
+        match = _CARGO_RESULT.match(line)
+        if match:
+            if match.group("outcome") == "ok":
+                self.passed += 1
+            else:
+                self._fail(match.group("name"))
+
+    def add(self, other: "Tally") -> None:
+        """Fold in the counts of a parallel run."""
+        self.passed += other.passed
+        self._failures += other.failures
+        for name in other.failed:
+            self._fail(name, count=False)
+        if other.failures and not self._file:
+            self._file = other._file
+
+    def summary(self) -> str:
+        """'12 passed, 1 failed: test_x', or "" if nothing was recognised."""
+        if not self.passed and not self.failures:
+            return ""
+        text = f"{self.passed} passed, {self.failures} failed"
+        names = self.failed or ([self._file] if self.failures and self._file else [])
+        if names:
+            text += ": " + ", ".join(names[:MAX_NAMES])
+            if len(names) > MAX_NAMES:
+                text += f" (+{len(names) - MAX_NAMES} more)"
+        return text
+
+
+# ── Running ─────────────────────────────────────────────────────────
+
+
+class StreamResult:
+    """Outcome of a streamed run.
+
+    Attributes:
+        output: Combined stdout/stderr received.
+        returncode: Exit code, or None if the runner was stopped.
+        tally: Counts parsed from the output.
+        timed_out: Stopped at the deadline without having seen a failure.
+    """
+
+    def __init__(
+        self, output: str, returncode: int | None, tally: Tally, timed_out: bool
+    ):
+        self.output = output
+        self.returncode = returncode
+        self.tally = tally
+        self.timed_out = timed_out
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    # The runner's own children (node workers, test binaries) share its
+    # session and would otherwise keep running
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+    proc.wait()
+
+
+def run(
+    cmd: list[str],
+    cwd: str,
+    framework: str,
+    timeout: float,
+    failed: threading.Event | None = None,
+    fail_fast: bool = True,
+) -> StreamResult:
+    """Run a test command, parsing its output as it arrives.
+
+    failed is shared by parallel runs: it is set when this run sees a
+    failure, and once set by any of them the others stop after
+    FAILURE_GRACE too. With fail_fast=False the run is only stopped at
+    the deadline.
+
+    Raises FileNotFoundError/OSError if the command cannot be started.
+    """
+    tally = Tally(framework)
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    chunks: list[bytes] = []
+    pending = b""
+    finished = failing = False
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(proc.stdout, selectors.EVENT_READ)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if failed is not None:
+                remaining = min(remaining, POLL_INTERVAL)
+            if selector.select(remaining):
+                data = os.read(proc.stdout.fileno(), 65536)
+                if not data:
+                    finished = True
+                    break
+                chunks.append(data)
+                *lines, pending = (pending + data).split(b"\n")
+                for line in lines:
+                    tally.feed(line.decode(errors="replace"))
+                if tally.failures and failed is not None:
+                    failed.set()
+            if not fail_fast or failing:
+                continue
+            if tally.failures or (failed and failed.is_set()):
+                failing = True
+                deadline = min(deadline, time.monotonic() + FAILURE_GRACE)
+
+    # An unfinished line still holds results (pytest: "tests/test_a.py ..")
+    if pending:
+        tally.feed(pending.decode(errors="replace"))
+    if finished:
+        try:
+            returncode = proc.wait(timeout=FAILURE_GRACE)
+        except subprocess.TimeoutExpired:
+            _stop(proc)
+            returncode = None
+    else:
+        _stop(proc)
+        returncode = None
+    proc.stdout.close()
+
+    output = b"".join(chunks).decode(errors="replace")
+    timed_out = returncode is None and not tally.failures
+    return StreamResult(output, returncode, tally, timed_out)
+
+
+def run_shards(
+    shards: list[list[str]],
+    cwd: str,
+    framework: str,
+    timeout: float,
+    fail_fast: bool = True,
+) -> StreamResult:
+    """Run shard commands (pytest_shards.plan) in parallel as one run.
+
+    The first failure in any shard stops the others after FAILURE_GRACE,
+    unless fail_fast is False. Output is concatenated with failing shards
+    last, so a truncated tail still shows the failures.
+    """
+    failed = threading.Event() if fail_fast else None
+    results: list = [None] * len(shards)
+
+    def _run(i: int) -> None:
+        try:
+            results[i] = run(shards[i], cwd, framework, timeout, failed, fail_fast)
+        except OSError as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(len(shards))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for result in results:
+        if isinstance(result, OSError):
+            raise result
+
+    results.sort(
+        key=lambda r: bool(r.tally.failures)
+        or r.returncode not in (0, NO_TESTS_COLLECTED)
+    )
+    tally = Tally(framework)
+    for result in results:
+        tally.add(result.tally)
+    output = "".join(
+        r.output if r.output.endswith("\n") else r.output + "\n"
+        for r in results
+        if r.output
+    )
+
+    codes = [r.returncode for r in results]
+    if None in codes:
+        returncode = None
+    else:
+        # A shard whose files hold no tests only counts if none had any
+        counted = [c for c in codes if c != NO_TESTS_COLLECTED]
+        returncode = max(counted) if counted else NO_TESTS_COLLECTED
+    timed_out = returncode is None and not tally.failures
+    return StreamResult(output, returncode, tally, timed_out)
+
+
+def run_shards_completed(
+    shards: list[list[str]], cmd: list[str], cwd: str, timeout: float
+) -> subprocess.CompletedProcess:
+    """Run pytest shards to completion and merge them as if cmd had run.
+
+    Behaves like subprocess.run(cmd, cwd=cwd, capture_output=True, text=True,
+    timeout=timeout), with stderr folded into stdout: the exit code is the
+    highest of the shards' (a shard that collected nothing only counts if
+    none did), and TimeoutExpired carrying the output so far is raised if
+    any shard is still running at the deadline.
+    """
+    result = run_shards(shards, cwd, "pytest", timeout, fail_fast=False)
+    if result.returncode is None:
+        raise subprocess.TimeoutExpired(cmd, timeout, output=result.output, stderr="")
+    return subprocess.CompletedProcess(cmd, result.returncode, result.output, "")
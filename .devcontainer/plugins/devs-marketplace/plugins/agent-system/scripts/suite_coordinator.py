@@ -0,0 +1,224 @@
+"""
+Shared test-suite runs for the agent-system quality gates.
+
+verify-no-regression.py, verify-tests-pass.py and task-completed-check.py
+all run the project's full test suite. In team mode several teammates hit
+those gates within seconds of each other over the same code, and each used
+to start its own identical run. run() coalesces them:
+
+  key     → cwd + test command + git HEAD tree + sha256 of every dirty or
+            untracked file (`git status --porcelain`)
+  lock    → /tmp/claude-test-runs-{uid}/<key>.lock (flock): the first caller
+            runs the suite, later callers for the same key block on it
+  result  → /tmp/claude-test-runs-{uid}/<key>.json: written by the runner,
+            replayed by every waiter and by later callers for RESULT_TTL
+
+Any change to the tree (an edit, a commit, a new untracked file) changes
+the key, so a stored result is never reused for different code. Timeouts
+are not stored. Outside a git repository the suite simply runs uncoordinated.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import time
+from collections.abc import Callable
+
+STATE_DIR = f"/tmp/claude-test-runs-{os.getuid()}"
+
+# How long a finished run's result is reused for an unchanged tree
+RESULT_TTL = 600
+
+GIT_TIMEOUT = 5
+
+# How often a waiter re-checks the lock
+POLL_INTERVAL = 0.1
+
+
+# ── Tree state ──────────────────────────────────────────────────────
+
+
+def _git(args: list[str], cwd: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, timeout=GIT_TIMEOUT
+    )
+
+
+def _file_hash(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        # Deleted, or a directory (e.g. an untracked submodule)
+        return "-"
+
+
+def tree_key(cwd: str, cmd: list[str]) -> str | None:
+    """Identify the code a test command would run against.
+
+    Returns None outside a git work tree (or if git is unavailable).
+    """
+    try:
+        top = _git(["rev-parse", "--show-toplevel"], cwd)
+        if top.returncode != 0:
+            return None
+        head = _git(["rev-parse", "-q", "--verify", "HEAD^{tree}"], cwd)
+        status = _git(
+            ["status", "--porcelain=v1", "-z", "--untracked-files=all"], cwd
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if status.returncode != 0:
+        return None
+
+    root = top.stdout.decode().strip()
+    digest = hashlib.sha256()
+    digest.update(json.dumps([os.path.realpath(cwd), cmd]).encode())
+    digest.update(head.stdout.strip() + b"\0")
+
+    # -z entries are "XY path"; a rename/copy is followed by its source path
+    dirty = []
+    entries = status.stdout.decode(errors="surrogateescape").split("\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        if len(entry) > 3:
+            dirty.append(entry[3:])
+            if entry[0] in "RC":
+                i += 1
+        i += 1
+    for path in sorted(dirty):
+        file_hash = _file_hash(os.path.join(root, path))
+        digest.update(f"{path}\0{file_hash}\0".encode(errors="surrogateescape"))
+    return digest.hexdigest()[:32]
+
+
+# ── Results ─────────────────────────────────────────────────────────
+
+
+def _read_result(path: str) -> dict | None:
+    try:
+        if time.time() - os.stat(path).st_mtime > RESULT_TTL:
+            return None
+        with open(path) as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _write_result(path: str, record: dict) -> None:
+    tmp = f"{path}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _prune(keep: str) -> None:
+    """Remove result and lock files older than RESULT_TTL."""
+    cutoff = time.time() - RESULT_TTL
+    try:
+        names = os.listdir(STATE_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(STATE_DIR, name)
+        if name.startswith(keep):
+            continue
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+def _replay(cmd: list[str], record: dict) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(
+        cmd, record["returncode"], record.get("stdout", ""), record.get("stderr", "")
+    )
+
+
+def _acquire(lock_file, deadline: float) -> bool:
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+
+
+# ── Entry point ─────────────────────────────────────────────────────
+
+
+# runner(cmd, cwd, timeout) → CompletedProcess, raising like subprocess.run
+Runner = Callable[[list[str], str, float], subprocess.CompletedProcess]
+
+
+def run_subprocess(
+    cmd: list[str], cwd: str, timeout: float
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout
+    )
+
+
+def run(
+    cmd: list[str],
+    cwd: str,
+    timeout: float,
+    runner: Runner = run_subprocess,
+) -> subprocess.CompletedProcess:
+    """Run a test command, sharing the run with callers on the same tree.
+
+    Behaves like subprocess.run(cmd, cwd=cwd, capture_output=True, text=True,
+    timeout=timeout): returns a CompletedProcess, raises TimeoutExpired when
+    no result is available within *timeout* (including time spent waiting
+    for another caller's run), and lets FileNotFoundError/OSError through.
+
+    runner(cmd, cwd, timeout) performs the run when this caller is the one
+    to do it, e.g. result_stream.run_shards_completed to spread it over
+    several processes.
+    """
+    key = tree_key(cwd, cmd)
+    if key is None:
+        return runner(cmd, cwd, timeout)
+
+    deadline = time.monotonic() + timeout
+    result_path = os.path.join(STATE_DIR, f"{key}.json")
+    record = _read_result(result_path)
+    if record:
+        return _replay(cmd, record)
+
+    os.makedirs(STATE_DIR, mode=0o700, exist_ok=True)
+    with open(os.path.join(STATE_DIR, f"{key}.lock"), "a") as lock_file:
+        if not _acquire(lock_file, deadline):
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        try:
+            # The run we waited on may have finished in the meantime
+            record = _read_result(result_path)
+            if record:
+                return _replay(cmd, record)
+
+            result = runner(cmd, cwd, max(0.1, deadline - time.monotonic()))
+            _write_result(
+                result_path,
+                {
+                    "returncode": result.returncode,
+                    "stdout": result.stdout,
+                    "stderr": result.stderr,
+                },
+            )
+            _prune(keep=key)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
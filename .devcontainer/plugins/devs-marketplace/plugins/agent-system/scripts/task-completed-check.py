@@ -5,110 +5,29 @@ TaskCompleted quality gate — runs project test suite before allowing completio
 Detects the project's test framework and runs it. If tests fail, the task
 stays open and the teammate receives feedback to fix the failures.
 
+Teammates finishing tasks on the same tree state share one run of the suite
+(suite_coordinator.py) instead of each starting their own. With pytest, test
+files that passed before with unchanged inputs are skipped (pytest_results.py)
+and the rest are split across one process per CPU (pytest_shards.py), run
+together by result_stream.py.
+
 Exit 0: Tests pass (or no test framework / runner not installed)
 Exit 2: Tests fail (task stays open, feedback sent via stderr)
 """
 
+import functools
 import json
 import os
 import subprocess
 import sys
 
-TIMEOUT_SECONDS = 60
-
-
-def detect_test_framework(cwd: str) -> tuple[str, list[str]]:
-    """Detect which test framework is available in the project.
-
-    Checks for: pytest, vitest, jest, mocha, go test, cargo test.
-    Falls back to npm test if a test script is defined.
+import framework_detect
+import pytest_results
+import pytest_shards
+import result_stream
+import suite_coordinator
 
-    Returns:
-        Tuple of (framework_name, command_list) or ("", []) if none found.
-    """
-    try:
-        entries = set(os.listdir(cwd))
-    except OSError:
-        return ("", [])
-
-    # Python: pytest
-    if "pytest.ini" in entries or "conftest.py" in entries:
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for cfg_name in ("pyproject.toml", "setup.cfg", "tox.ini"):
-        cfg_path = os.path.join(cwd, cfg_name)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                if any(
-                    marker in content
-                    for marker in ("[tool.pytest", "[pytest]", "[tool:pytest]")
-                ):
-                    return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-            except OSError:
-                pass
-
-    if "tests" in entries and os.path.isdir(os.path.join(cwd, "tests")):
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for entry in entries:
-        if entry.startswith("test_") and entry.endswith(".py"):
-            return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    # JavaScript: vitest
-    for name in entries:
-        if name.startswith("vitest.config"):
-            return ("vitest", ["npx", "vitest", "run", "--reporter=verbose"])
-
-    for vite_cfg in ("vite.config.ts", "vite.config.js"):
-        cfg_path = os.path.join(cwd, vite_cfg)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    if "test" in f.read():
-                        return (
-                            "vitest",
-                            ["npx", "vitest", "run", "--reporter=verbose"],
-                        )
-            except OSError:
-                pass
-
-    # JavaScript: jest
-    for name in entries:
-        if name.startswith("jest.config"):
-            return ("jest", ["npx", "jest", "--verbose"])
-
-    pkg_json = os.path.join(cwd, "package.json")
-    if os.path.isfile(pkg_json):
-        try:
-            with open(pkg_json, "r", encoding="utf-8") as f:
-                pkg = json.loads(f.read())
-
-            if "jest" in pkg:
-                return ("jest", ["npx", "jest", "--verbose"])
-
-            dev_deps = pkg.get("devDependencies", {})
-            deps = pkg.get("dependencies", {})
-
-            if "mocha" in dev_deps or "mocha" in deps:
-                return ("mocha", ["npx", "mocha", "--reporter", "spec"])
-
-            test_script = pkg.get("scripts", {}).get("test", "")
-            if test_script and "no test specified" not in test_script:
-                return ("npm-test", ["npm", "test"])
-        except (OSError, json.JSONDecodeError):
-            pass
-
-    # Go
-    if "go.mod" in entries:
-        return ("go", ["go", "test", "./...", "-count=1"])
-
-    # Rust
-    if "Cargo.toml" in entries:
-        return ("cargo", ["cargo", "test"])
-
-    return ("", [])
+TIMEOUT_SECONDS = 60
 
 
 def main():
@@ -118,20 +37,32 @@ def main():
         pass
 
     cwd = os.getcwd()
-    framework, cmd = detect_test_framework(cwd)
+    framework, cmd = framework_detect.detect_test_framework(cwd)
 
     if not framework:
         sys.exit(0)
 
+    # Leave out test files that passed before with unchanged inputs
+    cached_run = None
+    runner = suite_coordinator.run_subprocess
+    if framework == "pytest":
+        cached_run = pytest_results.plan(cmd, cwd)
+        if cached_run is not None:
+            cmd = cached_run.cmd
+            shards = pytest_shards.plan(
+                cached_run.options, cached_run.tests, cwd, cached_run.graph
+            )
+            if shards:
+                runner = functools.partial(result_stream.run_shards_completed, shards)
+
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=TIMEOUT_SECONDS,
+        result = suite_coordinator.run(
+            cmd, cwd, timeout=TIMEOUT_SECONDS, runner=runner
         )
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
+        # Files that finished before the timeout are skipped next time
+        if cached_run is not None:
+            cached_run.record(e.stdout, None)
         # Timeout is not a definitive failure — allow completion but warn
         print(
             f"Tests timed out ({framework}, {TIMEOUT_SECONDS}s). "
@@ -144,7 +75,11 @@ def main():
     except OSError:
         sys.exit(0)
 
-    if result.returncode == 0:
+    passed = result.returncode == 0
+    if cached_run is not None:
+        cached_run.record(result.stdout, result.returncode)
+        passed = cached_run.passed(result.returncode)
+    if passed:
         sys.exit(0)
 
     output = (result.stdout + "\n" + result.stderr).strip()
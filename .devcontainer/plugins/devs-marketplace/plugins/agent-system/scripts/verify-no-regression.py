@@ -4,7 +4,10 @@ Verify no regression - PostToolUse hook for refactorer agent.
 
 After each Edit operation, runs the project test suite to ensure
 the refactoring didn't break anything. Includes debounce to avoid
-running tests too frequently during rapid edits.
+running tests too frequently during rapid edits. The run is shared with the
+other agent-system test gates over the same tree state (suite_coordinator.py).
+pytest skips test files that passed before with unchanged inputs
+(pytest_results.py).
 
 Reads hook input from stdin (JSON). Returns JSON on stdout.
 Non-blocking on detection failures: always exits 0 if no framework found.
@@ -19,102 +22,11 @@ import subprocess
 import sys
 import time
 
-DEBOUNCE_SECONDS = 10
-
-
-def detect_test_framework(cwd: str) -> tuple[str, list[str]]:
-    """Detect which test framework is available in the project.
+import framework_detect
+import pytest_results
+import suite_coordinator
 
-    Checks for: pytest, vitest, jest, mocha, go test, cargo test.
-    Falls back to npm test if a test script is defined.
-
-    Returns:
-        Tuple of (framework_name, command_list) or ("", []) if none found.
-    """
-    try:
-        entries = set(os.listdir(cwd))
-    except OSError:
-        return ("", [])
-
-    # --- Python: pytest ---
-    if "pytest.ini" in entries or "conftest.py" in entries:
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for cfg_name in ("pyproject.toml", "setup.cfg", "tox.ini"):
-        cfg_path = os.path.join(cwd, cfg_name)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                if (
-                    "[tool.pytest" in content
-                    or "[pytest]" in content
-                    or "[tool:pytest]" in content
-                ):
-                    return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-            except OSError:
-                pass
-
-    if "tests" in entries and os.path.isdir(os.path.join(cwd, "tests")):
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for entry in entries:
-        if entry.startswith("test_") and entry.endswith(".py"):
-            return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    # --- JavaScript: vitest ---
-    for name in entries:
-        if name.startswith("vitest.config"):
-            return ("vitest", ["npx", "vitest", "run", "--reporter=verbose"])
-
-    for vite_cfg in ("vite.config.ts", "vite.config.js"):
-        cfg_path = os.path.join(cwd, vite_cfg)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    if "test" in f.read():
-                        return (
-                            "vitest",
-                            ["npx", "vitest", "run", "--reporter=verbose"],
-                        )
-            except OSError:
-                pass
-
-    # --- JavaScript: jest ---
-    for name in entries:
-        if name.startswith("jest.config"):
-            return ("jest", ["npx", "jest", "--verbose"])
-
-    pkg_json = os.path.join(cwd, "package.json")
-    if os.path.isfile(pkg_json):
-        try:
-            with open(pkg_json, "r", encoding="utf-8") as f:
-                pkg = json.loads(f.read())
-
-            if "jest" in pkg:
-                return ("jest", ["npx", "jest", "--verbose"])
-
-            dev_deps = pkg.get("devDependencies", {})
-            deps = pkg.get("dependencies", {})
-
-            if "mocha" in dev_deps or "mocha" in deps:
-                return ("mocha", ["npx", "mocha", "--reporter", "spec"])
-
-            test_script = pkg.get("scripts", {}).get("test", "")
-            if test_script and "no test specified" not in test_script:
-                return ("npm-test", ["npm", "test"])
-        except (OSError, json.JSONDecodeError):
-            pass
-
-    # --- Go ---
-    if "go.mod" in entries:
-        return ("go", ["go", "test", "./...", "-count=1"])
-
-    # --- Rust ---
-    if "Cargo.toml" in entries:
-        return ("cargo", ["cargo", "test"])
-
-    return ("", [])
+DEBOUNCE_SECONDS = 10
 
 
 def should_debounce(session_id: str) -> bool:
@@ -161,20 +73,24 @@ def main():
         sys.exit(0)
 
     cwd = os.getcwd()
-    framework, cmd = detect_test_framework(cwd)
+    framework, cmd = framework_detect.detect_test_framework(cwd)
 
     if not framework:
         sys.exit(0)
 
+    # Leave out test files that passed before with unchanged inputs
+    cached_run = None
+    if framework == "pytest":
+        cached_run = pytest_results.plan(cmd, cwd)
+        if cached_run is not None:
+            cmd = cached_run.cmd
+
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-    except subprocess.TimeoutExpired:
+        result = suite_coordinator.run(cmd, cwd, timeout=60)
+    except subprocess.TimeoutExpired as e:
+        # Files that finished before the timeout are skipped next time
+        if cached_run is not None:
+            cached_run.record(e.stdout, None)
         # Timeout is non-critical for PostToolUse — don't block the agent
         json.dump(
             {
@@ -191,6 +107,11 @@ def main():
     except OSError:
         sys.exit(0)
 
+    passed = result.returncode == 0
+    if cached_run is not None:
+        cached_run.record(result.stdout, result.returncode)
+        passed = cached_run.passed(result.returncode)
+
     output = (result.stdout + "\n" + result.stderr).strip()
     if not output:
         output = "(no test output)"
@@ -200,7 +121,7 @@ def main():
     if len(lines) > 50:
         output = "...(truncated)\n" + "\n".join(lines[-50:])
 
-    if result.returncode != 0:
+    if not passed:
         edited = os.path.basename(file_path)
         print(
             f"Regression detected after editing {edited} "
@@ -2,10 +2,18 @@
 """
 Advisory test runner — Stop hook that injects test results as context.
 
-Reads the list of files edited this session (written by collect-edited-files.py),
-maps them to affected test files, and runs only those tests. Skips entirely
-if no files were edited. Results are returned as systemMessage (pass/timeout) or decision/reason
-block (failure) so Claude acts on test failures before finishing.
+Reads the files edited since the tests last passed (edit_journal.py, written
+by collect-edited-files.py), maps them to affected test files, and runs only
+those tests. For pytest, affected tests come from a cached import graph
+(import_graph.py): every test module that imports an edited module, directly
+or transitively, minus the files whose cached pass still holds
+(pytest_results.py). Skips entirely if no files were edited. Results are
+returned as systemMessage (pass/timeout) or decision/reason block (failure)
+so Claude acts on test failures before finishing.
+
+Output is parsed while the tests run (result_stream.py): the run stops at the
+first failure, and a timeout still reports the counts so far. pytest files
+are split across one process per CPU (pytest_shards.py), no xdist needed.
 
 Reads hook input from stdin (JSON). Returns JSON on stdout.
 Always exits 0. Failures use decision: "block" to prevent stopping.
@@ -13,128 +21,58 @@ Always exits 0. Failures use decision: "block" to prevent stopping.
 
 import json
 import os
-import subprocess
 import sys
 
+import edit_journal
+import framework_detect
+import import_graph
+import pytest_results
+import pytest_shards
+import result_stream
+
 TIMEOUT_SECONDS = 15
 
 
-def get_edited_files(session_id: str) -> list[str]:
-    """Read the list of files edited this session.
+def get_edited_files(cursor: edit_journal.Cursor) -> list[str]:
+    """Read the files edited since the tests last passed.
 
-    Relies on collect-edited-files.py writing paths to a temp file.
+    Relies on collect-edited-files.py recording edits in the session's edit
+    journal. The "tests" cursor only moves on once a run has passed (or had
+    nothing to run), so edits behind a failure or timeout are tested again.
     Returns deduplicated list of paths that still exist on disk.
     """
-    tmp_path = f"/tmp/claude-cq-edited-{session_id}"
-    try:
-        with open(tmp_path, "r") as f:
-            raw = f.read()
-    except OSError:
-        return []
+    edits = cursor.read()
+    return [p for p in edit_journal.unique_paths(edits) if os.path.isfile(p)]
 
-    seen: set[str] = set()
-    result: list[str] = []
-    for line in raw.strip().splitlines():
-        path = line.strip()
-        if path and path not in seen and os.path.isfile(path):
-            seen.add(path)
-            result.append(path)
-    return result
 
+def resolve_pytest_tests(edited_files: list[str], cwd: str) -> tuple[list[str], bool]:
+    """Select the pytest test files affected by the edited Python files.
 
-def detect_test_framework(cwd: str) -> tuple[str, list[str]]:
-    """Detect which test framework is available in the project.
+    Uses the import graph, plus the directory-mirroring guess for tests that
+    exercise a module without importing it. Falls back to mirroring alone if
+    the project is too large to index.
 
     Returns:
-        Tuple of (framework_name, base_command) or ("", []) if none found.
+        (test_files, run_all) — if run_all is True, run the whole suite.
     """
-    try:
-        entries = set(os.listdir(cwd))
-    except OSError:
-        return ("", [])
-
-    # --- Python: pytest ---
-    if "pytest.ini" in entries or "conftest.py" in entries:
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for cfg_name in ("pyproject.toml", "setup.cfg", "tox.ini"):
-        cfg_path = os.path.join(cwd, cfg_name)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                if (
-                    "[tool.pytest" in content
-                    or "[pytest]" in content
-                    or "[tool:pytest]" in content
-                ):
-                    return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-            except OSError:
-                pass
-
-    if "tests" in entries and os.path.isdir(os.path.join(cwd, "tests")):
-        return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    for entry in entries:
-        if entry.startswith("test_") and entry.endswith(".py"):
-            return ("pytest", ["python3", "-m", "pytest", "--tb=short", "-q"])
-
-    # --- JavaScript: vitest ---
-    for name in entries:
-        if name.startswith("vitest.config"):
-            return ("vitest", ["npx", "vitest", "run", "--reporter=verbose"])
-
-    for vite_cfg in ("vite.config.ts", "vite.config.js"):
-        cfg_path = os.path.join(cwd, vite_cfg)
-        if os.path.isfile(cfg_path):
-            try:
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    if "test" in f.read():
-                        return (
-                            "vitest",
-                            ["npx", "vitest", "run", "--reporter=verbose"],
-                        )
-            except OSError:
-                pass
-
-    # --- JavaScript: jest ---
-    for name in entries:
-        if name.startswith("jest.config"):
-            return ("jest", ["npx", "jest", "--verbose"])
-
-    pkg_json = os.path.join(cwd, "package.json")
-    if os.path.isfile(pkg_json):
-        try:
-            with open(pkg_json, "r", encoding="utf-8") as f:
-                pkg = json.loads(f.read())
-
-            if "jest" in pkg:
-                return ("jest", ["npx", "jest", "--verbose"])
-
-            dev_deps = pkg.get("devDependencies", {})
-            deps = pkg.get("dependencies", {})
-
-            if "mocha" in dev_deps or "mocha" in deps:
-                return ("mocha", ["npx", "mocha", "--reporter", "spec"])
-
-            test_script = pkg.get("scripts", {}).get("test", "")
-            if test_script and "no test specified" not in test_script:
-                return ("npm-test", ["npm", "test"])
-        except (OSError, json.JSONDecodeError):
-            pass
-
-    # --- Go ---
-    if "go.mod" in entries:
-        return ("go", ["go", "test", "-count=1"])
-
-    # --- Rust ---
-    if "Cargo.toml" in entries:
-        return ("cargo", ["cargo", "test"])
-
-    return ("", [])
+    python_files = [p for p in edited_files if p.endswith(".py")]
+    if not python_files:
+        return ([], False)
 
+    graph = import_graph.load(cwd)
+    if graph is None:
+        return mirror_pytest_tests(python_files, cwd)
 
-def resolve_pytest_tests(edited_files: list[str], cwd: str) -> tuple[list[str], bool]:
+    # The graph scopes conftest.py to its directory; left in, it would make
+    # mirroring give up on the whole batch
+    mirrored, _run_all = mirror_pytest_tests(
+        [p for p in python_files if os.path.basename(p) != "conftest.py"], cwd
+    )
+    selected = graph.affected_tests(python_files) + mirrored
+    return (list(dict.fromkeys(selected)), False)
+
+
+def mirror_pytest_tests(edited_files: list[str], cwd: str) -> tuple[list[str], bool]:
     """Map edited Python files to their corresponding pytest test files.
 
     Returns:
@@ -281,49 +219,94 @@ def main():
     if not session_id:
         sys.exit(0)
 
-    # No files edited this session — nothing to test
-    edited_files = get_edited_files(session_id)
+    # No files edited since the last pass — nothing to test
+    cursor = edit_journal.Cursor(session_id, "tests")
+    edited_files = get_edited_files(cursor)
     if not edited_files:
         sys.exit(0)
 
     cwd = os.getcwd()
-    framework, base_cmd = detect_test_framework(cwd)
+    framework, base_cmd = framework_detect.detect_test_framework(cwd)
 
     if not framework:
+        cursor.commit()
         sys.exit(0)
 
     extra_args, run_all = resolve_affected_tests(edited_files, cwd, framework)
 
     # No affected tests and not a run-all situation — skip
     if not extra_args and not run_all:
+        cursor.commit()
         sys.exit(0)
 
+    if framework == "go":
+        # The shared command targets ./...; run only the affected packages
+        base_cmd = [arg for arg in base_cmd if arg != "./..."]
+    base_cmd = base_cmd + result_stream.STREAM_FLAGS.get(framework, [])
+
     cmd = base_cmd + extra_args
 
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=TIMEOUT_SECONDS,
+    # Leave out test files that passed before with unchanged inputs
+    cached_run = None
+    if framework == "pytest":
+        cached_run = pytest_results.plan(
+            base_cmd, cwd, None if run_all else extra_args
         )
-    except subprocess.TimeoutExpired:
-        json.dump(
-            {
-                "systemMessage": f"[Tests] {framework} timed out after {TIMEOUT_SECONDS}s"
-            },
-            sys.stdout,
+        if cached_run is not None and cached_run.cmd is None:
+            cursor.commit()
+            json.dump(
+                {
+                    "systemMessage": f"[Tests] All tests passed ({framework}, "
+                    f"{cached_run.note()})"
+                },
+                sys.stdout,
+            )
+            sys.exit(0)
+        if cached_run is not None:
+            cmd = cached_run.cmd
+
+    shards = None
+    if cached_run is not None:
+        shards = pytest_shards.plan(
+            cached_run.options, cached_run.tests, cwd, cached_run.graph
         )
-        sys.exit(0)
+
+    try:
+        if shards:
+            result = result_stream.run_shards(shards, cwd, framework, TIMEOUT_SECONDS)
+        else:
+            result = result_stream.run(cmd, cwd, framework, TIMEOUT_SECONDS)
     except (FileNotFoundError, OSError):
+        cursor.commit()
+        sys.exit(0)
+
+    counts = result.tally.summary()
+    if cached_run is not None:
+        # After a timeout, files that finished are still skipped next time
+        cached_run.record(result.output, result.returncode)
+
+    if result.timed_out:
+        message = f"[Tests] {framework} timed out after {TIMEOUT_SECONDS}s"
+        if counts:
+            message += f": {counts}"
+        json.dump({"systemMessage": message}, sys.stdout)
         sys.exit(0)
 
-    output = (result.stdout + "\n" + result.stderr).strip()
+    output = result.output.strip()
+
+    passed = result.returncode == 0
+    if cached_run is not None and result.returncode is not None:
+        passed = cached_run.passed(result.returncode)
+    passed = passed and not result.tally.failures
 
-    if result.returncode == 0:
+    if passed:
+        cursor.commit()
+        parts = [framework, counts]
+        if cached_run is not None:
+            parts.append(cached_run.note())
+        summary = ", ".join(part for part in parts if part)
         json.dump(
-            {"systemMessage": f"[Tests] All tests passed ({framework})"},
+            {"systemMessage": f"[Tests] All tests passed ({summary})"},
             sys.stdout,
         )
         sys.exit(0)
@@ -336,10 +319,12 @@ def main():
     if len(lines) > 30:
         output = "...(truncated)\n" + "\n".join(lines[-30:])
 
+    heading = f": {counts}" if counts else ""
+
     json.dump(
         {
             "decision": "block",
-            "reason": f"[Tests] Some tests FAILED ({framework}):\n{output}",
+            "reason": f"[Tests] Some tests FAILED ({framework}){heading}:\n{output}",
         },
         sys.stdout,
     )
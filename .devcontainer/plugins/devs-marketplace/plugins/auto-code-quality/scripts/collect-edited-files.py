@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
 """
-Collect edited file paths for batch formatting and linting at Stop.
+PostToolUse hook for Edit/Write: collect the edited file, check its syntax.
 
-Lightweight PostToolUse hook that appends the edited file path
-to session-scoped temp files. The format and lint Stop hooks
-read these files to know which files need processing.
+One process per edit does both jobs that used to be separate hooks:
+
+  collect  → appends the edited file path to the session's edit journal
+             (edit_journal.py). The format, lint and test Stop hooks each
+             read the journal from their own cursor to know which files
+             need processing.
+  validate → JSON, JSONC, YAML and TOML files are checked right away
+             (syntax_check.py) and errors are returned as additionalContext.
+             The verdict is cached by content hash (result_cache.py), so
+             a file is not re-checked until its bytes change.
+
+Runs under plain python3 rather than the hook daemon: a large YAML file
+can take up to syntax_check.SCAN_BUDGET seconds, and the daemon serves one
+request at a time, so Bash guards from parallel tool calls would wait
+behind it.
 
 Non-blocking: always exits 0. Runs in <10ms.
 """
@@ -12,6 +24,11 @@ Non-blocking: always exits 0. Runs in <10ms.
 import json
 import os
 import sys
+from pathlib import Path
+
+import edit_journal
+import result_cache
+import syntax_check
 
 
 def main():
@@ -24,21 +41,39 @@ def main():
     tool_input = input_data.get("tool_input", {})
     file_path = tool_input.get("file_path", "")
 
-    if not file_path or not session_id:
+    if not file_path:
         sys.exit(0)
 
     if not os.path.isfile(file_path):
         sys.exit(0)
 
-    # Write to both formatter and linter temp files (independent pipelines)
-    # Uses "claude-cq-" prefix to avoid collision with other plugins
-    for prefix in ("claude-cq-edited", "claude-cq-lint"):
-        tmp_path = f"/tmp/{prefix}-{session_id}"
-        try:
-            with open(tmp_path, "a") as f:
-                f.write(file_path + "\n")
-        except OSError:
-            pass  # non-critical, don't block Claude
+    if session_id:
+        # One record per edit; a no-op if session-context already wrote it
+        edit_journal.append(session_id, file_path, input_data.get("tool_use_id", ""))
+
+    if Path(file_path).suffix.lower() not in syntax_check.EXTENSIONS:
+        sys.exit(0)
+
+    try:
+        if os.path.getsize(file_path) > syntax_check.MAX_BYTES:
+            sys.exit(0)
+        cache = result_cache.ResultCache("syntax")
+        fingerprint = cache.fingerprint(
+            file_path, syntax_check.validator_files(file_path)
+        )
+        message = cache.get("syntax", file_path, fingerprint)
+        if message is None:
+            message = syntax_check.validate(file_path)
+            # A truncated scan proves nothing, so it is not cached as clean
+            if message is not None:
+                cache.put("syntax", file_path, fingerprint, message)
+                cache.save()
+    except Exception as e:
+        print(f"Hook error: {e}", file=sys.stderr)
+        sys.exit(0)
+
+    if message:
+        print(json.dumps({"additionalContext": message}))
 
     sys.exit(0)
 
@@ -2,9 +2,10 @@
 """
 Unified batch formatter — runs as a Stop hook.
 
-Reads file paths collected by collect-edited-files.py during the
-conversation turn, deduplicates them, and formats each based on
-extension:
+Reads the file paths edit_journal.py recorded since the last format run
+(written by collect-edited-files.py), deduplicates them, groups them by
+formatter based on extension, and runs each formatter once with all of its
+files:
   .py / .pyi                                → Ruff format (fallback: Black)
   .go                                       → gofmt
   .js/.jsx/.ts/.tsx/.mjs/.cjs/.mts/.cts     → Biome check --write
@@ -17,15 +18,24 @@ extension:
   Dockerfile / .dockerfile                  → dprint fmt
   .rs                                       → rustfmt
 
-Always cleans up the temp file. Always exits 0.
+Each formatter call has its own timeout, capped by what is left of the
+hook's budget. Files whose bytes, formatter binary and formatter config
+match what the last successful run left behind are skipped (result_cache.py).
+Always exits 0.
 """
 
 import json
 import os
 import subprocess
 import sys
+import time
+from collections.abc import Callable
 from pathlib import Path
 
+import edit_journal
+import result_cache
+import tool_cache
+
 # ── Extension sets ──────────────────────────────────────────────────
 
 PYTHON_EXTS = {".py", ".pyi"}
@@ -59,17 +69,33 @@ BLACK_PATH_FALLBACK = "/usr/local/py-utils/bin/black"
 GOFMT_PATH_FALLBACK = "/usr/local/go/bin/gofmt"
 DPRINT_CONFIG = "/usr/local/share/dprint/dprint.json"
 
+# ── Timeouts ────────────────────────────────────────────────────────
+
+# Per-formatter call (all files of that formatter at once)
+FORMATTER_TIMEOUT = 10
+BIOME_TIMEOUT = 12
+
+# Total time for one Stop, kept below the 15s hook timeout
+FORMAT_BUDGET = 13
+
+# Monotonic time at which the current run's budget is exhausted
+_deadline = float("inf")
+
+
+def _timeout(limit: float = FORMATTER_TIMEOUT) -> float:
+    """Per-call timeout, capped by what is left of the format budget."""
+    remaining = _deadline - time.monotonic()
+    return max(0.1, min(limit, remaining))
+
+
 # ── Tool resolution ─────────────────────────────────────────────────
 
 
 def _resolve_tool(name: str, fallback: str = "") -> str | None:
     """Find tool via PATH first, fall back to hardcoded path."""
-    try:
-        result = subprocess.run(["which", name], capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
+    found = tool_cache.which(name)
+    if found:
+        return found
     if fallback and os.path.exists(fallback):
         return fallback
     return None
@@ -77,31 +103,12 @@ def _resolve_tool(name: str, fallback: str = "") -> str | None:
 
 def find_tool_upward(file_path: str, tool_name: str) -> str | None:
     """Walk up from file directory looking for node_modules/.bin/<tool>."""
-    current = Path(file_path).parent
-    for _ in range(20):
-        candidate = current / "node_modules" / ".bin" / tool_name
-        if candidate.is_file():
-            return str(candidate)
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    return None
+    return tool_cache.find_local(file_path, tool_name)
 
 
 def find_global_tool(tool_name: str) -> str | None:
     """Check if tool is available globally."""
-    try:
-        result = subprocess.run(
-            ["which", tool_name],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+    return tool_cache.which(tool_name)
 
 
 def find_biome(file_path: str) -> str | None:
@@ -115,134 +122,177 @@ def find_biome(file_path: str) -> str | None:
 # ── Formatters ──────────────────────────────────────────────────────
 
 
-def format_python(file_path: str) -> None:
+def _run_formatter(cmd: list[str], limit: float = FORMATTER_TIMEOUT) -> bool:
+    """Run one formatter call. Returns False if it could not complete."""
+    try:
+        subprocess.run(cmd, capture_output=True, timeout=_timeout(limit))
+        return True
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+
+
+# Each formatter returns True only if every one of its calls completed.
+
+
+def format_python(paths: list[str]) -> bool:
     """Format with Ruff (preferred) or Black (fallback)."""
     ruff = _resolve_tool("ruff")
-    if ruff:
-        try:
-            subprocess.run(
-                [ruff, "format", "--quiet", file_path],
-                capture_output=True,
-                timeout=10,
-            )
-            return
-        except (subprocess.TimeoutExpired, OSError):
-            pass
+    if ruff and _run_formatter([ruff, "format", "--quiet", *paths]):
+        return True
 
     # Fallback to Black
     black = _resolve_tool("black", BLACK_PATH_FALLBACK)
     if not black:
-        return
-    try:
-        subprocess.run(
-            [black, "--quiet", file_path],
-            capture_output=True,
-            timeout=10,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        return False
+    return _run_formatter([black, "--quiet", *paths])
 
 
-def format_go(file_path: str) -> None:
+def format_go(paths: list[str]) -> bool:
     """Format with gofmt."""
     gofmt = _resolve_tool("gofmt", GOFMT_PATH_FALLBACK)
     if not gofmt:
-        return
-    try:
-        subprocess.run(
-            [gofmt, "-w", file_path],
-            capture_output=True,
-            timeout=10,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
-
-
-def format_biome(file_path: str) -> None:
-    """Format with Biome in safe mode (no --unsafe)."""
-    biome = find_biome(file_path)
-    if not biome:
-        return
-    try:
-        subprocess.run(
-            [biome, "check", "--write", file_path],
-            capture_output=True,
-            timeout=12,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        return False
+    return _run_formatter([gofmt, "-w", *paths])
 
 
-def format_shell(file_path: str) -> None:
+def format_biome(paths: list[str]) -> bool:
+    """Format with Biome in safe mode (no --unsafe), once per biome binary."""
+    # Files from different projects may resolve to different local biomes
+    by_binary: dict[str, list[str]] = {}
+    for path in paths:
+        biome = find_biome(path)
+        if biome:
+            by_binary.setdefault(biome, []).append(path)
+    completed = [
+        _run_formatter([biome, "check", "--write", *files], BIOME_TIMEOUT)
+        for biome, files in by_binary.items()
+    ]
+    # Files with no biome binary were not formatted
+    resolved = sum(len(files) for files in by_binary.values())
+    return all(completed) and resolved == len(paths)
+
+
+def format_shell(paths: list[str]) -> bool:
     """Format with shfmt."""
     shfmt = _resolve_tool("shfmt")
     if not shfmt:
-        return
-    try:
-        subprocess.run(
-            [shfmt, "-w", file_path],
-            capture_output=True,
-            timeout=10,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        return False
+    return _run_formatter([shfmt, "-w", *paths])
 
 
-def format_dprint(file_path: str) -> None:
+def format_dprint(paths: list[str]) -> bool:
     """Format with dprint using the global config."""
     dprint = _resolve_tool("dprint")
     if not dprint:
-        return
+        return False
     if not os.path.isfile(DPRINT_CONFIG):
-        return
-    try:
-        subprocess.run(
-            [dprint, "fmt", "--config", DPRINT_CONFIG, file_path],
-            capture_output=True,
-            timeout=10,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        return False
+    return _run_formatter([dprint, "fmt", "--config", DPRINT_CONFIG, *paths])
 
 
-def format_rust(file_path: str) -> None:
+def format_rust(paths: list[str]) -> bool:
     """Format with rustfmt (conditional — only if installed)."""
     rustfmt = _resolve_tool("rustfmt")
     if not rustfmt:
-        return
-    try:
-        subprocess.run(
-            [rustfmt, file_path],
-            capture_output=True,
-            timeout=10,
-        )
-    except (subprocess.TimeoutExpired, OSError):
-        pass
+        return False
+    return _run_formatter([rustfmt, *paths])
 
 
 # ── Dispatch ────────────────────────────────────────────────────────
 
 
-def format_file(file_path: str) -> None:
-    """Dispatch to the correct formatter based on extension / filename."""
+def formatter_for(file_path: str) -> Callable[[list[str]], bool] | None:
+    """Return the formatter function for a file, or None."""
     path = Path(file_path)
     ext = path.suffix.lower()
     name = path.name
 
     if ext in PYTHON_EXTS:
-        format_python(file_path)
+        return format_python
     elif ext in GO_EXTS:
-        format_go(file_path)
+        return format_go
     elif ext in BIOME_EXTS:
-        format_biome(file_path)
+        return format_biome
     elif ext in SHELL_EXTS:
-        format_shell(file_path)
+        return format_shell
     elif ext in DPRINT_EXTS:
-        format_dprint(file_path)
+        return format_dprint
     elif ext in RUST_EXTS:
-        format_rust(file_path)
+        return format_rust
     elif name == "Dockerfile" or ext == ".dockerfile":
-        format_dprint(file_path)
+        return format_dprint
+    return None
+
+
+def formatter_tools(formatter: Callable, file_path: str) -> list[str | None]:
+    """Binaries (and global config) that decide a formatter's output."""
+    if formatter is format_python:
+        return [_resolve_tool("ruff"), _resolve_tool("black", BLACK_PATH_FALLBACK)]
+    if formatter is format_go:
+        return [_resolve_tool("gofmt", GOFMT_PATH_FALLBACK)]
+    if formatter is format_biome:
+        return [find_biome(file_path)]
+    if formatter is format_shell:
+        return [_resolve_tool("shfmt")]
+    if formatter is format_dprint:
+        return [_resolve_tool("dprint"), DPRINT_CONFIG]
+    if formatter is format_rust:
+        return [_resolve_tool("rustfmt")]
+    return []
+
+
+# Project config files that decide a formatter's output
+FORMATTER_CONFIGS = {
+    format_python: ("pyproject.toml", "ruff.toml", ".ruff.toml"),
+    format_biome: ("biome.json", "biome.jsonc", ".editorconfig"),
+    format_shell: (".editorconfig",),
+    format_rust: ("rustfmt.toml", ".rustfmt.toml"),
+}
+
+
+def _fingerprint(
+    cache: result_cache.ResultCache, formatter: Callable, path: str
+) -> list | None:
+    return cache.fingerprint(
+        path, formatter_tools(formatter, path), FORMATTER_CONFIGS.get(formatter, ())
+    )
+
+
+def format_files(
+    paths: list[str],
+    budget: float = FORMAT_BUDGET,
+    cache: result_cache.ResultCache | None = None,
+) -> None:
+    """Group paths by formatter and run each formatter once on its files.
+
+    With a *cache*, files already in the state a previous run left them in
+    are skipped, and files formatted now are recorded.
+    """
+    global _deadline
+    _deadline = time.monotonic() + budget
+
+    groups: dict[Callable[[list[str]], bool], list[str]] = {}
+    for path in paths:
+        formatter = formatter_for(path)
+        if formatter:
+            groups.setdefault(formatter, []).append(path)
+
+    for formatter, files in groups.items():
+        if time.monotonic() >= _deadline:
+            break
+        name = formatter.__name__
+        if cache is not None:
+            files = [
+                f
+                for f in files
+                if cache.get(name, f, _fingerprint(cache, formatter, f)) is None
+            ]
+            if not files:
+                continue
+        if formatter(files) and cache is not None:
+            # Fingerprint the formatted bytes: that is what the next Stop sees
+            for f in files:
+                cache.put(name, f, _fingerprint(cache, formatter, f), "")
 
 
 # ── Main ────────────────────────────────────────────────────────────
@@ -262,33 +312,19 @@ def main():
     if not session_id:
         sys.exit(0)
 
-    tmp_path = f"/tmp/claude-cq-edited-{session_id}"
-
-    try:
-        with open(tmp_path) as f:
-            raw_paths = f.read().splitlines()
-    except FileNotFoundError:
-        sys.exit(0)
-    except OSError:
-        sys.exit(0)
-    finally:
-        # Always clean up the temp file
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+    # Edits since this hook last ran; other Stop hooks keep their own cursor
+    cursor = edit_journal.Cursor(session_id, "format")
+    edits = cursor.read()
+    cursor.commit()
 
     # Deduplicate while preserving order, filter to existing files
-    seen: set[str] = set()
-    paths: list[str] = []
-    for p in raw_paths:
-        p = p.strip()
-        if p and p not in seen and os.path.isfile(p):
-            seen.add(p)
-            paths.append(p)
+    paths = [p for p in edit_journal.unique_paths(edits) if os.path.isfile(p)]
+    if not paths:
+        sys.exit(0)
 
-    for path in paths:
-        format_file(path)
+    cache = result_cache.ResultCache("format")
+    format_files(paths, cache=cache)
+    cache.save()
 
     sys.exit(0)
 
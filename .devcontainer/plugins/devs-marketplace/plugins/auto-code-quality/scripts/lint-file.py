@@ -2,9 +2,10 @@
 """
 Batch linter — runs as a Stop hook.
 
-Reads file paths collected by collect-edited-files.py during the
-conversation turn, deduplicates them, and lints each based on
-extension:
+Reads the file paths edit_journal.py recorded since the last lint run
+(written by collect-edited-files.py), deduplicates them, and lints them
+based on extension (Pyright, Ruff and Biome get one invocation for all
+their files, clippy one per Cargo package; the others run per file):
   .py / .pyi         → Pyright (type checking) + Ruff check (style/correctness)
   .js/.jsx/.ts/…     → Biome lint
   .css/.graphql/…    → Biome lint
@@ -13,16 +14,37 @@ extension:
   Dockerfile         → hadolint
   .rs                → clippy (conditional)
 
+Linters run concurrently on a bounded worker pool under a global deadline.
+Results are reported grouped by linter in a fixed order; if the budget runs
+out, whatever finished is reported and the remaining checks are skipped.
+
+Setting CODEFORGE_PYRIGHT_LSP=1 makes Pyright diagnostics come from a
+persistent per-workspace language server (pyright_session.py) instead of a
+cold `pyright --outputjson` per Stop.
+
+Results of file-local linters (Ruff, Biome, ShellCheck, hadolint) are kept
+in a per-project content-hash cache (result_cache.py); a file whose bytes,
+linter binary and linter config are unchanged is not linted again and its
+last diagnostics are replayed.
+
 Outputs JSON with additionalContext containing lint warnings.
-Always cleans up the temp file. Always exits 0.
+Always advances its journal cursor, so an edit is linted once. Always exits 0.
 """
 
 import json
 import os
 import subprocess
 import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
+import edit_journal
+import pyright_session
+import result_cache
+import tool_cache
+
 # ── Extension sets ──────────────────────────────────────────────────
 
 PYTHON_EXTS = {".py", ".pyi"}
@@ -45,33 +67,66 @@ RUST_EXTS = {".rs"}
 
 SUBPROCESS_TIMEOUT = 10
 
+# Pyright, Ruff and Biome get one invocation for all files of a turn and
+# clippy one per package, so their calls are allowed longer than a
+# single-file check
+BATCH_TIMEOUT = 30
+
+# Total time for one Stop, kept below the 60s hook timeout so partial
+# results are still reported instead of the hook being killed.
+LINT_BUDGET = 45
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Report order for linter sections
+LINTER_ORDER = [
+    "Pyright",
+    "Ruff",
+    "Biome",
+    "ShellCheck",
+    "go vet",
+    "hadolint",
+    "clippy",
+]
+
+# Linters whose output depends only on the file and its config, with the
+# tool and config file names that decide it. Pyright, go vet and clippy look
+# at imports, packages and crates, so their results are never replayed.
+CACHEABLE_LINTERS = {
+    "Ruff": ("ruff", ("pyproject.toml", "ruff.toml", ".ruff.toml")),
+    "Biome": ("biome", ("biome.json", "biome.jsonc")),
+    "ShellCheck": ("shellcheck", (".shellcheckrc",)),
+    "hadolint": ("hadolint", (".hadolint.yaml", ".hadolint.yml")),
+}
+
+# Monotonic time at which the current run's budget is exhausted
+_deadline = float("inf")
+
+
+class Transient(str):
+    """A message about the lint run itself (timeout, crash), not the file.
+
+    Reported like any other message but never stored in the result cache.
+    """
+
+
+def _timeout(limit: float = SUBPROCESS_TIMEOUT) -> float:
+    """Per-subprocess timeout, capped by what is left of the lint budget."""
+    remaining = _deadline - time.monotonic()
+    return max(0.1, min(limit, remaining))
+
 
 # ── Tool resolution ─────────────────────────────────────────────────
 
 
 def _which(name: str) -> str | None:
     """Check if a tool is available in PATH."""
-    try:
-        result = subprocess.run(["which", name], capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+    return tool_cache.which(name)
 
 
 def _find_tool_upward(file_path: str, tool_name: str) -> str | None:
     """Walk up from file directory looking for node_modules/.bin/<tool>."""
-    current = Path(file_path).parent
-    for _ in range(20):
-        candidate = current / "node_modules" / ".bin" / tool_name
-        if candidate.is_file():
-            return str(candidate)
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    return None
+    return tool_cache.find_local(file_path, tool_name)
 
 
 def _find_biome(file_path: str) -> str | None:
@@ -117,126 +172,200 @@ def _format_issues(filename: str, diagnostics: list[dict]) -> str:
 # ── Linters ─────────────────────────────────────────────────────────
 
 
-def lint_python_pyright(file_path: str) -> str:
-    """Run Pyright type checker on a Python file."""
+def _split_by_file(
+    paths: list[str], diagnostics: list[tuple[str, dict]]
+) -> list[str]:
+    """Group (reported file, diagnostic) pairs back onto the linted paths.
+
+    Returns one formatted block per path, in the order of *paths* ("" for
+    a clean file). Reported files are matched by resolved path.
+    """
+    by_key: dict[str, list[dict]] = {os.path.realpath(p): [] for p in paths}
+    for reported, diag in diagnostics:
+        key = os.path.realpath(reported)
+        if key in by_key:
+            by_key[key].append(diag)
+
+    return [
+        _format_issues(Path(path).name, by_key[os.path.realpath(path)])
+        for path in paths
+    ]
+
+
+def _batch_failed(paths: list[str], message: str = "") -> list[str]:
+    """Per-file results for a batch call that produced no usable output."""
+    return [Transient(message)] + [Transient("")] * (len(paths) - 1)
+
+
+def _pyright_langserver() -> list[str] | None:
+    """Command for a pyright language server on PATH, if any."""
+    for name in pyright_session.SERVER_NAMES:
+        found = _which(name)
+        if found:
+            return [found, "--stdio"]
+    return None
+
+
+def lint_python_pyright(paths: list[str]) -> list[str]:
+    """Run Pyright type checker once on a batch of Python files.
+
+    With CODEFORGE_PYRIGHT_LSP set, diagnostics come from a warm language
+    server session (pyright_session.py); the CLI is the fallback.
+    """
+    if pyright_session.enabled():
+        command = _pyright_langserver()
+        if command:
+            diagnostics = pyright_session.check(
+                paths, os.getcwd(), command, _timeout(BATCH_TIMEOUT)
+            )
+            if diagnostics is not None:
+                return _split_by_file(paths, diagnostics)
+
     pyright = _which("pyright")
     if not pyright:
-        return ""
+        return [""] * len(paths)
 
     try:
         result = subprocess.run(
-            [pyright, "--outputjson", file_path],
+            [pyright, "--outputjson", *paths],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
+            timeout=_timeout(BATCH_TIMEOUT),
         )
 
         try:
             output = json.loads(result.stdout)
         except json.JSONDecodeError:
-            return ""
+            return _batch_failed(paths)
 
         diagnostics = output.get("generalDiagnostics", [])
         if not diagnostics:
-            return ""
+            return [""] * len(paths)
 
         parsed = [
-            {
-                "severity": d.get("severity", "info"),
-                "line": d.get("range", {}).get("start", {}).get("line", 0) + 1,
-                "message": d.get("message", ""),
-            }
+            (
+                d.get("file", ""),
+                {
+                    "severity": d.get("severity", "info"),
+                    "line": d.get("range", {}).get("start", {}).get("line", 0) + 1,
+                    "message": d.get("message", ""),
+                },
+            )
             for d in diagnostics
         ]
-        return _format_issues(Path(file_path).name, parsed)
+        return _split_by_file(paths, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: pyright timed out"
+        return _batch_failed(paths, f"  {len(paths)} file(s): pyright timed out")
     except Exception:
-        return ""
+        return _batch_failed(paths)
 
 
-def lint_python_ruff(file_path: str) -> str:
-    """Run Ruff linter on a Python file."""
+def lint_python_ruff(paths: list[str]) -> list[str]:
+    """Run Ruff linter once on a batch of Python files."""
     ruff = _which("ruff")
     if not ruff:
-        return ""
+        return [""] * len(paths)
 
     try:
         result = subprocess.run(
-            [ruff, "check", "--output-format=json", "--no-fix", file_path],
+            [ruff, "check", "--output-format=json", "--no-fix", *paths],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
+            timeout=_timeout(BATCH_TIMEOUT),
         )
 
         try:
             issues = json.loads(result.stdout)
         except json.JSONDecodeError:
-            return ""
+            return _batch_failed(paths)
 
         if not issues:
-            return ""
+            return [""] * len(paths)
 
         parsed = [
-            {
-                "severity": "warning",
-                "line": issue.get("location", {}).get("row", 0),
-                "message": f"[{issue.get('code', '?')}] {issue.get('message', '')}",
-            }
+            (
+                issue.get("filename", ""),
+                {
+                    "severity": "warning",
+                    "line": issue.get("location", {}).get("row", 0),
+                    "message": f"[{issue.get('code', '?')}] {issue.get('message', '')}",
+                },
+            )
             for issue in issues
         ]
-        return _format_issues(Path(file_path).name, parsed)
+        return _split_by_file(paths, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: ruff timed out"
+        return _batch_failed(paths, f"  {len(paths)} file(s): ruff timed out")
     except Exception:
-        return ""
+        return _batch_failed(paths)
 
 
-def lint_biome(file_path: str) -> str:
-    """Run Biome linter for JS/TS/CSS/GraphQL files."""
-    biome = _find_biome(file_path)
-    if not biome:
-        return ""
+def _biome_file(diag: dict) -> str:
+    """Path of the file a Biome JSON diagnostic refers to."""
+    path = diag.get("location", {}).get("path", {})
+    return path.get("file", "") if isinstance(path, dict) else str(path or "")
 
-    try:
-        result = subprocess.run(
-            [biome, "lint", "--reporter=json", file_path],
-            capture_output=True,
-            text=True,
-            timeout=SUBPROCESS_TIMEOUT,
-        )
 
-        try:
-            output = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            return ""
+def _biome_line(diag: dict) -> int:
+    span = diag.get("location", {}).get("span", {})
+    if isinstance(span, dict) and isinstance(span.get("start"), int):
+        return span["start"]
+    return 0
 
-        diagnostics = output.get("diagnostics", [])
-        if not diagnostics:
-            return ""
 
-        parsed = [
-            {
-                "severity": d.get("severity", "warning"),
-                "line": (
-                    d.get("location", {}).get("span", {}).get("start", {})
-                    if isinstance(
-                        d.get("location", {}).get("span", {}).get("start"), int
-                    )
-                    else 0
-                ),
-                "message": d.get("description", d.get("message", "")),
-            }
-            for d in diagnostics
-        ]
-        return _format_issues(Path(file_path).name, parsed)
+def lint_biome(paths: list[str]) -> list[str]:
+    """Run Biome linter for JS/TS/CSS/GraphQL files, once per biome binary."""
+    # Files from different projects may resolve to different local biomes
+    by_binary: dict[str, list[str]] = {}
+    for path in paths:
+        biome = _find_biome(path)
+        if biome:
+            by_binary.setdefault(biome, []).append(path)
+
+    parsed: list[tuple[str, dict]] = []
+    timed_out: list[str] = []
+    failed: set[str] = set()
+    for biome, files in by_binary.items():
+        try:
+            result = subprocess.run(
+                [biome, "lint", "--reporter=json", *files],
+                capture_output=True,
+                text=True,
+                timeout=_timeout(BATCH_TIMEOUT),
+            )
+            output = json.loads(result.stdout)
+        except subprocess.TimeoutExpired:
+            timed_out.extend(files)
+            failed.update(files)
+            continue
+        except Exception:
+            failed.update(files)
+            continue
+
+        for d in output.get("diagnostics", []):
+            parsed.append(
+                (
+                    _biome_file(d),
+                    {
+                        "severity": d.get("severity", "warning"),
+                        "line": _biome_line(d),
+                        "message": d.get("description", d.get("message", "")),
+                    },
+                )
+            )
 
-    except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: biome lint timed out"
-    except Exception:
-        return ""
+    results = [
+        Transient("") if path in failed else msg
+        for path, msg in zip(paths, _split_by_file(paths, parsed))
+    ]
+    if timed_out:
+        first = paths.index(timed_out[0])
+        results[first] = Transient(
+            f"  {len(timed_out)} file(s): biome lint timed out"
+        )
+    return results
 
 
 def lint_shellcheck(file_path: str) -> str:
@@ -250,13 +379,13 @@ def lint_shellcheck(file_path: str) -> str:
             [shellcheck, "--format=json", file_path],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
+            timeout=_timeout(),
         )
 
         try:
             issues = json.loads(result.stdout)
         except json.JSONDecodeError:
-            return ""
+            return Transient("")
 
         if not issues:
             return ""
@@ -278,9 +407,9 @@ def lint_shellcheck(file_path: str) -> str:
         return _format_issues(Path(file_path).name, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: shellcheck timed out"
+        return Transient(f"  {Path(file_path).name}: shellcheck timed out")
     except Exception:
-        return ""
+        return Transient("")
 
 
 def lint_go_vet(file_path: str) -> str:
@@ -294,7 +423,7 @@ def lint_go_vet(file_path: str) -> str:
             [go, "vet", file_path],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
+            timeout=_timeout(),
         )
 
         # go vet outputs to stderr
@@ -331,9 +460,9 @@ def lint_go_vet(file_path: str) -> str:
         return _format_issues(Path(file_path).name, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: go vet timed out"
+        return Transient(f"  {Path(file_path).name}: go vet timed out")
     except Exception:
-        return ""
+        return Transient("")
 
 
 def lint_hadolint(file_path: str) -> str:
@@ -347,13 +476,13 @@ def lint_hadolint(file_path: str) -> str:
             [hadolint, "--format", "json", file_path],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
+            timeout=_timeout(),
         )
 
         try:
             issues = json.loads(result.stdout)
         except json.JSONDecodeError:
-            return ""
+            return Transient("")
 
         if not issues:
             return ""
@@ -375,31 +504,43 @@ def lint_hadolint(file_path: str) -> str:
         return _format_issues(Path(file_path).name, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: hadolint timed out"
+        return Transient(f"  {Path(file_path).name}: hadolint timed out")
     except Exception:
-        return ""
+        return Transient("")
 
 
-def lint_clippy(file_path: str) -> str:
-    """Run clippy on a Rust file (conditional — only if cargo is in PATH)."""
-    cargo = _which("cargo")
-    if not cargo:
-        return ""
+def _cargo_package_dir(file_path: str) -> Path:
+    """Directory of the nearest Cargo.toml above a Rust file."""
+    start = Path(file_path).resolve().parent
+    for directory in (start, *start.parents):
+        if (directory / "Cargo.toml").is_file():
+            return directory
+    return start
+
+
+def _span_path(file_name: str, package_dir: Path) -> str:
+    """Resolve a clippy span file, reported relative to the workspace root."""
+    if os.path.isabs(file_name):
+        return file_name
+    for directory in (package_dir, *package_dir.parents):
+        if (directory / file_name).is_file():
+            return str(directory / file_name)
+    return str(package_dir / file_name)
 
+
+def _clippy_package(cargo: str, package_dir: Path, paths: list[str]) -> list[str]:
+    """Run clippy once for one package and split its diagnostics per file."""
     try:
         result = subprocess.run(
             [cargo, "clippy", "--message-format=json", "--", "-W", "clippy::all"],
             capture_output=True,
             text=True,
-            timeout=SUBPROCESS_TIMEOUT,
-            cwd=str(Path(file_path).parent),
+            timeout=_timeout(BATCH_TIMEOUT),
+            cwd=str(package_dir),
         )
 
-        lines = result.stdout.strip().splitlines()
         parsed = []
-        target_name = Path(file_path).name
-
-        for line in lines:
+        for line in result.stdout.strip().splitlines():
             try:
                 msg = json.loads(line)
             except json.JSONDecodeError:
@@ -412,29 +553,217 @@ def lint_clippy(file_path: str) -> str:
             if level not in ("warning", "error"):
                 continue
 
-            # Match diagnostics to the target file
+            # Crate-level messages without a location go to the first file
             spans = inner.get("spans", [])
-            line_num = 0
-            for span in spans:
-                if span.get("is_primary") and target_name in span.get("file_name", ""):
-                    line_num = span.get("line_start", 0)
-                    break
+            primary = next((s for s in spans if s.get("is_primary")), None)
+            if primary is not None:
+                reported = _span_path(primary.get("file_name", ""), package_dir)
+                line_num = primary.get("line_start", 0)
+            elif spans:
+                continue
+            else:
+                reported, line_num = paths[0], 0
 
-            if line_num or not spans:
-                parsed.append(
+            parsed.append(
+                (
+                    reported,
                     {
                         "severity": level,
                         "line": line_num,
                         "message": inner.get("message", ""),
-                    }
+                    },
                 )
+            )
 
-        return _format_issues(Path(file_path).name, parsed)
+        return _split_by_file(paths, parsed)
 
     except subprocess.TimeoutExpired:
-        return f"  {Path(file_path).name}: clippy timed out"
+        return _batch_failed(paths, f"  {len(paths)} file(s): clippy timed out")
     except Exception:
-        return ""
+        return _batch_failed(paths)
+
+
+def lint_clippy(paths: list[str]) -> list[str]:
+    """Run clippy once per Cargo package on a batch of Rust files.
+
+    Conditional — only if cargo is in PATH. Packages run one after another:
+    cargo holds a lock on the build directory, so parallel runs would only
+    wait for each other.
+    """
+    cargo = _which("cargo")
+    if not cargo:
+        return [""] * len(paths)
+
+    packages: dict[Path, list[str]] = {}
+    for path in paths:
+        packages.setdefault(_cargo_package_dir(path), []).append(path)
+
+    results: dict[str, str] = {}
+    for package_dir, files in packages.items():
+        results.update(zip(files, _clippy_package(cargo, package_dir, files)))
+    return [results[path] for path in paths]
+
+
+# ── Scheduling ──────────────────────────────────────────────────────
+
+
+# Linters that take every file of a turn in one call; the rest run once per
+# file
+BATCHED_LINTERS = frozenset({"Pyright", "Ruff", "Biome", "clippy"})
+
+
+def linters_for(path: str) -> list[tuple[str, Callable]]:
+    """Return the (linter name, lint function) pairs that apply to a file.
+
+    Functions of BATCHED_LINTERS take a list of paths and return one message
+    per path ("" when clean); the others take one path and return one
+    message.
+    """
+    ext = Path(path).suffix.lower()
+    name = Path(path).name
+
+    if ext in PYTHON_EXTS:
+        return [("Pyright", lint_python_pyright), ("Ruff", lint_python_ruff)]
+    if ext in BIOME_EXTS:
+        return [("Biome", lint_biome)]
+    if ext in SHELL_EXTS:
+        return [("ShellCheck", lint_shellcheck)]
+    if ext in GO_EXTS:
+        return [("go vet", lint_go_vet)]
+    if name == "Dockerfile" or ext == ".dockerfile":
+        return [("hadolint", lint_hadolint)]
+    if ext in RUST_EXTS:
+        return [("clippy", lint_clippy)]
+    return []
+
+
+def plan_jobs(paths: list[str]) -> list[tuple[str, Callable, list[str]]]:
+    """Group files into (linter, lint function, files) jobs.
+
+    Batched linters get one job with all of their files (in edit order);
+    other linters get one job per file.
+    """
+    files_by_linter: dict[str, list[str]] = {}
+    fn_by_linter: dict[str, Callable] = {}
+    for path in paths:
+        for linter, lint_fn in linters_for(path):
+            files_by_linter.setdefault(linter, []).append(path)
+            fn_by_linter[linter] = lint_fn
+
+    jobs = []
+    for linter in LINTER_ORDER:
+        files = files_by_linter.get(linter)
+        if not files:
+            continue
+        if linter in BATCHED_LINTERS:
+            jobs.append((linter, fn_by_linter[linter], files))
+        else:
+            jobs.extend((linter, fn_by_linter[linter], [f]) for f in files)
+    return jobs
+
+
+def _run_job(linter: str, lint_fn: Callable, files: list[str]) -> list[str]:
+    if linter in BATCHED_LINTERS:
+        return lint_fn(files)
+    return [lint_fn(files[0])]
+
+
+def _fingerprint(
+    cache: result_cache.ResultCache, linter: str, path: str
+) -> list | None:
+    tool, config_names = CACHEABLE_LINTERS[linter]
+    binary = _find_biome(path) if tool == "biome" else _which(tool)
+    return cache.fingerprint(path, [binary], config_names)
+
+
+def _replay_cached(
+    jobs: list[tuple[str, Callable, list[str]]],
+    cache: result_cache.ResultCache,
+    results: dict[tuple[str, str], str],
+    fingerprints: dict[tuple[str, str], list | None],
+) -> list[tuple[str, Callable, list[str]]]:
+    """Fill *results* from the cache and drop cached files from *jobs*.
+
+    Fingerprints of the files that still need linting are recorded in
+    *fingerprints* so their results can be stored afterwards.
+    """
+    remaining = []
+    for linter, lint_fn, files in jobs:
+        if linter not in CACHEABLE_LINTERS:
+            remaining.append((linter, lint_fn, files))
+            continue
+        todo = []
+        for path in files:
+            fingerprint = _fingerprint(cache, linter, path)
+            cached = cache.get(linter, path, fingerprint)
+            if cached is None:
+                fingerprints[(linter, path)] = fingerprint
+                todo.append(path)
+            else:
+                results[(linter, path)] = cached
+        if todo:
+            remaining.append((linter, lint_fn, todo))
+    return remaining
+
+
+def run_linters(
+    paths: list[str],
+    budget: float = LINT_BUDGET,
+    cache: result_cache.ResultCache | None = None,
+) -> tuple[dict[str, list[str]], int]:
+    """Lint all paths on a worker pool within *budget* seconds.
+
+    With a *cache*, files of CACHEABLE_LINTERS whose fingerprint matches a
+    stored result are not linted; the stored diagnostics are reported
+    instead, and fresh results are stored for next time.
+
+    Returns:
+        (results grouped by linter in LINTER_ORDER, number of file checks
+        skipped because the budget ran out). Within a linter, results keep
+        the order the files were edited in.
+    """
+    global _deadline
+    _deadline = time.monotonic() + budget
+
+    planned = plan_jobs(paths)
+    if not planned:
+        return {}, 0
+
+    results: dict[tuple[str, str], str] = {}
+    fingerprints: dict[tuple[str, str], list | None] = {}
+    jobs = planned
+    if cache is not None:
+        jobs = _replay_cached(planned, cache, results, fingerprints)
+
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    futures = {
+        pool.submit(_run_job, linter, lint_fn, files): (linter, files)
+        for linter, lint_fn, files in jobs
+    }
+    done, pending = wait(futures, timeout=budget)
+    # Queued checks are dropped; running ones end by the deadline on their own
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        linter, files = futures[future]
+        try:
+            msgs = future.result()
+        except Exception:
+            continue
+        for path, msg in zip(files, msgs):
+            key = (linter, path)
+            results[key] = msg
+            if key in fingerprints and not isinstance(msg, Transient):
+                cache.put(linter, path, fingerprints[key], msg)
+
+    grouped: dict[str, list[str]] = {}
+    for linter, _fn, files in planned:
+        for path in files:
+            msg = results.get((linter, path))
+            if msg:
+                grouped.setdefault(linter, []).append(msg)
+    skipped = sum(len(futures[future][1]) for future in pending)
+    return grouped, skipped
 
 
 # ── Main ────────────────────────────────────────────────────────────
@@ -453,79 +782,31 @@ def main():
     if not session_id:
         sys.exit(0)
 
-    tmp_path = f"/tmp/claude-cq-lint-{session_id}"
-
-    try:
-        with open(tmp_path) as f:
-            raw_paths = f.read().splitlines()
-    except FileNotFoundError:
-        sys.exit(0)
-    except OSError:
-        sys.exit(0)
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+    # Edits since this hook last ran; other Stop hooks keep their own cursor
+    cursor = edit_journal.Cursor(session_id, "lint")
+    edits = cursor.read()
+    cursor.commit()
 
     # Deduplicate, filter to existing files
-    seen: set[str] = set()
-    paths: list[str] = []
-    for p in raw_paths:
-        p = p.strip()
-        if p and p not in seen and os.path.isfile(p):
-            seen.add(p)
-            paths.append(p)
+    paths = [p for p in edit_journal.unique_paths(edits) if os.path.isfile(p)]
 
     if not paths:
         sys.exit(0)
 
-    # Collect results grouped by linter
-    all_results: dict[str, list[str]] = {}
-
-    for path in paths:
-        ext = Path(path).suffix.lower()
-        name = Path(path).name
-
-        if ext in PYTHON_EXTS:
-            msg = lint_python_pyright(path)
-            if msg:
-                all_results.setdefault("Pyright", []).append(msg)
-            msg = lint_python_ruff(path)
-            if msg:
-                all_results.setdefault("Ruff", []).append(msg)
-
-        elif ext in BIOME_EXTS:
-            msg = lint_biome(path)
-            if msg:
-                all_results.setdefault("Biome", []).append(msg)
-
-        elif ext in SHELL_EXTS:
-            msg = lint_shellcheck(path)
-            if msg:
-                all_results.setdefault("ShellCheck", []).append(msg)
-
-        elif ext in GO_EXTS:
-            msg = lint_go_vet(path)
-            if msg:
-                all_results.setdefault("go vet", []).append(msg)
-
-        elif name == "Dockerfile" or ext == ".dockerfile":
-            msg = lint_hadolint(path)
-            if msg:
-                all_results.setdefault("hadolint", []).append(msg)
-
-        elif ext in RUST_EXTS:
-            msg = lint_clippy(path)
-            if msg:
-                all_results.setdefault("clippy", []).append(msg)
-
-    if all_results:
-        sections = []
-        for linter_name, results in all_results.items():
-            sections.append(
-                f"[Auto-linter] {linter_name} results:\n" + "\n".join(results)
-            )
+    cache = result_cache.ResultCache("lint")
+    all_results, skipped = run_linters(paths, cache=cache)
+    cache.save()
+
+    sections = [
+        f"[Auto-linter] {linter_name} results:\n" + "\n".join(results)
+        for linter_name, results in all_results.items()
+    ]
+    if skipped:
+        sections.append(
+            f"[Auto-linter] Lint budget ({LINT_BUDGET}s) exhausted — "
+            f"{skipped} check(s) skipped"
+        )
+    if sections:
         output = "\n\n".join(sections)
         print(json.dumps({"additionalContext": output}))
 
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Persistent pyright language-server session for lint-file.py (opt-in).
+
+`pyright --outputjson` cold-starts a type checker on every Stop. With
+CODEFORGE_PYRIGHT_LSP=1 set, lint-file.py instead asks a long-lived session
+daemon for diagnostics. The daemon keeps one pyright-langserver (or
+basedpyright-langserver) warm per workspace:
+
+  lint-file.py ──unix socket──▶ pyright_session.py serve ──stdio/LSP──▶ langserver
+
+Each request opens the edited files (textDocument/didOpen with their text on
+disk), returns the diagnostics the server publishes for them and closes them
+again (didClose). Nothing stays open between requests, so every other file,
+including ones a checkout, a Bash edit or the formatter changed since, is
+read by the server from disk; its parsed modules and import resolution stay
+warm between Stops.
+
+The daemon is spawned on demand by the first request, listens on
+/tmp/claude-cq-pyright-{uid}-{workspace-hash}.sock (owner-only) and exits
+after IDLE_TIMEOUT seconds without a request or when the language server
+dies. Any failure makes check() return None, and lint-file.py falls back to
+the pyright CLI.
+
+Wire format: one JSON line per direction per connection:
+  request:  {"files": [absolute paths], "timeout": seconds}
+  response: {"diagnostics": [[file, {"severity", "line", "message"}], ...]}
+            or {"error": "..."}
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ENV_FLAG = "CODEFORGE_PYRIGHT_LSP"
+
+# Language servers tried in order; the first one on PATH is used
+SERVER_NAMES = ("pyright-langserver", "basedpyright-langserver")
+
+# Daemon exits after this long without a request
+IDLE_TIMEOUT = 1800
+
+# How long a client waits for a freshly spawned daemon's socket to appear
+SPAWN_TIMEOUT = 5.0
+
+# Initialize handshake; pyright reads its config and typeshed here
+INITIALIZE_TIMEOUT = 30.0
+
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+# LSP DiagnosticSeverity → lint-file.py severity
+SEVERITIES = {1: "error", 2: "warning", 3: "info", 4: "info"}
+
+
+def enabled() -> bool:
+    """True when the persistent session is switched on via the environment."""
+    return os.environ.get(ENV_FLAG, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def socket_path(root: str) -> str:
+    """Socket of the session daemon for a workspace."""
+    digest = hashlib.sha1(os.path.realpath(root).encode()).hexdigest()[:12]
+    return f"/tmp/claude-cq-pyright-{os.getuid()}-{digest}.sock"
+
+
+def path_to_uri(path: str) -> str:
+    return Path(path).resolve().as_uri()
+
+
+# ── Language server ─────────────────────────────────────────────────
+
+
+class LanguageServer:
+    """JSON-RPC over stdio with one language-server process."""
+
+    def __init__(self, command: list[str], root: str):
+        self.root = root
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=root,
+        )
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._responses: dict[int, dict] = {}
+        # uri → (publication sequence number, version, diagnostics)
+        self._published: dict[str, tuple[int, int | None, list]] = {}
+        self._seq = 0
+        # Documents open during the current request
+        self._open: set[str] = set()
+        # uri → last version sent, so a reopened document never reuses one
+        self._versions: dict[str, int] = {}
+        # Set once the server reports document versions with diagnostics
+        self._versioned = False
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    # -- transport --
+
+    def _send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        header = f"Content-Length: {len(body)}\r\n\r\n".encode()
+        with self._write_lock:
+            self.proc.stdin.write(header + body)
+            self.proc.stdin.flush()
+
+    def _read_message(self) -> dict | None:
+        stdout = self.proc.stdout
+        length = None
+        while True:
+            line = stdout.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii", "replace").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            return {}
+        return json.loads(stdout.read(length))
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                message = self._read_message()
+                if message is None:
+                    break
+                self._dispatch(message)
+        except (OSError, ValueError):
+            pass
+        with self._cond:
+            self._cond.notify_all()
+
+    def _dispatch(self, message: dict) -> None:
+        method = message.get("method")
+        if method is None:
+            # Response to one of our requests
+            with self._cond:
+                self._responses[message.get("id")] = message
+                self._cond.notify_all()
+        elif "id" in message:
+            # Server → client request; the defaults are fine for all of them
+            result = None
+            if method == "workspace/configuration":
+                result = [None] * len(message.get("params", {}).get("items", []))
+            self._send({"id": message["id"], "result": result})
+        elif method == "textDocument/publishDiagnostics":
+            params = message.get("params", {})
+            uri = params.get("uri", "")
+            version = params.get("version")
+            with self._cond:
+                self._versioned = self._versioned or version is not None
+                # Drop what arrives for closed documents (the server clearing
+                # them after didClose), late or not
+                if uri not in self._open or (self._versioned and version is None):
+                    return
+                self._seq += 1
+                self._published[uri] = (
+                    self._seq,
+                    version,
+                    params.get("diagnostics", []),
+                )
+                self._cond.notify_all()
+
+    def request(self, method: str, params: dict, timeout: float):
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        self._send({"id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while request_id not in self._responses:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.alive():
+                    raise TimeoutError(method)
+                self._cond.wait(remaining)
+            response = self._responses.pop(request_id)
+        if "error" in response:
+            raise RuntimeError(response["error"].get("message", method))
+        return response.get("result")
+
+    def notify(self, method: str, params: dict) -> None:
+        self._send({"method": method, "params": params})
+
+    # -- LSP --
+
+    def initialize(self, timeout: float = INITIALIZE_TIMEOUT) -> None:
+        root_uri = path_to_uri(self.root)
+        self.request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": root_uri,
+                "workspaceFolders": [
+                    {"uri": root_uri, "name": Path(self.root).name or "/"}
+                ],
+                "capabilities": {
+                    "textDocument": {
+                        "synchronization": {"didSave": True},
+                        "publishDiagnostics": {"versionSupport": True},
+                    },
+                    "workspace": {"configuration": True, "workspaceFolders": True},
+                },
+            },
+            timeout,
+        )
+        self.notify("initialized", {})
+
+    def _open_document(self, path: str) -> tuple[str, int]:
+        """Send a file's text on disk as didOpen. Returns (uri, version)."""
+        uri = path_to_uri(path)
+        text = Path(path).read_text(errors="replace")
+        version = self._versions.get(uri, 0) + 1
+        self._versions[uri] = version
+        with self._cond:
+            self._open.add(uri)
+        self.notify(
+            "textDocument/didOpen",
+            {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": "python",
+                    "version": version,
+                    "text": text,
+                }
+            },
+        )
+        return uri, version
+
+    def _close_documents(self, uris: list[str]) -> None:
+        with self._cond:
+            self._open.difference_update(uris)
+        for uri in uris:
+            self.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    def _fresh(self, uri: str, seq: int, version: int) -> bool:
+        published = self._published.get(uri)
+        if not published or published[0] <= seq:
+            return False
+        return published[1] is None or published[1] >= version
+
+    def diagnostics(self, paths: list[str], timeout: float) -> list[tuple[str, dict]]:
+        """Open *paths*, return their diagnostics once the server reports, close.
+
+        Raises TimeoutError if a file is not reported in time.
+        """
+        with self._cond:
+            seq = self._seq
+        opened: list[tuple[str, int]] = []
+        try:
+            for path in dict.fromkeys(paths):
+                opened.append(self._open_document(path))
+
+            deadline = time.monotonic() + timeout
+            with self._cond:
+                while not all(self._fresh(uri, seq, v) for uri, v in opened):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self.alive():
+                        raise TimeoutError("diagnostics")
+                    self._cond.wait(remaining)
+                published = {uri: self._published.pop(uri) for uri, _ in opened}
+        finally:
+            if self.alive():
+                self._close_documents([uri for uri, _ in opened])
+
+        results = []
+        for path in dict.fromkeys(paths):
+            _seq, _version, diags = published.get(path_to_uri(path), (0, None, []))
+            for d in diags:
+                results.append(
+                    (
+                        path,
+                        {
+                            "severity": SEVERITIES.get(d.get("severity", 1), "info"),
+                            "line": d.get("range", {}).get("start", {}).get("line", 0)
+                            + 1,
+                            "message": d.get("message", ""),
+                        },
+                    )
+                )
+        return results
+
+    def shutdown(self) -> None:
+        try:
+            if self.alive():
+                self.request("shutdown", {}, 2.0)
+                self.notify("exit", {})
+                self.proc.wait(timeout=2.0)
+        except (OSError, RuntimeError, TimeoutError, subprocess.TimeoutExpired):
+            pass
+        if self.alive():
+            self.proc.kill()
+
+
+# ── Daemon ──────────────────────────────────────────────────────────
+
+
+def bind_socket(path: str) -> socket.socket | None:
+    """Bind the daemon socket. Returns None if a live daemon already owns it."""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return None
+        except OSError:
+            os.unlink(path)
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(path)
+    except OSError:
+        server.close()
+        return None
+    finally:
+        os.umask(old_umask)
+    server.listen(8)
+    return server
+
+
+def _recv_line(conn: socket.socket) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n") or size > MAX_LINE_BYTES:
+            break
+    return b"".join(chunks)
+
+
+def handle_connection(conn: socket.socket, server: LanguageServer) -> None:
+    """Serve one diagnostics request."""
+    try:
+        request = json.loads(_recv_line(conn))
+        files = [f for f in request.get("files", []) if os.path.isfile(f)]
+        diagnostics = server.diagnostics(files, float(request.get("timeout", 30)))
+        response = {"diagnostics": diagnostics}
+    except (ValueError, OSError, RuntimeError, TimeoutError) as e:
+        response = {"error": f"{type(e).__name__}: {e}"}
+    conn.sendall(json.dumps(response).encode() + b"\n")
+
+
+def serve(
+    listener: socket.socket,
+    path: str,
+    server: LanguageServer,
+    idle_timeout: float = IDLE_TIMEOUT,
+) -> None:
+    """Serve requests one at a time until idle or the server dies."""
+    listener.settimeout(idle_timeout)
+    try:
+        while server.alive():
+            try:
+                conn, _ = listener.accept()
+            except TimeoutError:
+                break
+            with conn:
+                conn.settimeout(None)
+                try:
+                    handle_connection(conn, server)
+                except OSError:
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        server.shutdown()
+
+
+def run_daemon(root: str, command: list[str]) -> None:
+    path = socket_path(root)
+    listener = bind_socket(path)
+    if listener is None:
+        return
+    try:
+        server = LanguageServer(command, root)
+        server.initialize()
+    except (OSError, RuntimeError, TimeoutError):
+        listener.close()
+        os.unlink(path)
+        return
+
+    def _shutdown(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    serve(listener, path, server)
+
+
+# ── Client ──────────────────────────────────────────────────────────
+
+
+def _connect(path: str) -> socket.socket | None:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+        return conn
+    except OSError:
+        conn.close()
+        return None
+
+
+def _spawn(root: str, command: list[str]) -> None:
+    """Start a detached session daemon for root."""
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve", root, *command],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=root,
+        start_new_session=True,
+    )
+
+
+def check(
+    paths: list[str], root: str, command: list[str], timeout: float
+) -> list[tuple[str, dict]] | None:
+    """Diagnostics for paths from the workspace's session daemon.
+
+    Starts the daemon if none is running. Returns None on any failure so the
+    caller can fall back to the pyright CLI.
+    """
+    deadline = time.monotonic() + timeout
+    path = socket_path(root)
+    try:
+        conn = _connect(path)
+        if conn is None:
+            _spawn(root, command)
+            spawn_deadline = min(deadline, time.monotonic() + SPAWN_TIMEOUT)
+            while conn is None and time.monotonic() < spawn_deadline:
+                time.sleep(0.05)
+                conn = _connect(path)
+            if conn is None:
+                return None
+
+        with conn:
+            remaining = max(0.1, deadline - time.monotonic())
+            conn.settimeout(remaining)
+            request = {
+                "files": [os.path.abspath(p) for p in paths],
+                # Leave the daemon time to answer before the client gives up
+                "timeout": max(0.1, remaining - 0.5),
+            }
+            conn.sendall(json.dumps(request).encode() + b"\n")
+            response = json.loads(_recv_line(conn))
+    except (OSError, ValueError):
+        return None
+
+    if "diagnostics" not in response:
+        return None
+    # Report diagnostics against the caller's spelling of each path
+    by_abs = {os.path.abspath(p): p for p in paths}
+    return [(by_abs.get(f, f), diag) for f, diag in response["diagnostics"]]
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] != "serve":
+        print(
+            f"usage: {sys.argv[0]} serve <workspace> <langserver command...>",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    run_daemon(sys.argv[2], sys.argv[3:])
+
+
+if __name__ == "__main__":
+    main()
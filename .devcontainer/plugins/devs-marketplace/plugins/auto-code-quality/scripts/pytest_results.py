@@ -0,0 +1,317 @@
+"""
+Per-test-file result cache for pytest runs.
+
+Used by advisory-test-runner.py and the agent-system test gates; vendored
+identically into auto-code-quality and agent-system, together with
+import_graph.py.
+
+A test file's inputs are the file itself, every project module it imports
+(directly or transitively, per import_graph), the conftest.py files pytest
+applies to it plus what they import, and the project's pytest config
+(CONFIG_FILES). When all of a file's tests pass, a sha256 over those inputs
+is stored in /tmp/claude-cq-pytest-{uid}-{project-hash}.json. Until one of
+them changes, later runs leave the file out and report it as a cached pass:
+
+  explicit test files → only the stale ones are passed to pytest
+  whole suite         → cached files are excluded with --ignore, so pytest's
+                        own collection rules still decide what runs
+
+Inputs the graph cannot see (data files, installed packages) are covered
+only by MAX_AGE, after which a cached pass is re-run regardless.
+
+Outcomes are read from pytest's per-file progress lines
+("tests/test_a.py ..F.   [ 40%]"), so the command runs without -q. Output
+cut short by a timeout still records the files that finished, so a suite
+too slow for one run's budget makes progress across runs.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+import import_graph
+
+STORE_DIR = "/tmp"
+STORE_VERSION = 1
+
+# Cached passes older than this are re-run even if no tracked input changed
+MAX_AGE = 24 * 3600
+
+# Oldest entries are dropped beyond this many test files
+MAX_ENTRIES = 20000
+
+# Project files that change how every test runs
+CONFIG_FILES = ("pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini")
+
+# pytest's exit code when every test file was left out
+NO_TESTS_COLLECTED = 5
+
+
+def store_path(root: str) -> str:
+    digest = hashlib.sha1(os.path.realpath(root).encode()).hexdigest()[:12]
+    return os.path.join(STORE_DIR, f"claude-cq-pytest-{os.getuid()}-{digest}.json")
+
+
+# ── Output parsing ──────────────────────────────────────────────────
+
+# "tests/test_a.py ..F.   [ 40%]" (default verbosity), or
+# "tests/test_a.py::test_x PASSED   [ 40%]" (-v from the project's addopts)
+_FILE_LINE = re.compile(r"^(?P<path>[^\s:]+\.py)(?P<node>::\S+)?(?P<rest>(?: .*)?)$")
+
+# A long file's progress wraps onto lines of bare outcome characters
+_CONTINUATION = re.compile(r"^[.sxXFEfp]+\s*(?:\[\s*\d+%\])?$")
+
+_ROOTDIR = re.compile(r"^rootdir: (?P<path>[^,]+)")
+
+# "FAILED tests/test_a.py::test_x - ..." / "ERROR tests/test_b.py - ..."
+_SUMMARY = re.compile(r"^(?:FAILED|ERROR) (?P<path>[^\s:]+\.py)")
+
+# "===== 1 failed, 3 passed in 0.52s =====": the session ran to completion
+_TOTALS = re.compile(r"^=+ .* in [\d.]+s\b.*=+$")
+
+
+def _failed(rest: str, verbose: bool) -> bool:
+    if verbose:
+        return re.search(r"\b(?:FAILED|ERROR)\b", rest) is not None
+    return re.search(r"[FE]", rest.split("[")[0]) is not None
+
+
+def parse_outcomes(output: str, cwd: str) -> dict[str, bool]:
+    """Absolute test file path → whether all of its tests passed.
+
+    output may hold several pytest sessions (parallel shards, one after the
+    other). A session without its final "N passed in Xs" banner was cut
+    short, so the last file in its progress output may still have been
+    running and is left out.
+    """
+    rootdir = cwd
+
+    def absolute(raw: str) -> str:
+        # Progress lines are relative to the invocation directory, summary
+        # lines to the rootdir; they differ when pytest found an ancestor's
+        # config
+        for base in (cwd, rootdir):
+            candidate = os.path.normpath(os.path.join(base, raw))
+            if os.path.isfile(candidate):
+                return candidate
+        return os.path.normpath(os.path.join(cwd, raw))
+
+    # Per session: [files in progress order, failed files, finished]
+    sessions: list[list] = []
+    in_progress = False
+    current = None
+    for line in output.splitlines():
+        line = line.rstrip()
+        if line.startswith("="):
+            # Progress lines only follow the session banner, up to the next
+            # section (FAILURES, warnings summary, ...)
+            in_progress = "test session starts" in line
+            if in_progress:
+                sessions.append([[], set(), False])
+            elif sessions and _TOTALS.match(line):
+                sessions[-1][2] = True
+            current = None
+            continue
+        if not sessions:
+            continue
+        order, failed, _finished = sessions[-1]
+        match = _ROOTDIR.match(line)
+        if match:
+            rootdir = match.group("path").strip()
+            continue
+        match = _SUMMARY.match(line)
+        if match:
+            failed.add(absolute(match.group("path")))
+            continue
+        if not in_progress:
+            continue
+
+        match = _FILE_LINE.match(line)
+        if match:
+            current = absolute(match.group("path"))
+            if current not in order:
+                order.append(current)
+            if _failed(match.group("rest"), verbose=bool(match.group("node"))):
+                failed.add(current)
+        elif current and _CONTINUATION.match(line):
+            if _failed(line, verbose=False):
+                failed.add(current)
+        else:
+            current = None
+
+    outcomes: dict[str, bool] = {}
+    for order, failed, finished in sessions:
+        if not finished and order:
+            order.pop()
+        for path in order + sorted(failed):
+            outcomes[path] = outcomes.get(path, True) and path not in failed
+    return outcomes
+
+
+# ── Result store ────────────────────────────────────────────────────
+
+
+class CachedRun:
+    """A pytest command minus the test files whose cached pass still holds.
+
+    Attributes:
+        cmd: Command to run, or None if every requested file is cached.
+        options: cmd without the explicit test files.
+        tests: Explicit test files still to run, or None for the whole suite.
+        cached: Absolute paths of the test files left out.
+    """
+
+    def __init__(
+        self,
+        cmd: list[str],
+        cwd: str,
+        graph: "import_graph.ImportGraph",
+        tests: list[str] | None = None,
+    ):
+        self.cwd = cwd
+        self.graph = graph
+        self._path = store_path(cwd)
+        self._hashes: dict[str, str] = {}
+        self._entries = self._load()
+
+        if tests is None:
+            candidates = [os.path.join(graph.root, t) for t in graph.test_files()]
+        else:
+            candidates = [os.path.abspath(t) for t in tests]
+
+        # Keyed before the run: an edit made while pytest runs changes the
+        # key again, so that pass is not trusted for the edited code
+        self.keys = {t: self.input_key(t) for t in candidates}
+        self.cached = [t for t in candidates if self._is_cached(t)]
+
+        base = [arg for arg in cmd if arg != "-q"]
+        if tests is None:
+            self.options = base + [f"--ignore={t}" for t in self.cached]
+            self.tests: list[str] | None = None
+            self.cmd: list[str] | None = self.options
+        else:
+            cached = set(self.cached)
+            self.options = base
+            self.tests = [t for t in candidates if t not in cached]
+            self.cmd = base + self.tests if self.tests else None
+
+    # ── Keys ────────────────────────────────────────────────────────
+
+    def _file_hash(self, rel: str) -> str:
+        if rel not in self._hashes:
+            try:
+                with open(os.path.join(self.graph.root, rel), "rb") as f:
+                    self._hashes[rel] = hashlib.file_digest(f, "sha256").hexdigest()
+            except OSError:
+                self._hashes[rel] = "-"
+        return self._hashes[rel]
+
+    def input_key(self, test: str) -> str | None:
+        """Hash of everything test's outcome depends on, or None if unknown."""
+        rel = os.path.relpath(test, self.graph.root)
+        if rel not in self.graph.imports:
+            return None
+
+        inputs = self.graph.dependencies(rel)
+        parts = rel.split(os.sep)[:-1]
+        for depth in range(len(parts) + 1):
+            conftest = os.path.join(*parts[:depth], "conftest.py")
+            if conftest in self.graph.imports:
+                inputs |= self.graph.dependencies(conftest)
+        inputs.update(CONFIG_FILES)
+
+        digest = hashlib.sha256()
+        for path in sorted(inputs):
+            digest.update(f"{path}\0{self._file_hash(path)}\0".encode())
+        return digest.hexdigest()
+
+    def _is_cached(self, test: str) -> bool:
+        key = self.keys.get(test)
+        entry = self._entries.get(os.path.relpath(test, self.graph.root))
+        return (
+            key is not None
+            and isinstance(entry, list)
+            and len(entry) == 2
+            and entry[0] == key
+            and time.time() - entry[1] < MAX_AGE
+        )
+
+    # ── Persistence ─────────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path) as f:
+                data = json.load(f)
+            if data.get("version") == STORE_VERSION and isinstance(
+                data.get("tests"), dict
+            ):
+                return data["tests"]
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def _save(self) -> None:
+        entries = self._entries
+        if len(entries) > MAX_ENTRIES:
+            entries = dict(list(entries.items())[-MAX_ENTRIES:])
+        tmp = f"{self._path}.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"version": STORE_VERSION, "tests": entries}, f)
+            os.replace(tmp, self._path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    # ── Results ─────────────────────────────────────────────────────
+
+    def record(self, output: str | bytes | None, returncode: int | None) -> None:
+        """Store the outcome of running self.cmd.
+
+        returncode is None when the run timed out and output is partial.
+        Runs that pytest aborted (usage errors, interrupts) are ignored.
+        """
+        if returncode not in (None, 0, 1) or not output:
+            return
+        if isinstance(output, bytes):
+            output = output.decode(errors="replace")
+
+        now = time.time()
+        outcomes = parse_outcomes(output, self.cwd)
+        for path, passed in outcomes.items():
+            rel = os.path.relpath(path, self.graph.root)
+            self._entries.pop(rel, None)
+            key = self.keys.get(path)
+            if passed and key is not None:
+                self._entries[rel] = [key, now]
+        if outcomes:
+            self._save()
+
+    def passed(self, returncode: int) -> bool:
+        """Whether a run of self.cmd exiting with returncode counts as a pass."""
+        return returncode == 0 or (
+            returncode == NO_TESTS_COLLECTED and bool(self.cached)
+        )
+
+    def note(self) -> str:
+        """Short description of the cached passes, or "" if none."""
+        if not self.cached:
+            return ""
+        count = len(self.cached)
+        noun = "file" if count == 1 else "files"
+        return f"{count} unchanged test {noun} cached"
+
+
+def plan(cmd: list[str], cwd: str, tests: list[str] | None = None) -> CachedRun | None:
+    """Prepare a cached run of cmd (the whole suite, or the given test files).
+
+    Returns None if the project is too large to index.
+    """
+    graph = import_graph.load(cwd)
+    if graph is None:
+        return None
+    return CachedRun(cmd, cwd, graph, tests)
@@ -0,0 +1,183 @@
+"""
+Content-hash result cache for the auto-code-quality Stop hooks.
+
+Long sessions hand the same unchanged files to format-on-stop.py and
+lint-file.py again and again. This module remembers, per project and per
+stage ("format", "lint", or "syntax" for collect-edited-files.py's syntax
+check), what running a tool on a file produced:
+
+  key          → tool name + resolved file path
+  fingerprint  → sha256 of the file's bytes
+                 + identity of the tool binaries (resolved path, size, mtime)
+                 + hash of the tool's config files from the file's directory
+                   up to the filesystem root
+  value        → the tool's last result ("" for a clean or formatted file)
+
+When the fingerprint still matches, the caller replays the stored value and
+leaves the file out of the tool call. A tool upgrade, a config edit or any
+change to the file's bytes misses. Tool identity comes from stat(), not from
+running `<tool> --version`, so a lookup never starts a subprocess.
+
+Each project/stage pair gets its own JSON file under /tmp, so the format and
+lint hooks (which may run at the same time) never write the same file. The
+file is rewritten only when something changed and keeps the MAX_ENTRIES most
+recently stored results.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = "/tmp"
+
+MAX_ENTRIES = 2000
+
+MAX_WALK = 20
+
+
+def cache_path(stage: str, project_dir: str) -> str:
+    """Cache file for one stage of one project."""
+    digest = hashlib.sha1(os.path.realpath(project_dir).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"claude-cq-{stage}-{os.getuid()}-{digest}.json")
+
+
+# ── Fingerprints ────────────────────────────────────────────────────
+
+
+def file_hash(path: str) -> str | None:
+    """sha256 of a file's contents, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+def tool_identity(tool_paths: list[str | None]) -> list:
+    """Resolved path, size and mtime of each tool (None when missing)."""
+    identity = []
+    for tool in tool_paths:
+        if not tool:
+            identity.append(None)
+            continue
+        real = os.path.realpath(tool)
+        try:
+            st = os.stat(real)
+            identity.append([real, st.st_size, st.st_mtime_ns])
+        except OSError:
+            identity.append(None)
+    return identity
+
+
+# (directory, config names) → hash; config files rarely change within a run
+_config_hashes: dict[tuple[str, tuple[str, ...]], str] = {}
+
+
+def config_hash(file_path: str, names: tuple[str, ...]) -> str:
+    """Hash of every config file named in *names* above file_path.
+
+    Walks from the file's directory to the filesystem root, so nested and
+    parent configs both count. Returns "" when the tool has no config files.
+    """
+    if not names:
+        return ""
+    start = str(Path(file_path).resolve().parent)
+    key = (start, names)
+    cached = _config_hashes.get(key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    current = Path(start)
+    for _ in range(MAX_WALK):
+        for name in names:
+            candidate = current / name
+            try:
+                content = candidate.read_bytes()
+            except OSError:
+                continue
+            digest.update(str(candidate).encode() + b"\0" + content + b"\0")
+        if current.parent == current:
+            break
+        current = current.parent
+
+    _config_hashes[key] = digest.hexdigest()
+    return _config_hashes[key]
+
+
+# ── Cache ───────────────────────────────────────────────────────────
+
+
+class ResultCache:
+    """Per-project, per-stage store of tool results keyed by fingerprint."""
+
+    def __init__(self, stage: str, project_dir: str | None = None):
+        self.path = cache_path(stage, project_dir or os.getcwd())
+        self._dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._entries: dict[str, dict] = data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def fingerprint(
+        file_path: str,
+        tool_paths: list[str | None],
+        config_names: tuple[str, ...] = (),
+    ) -> list | None:
+        """Fingerprint of a file for one tool, or None if it is unreadable."""
+        content = file_hash(file_path)
+        if content is None:
+            return None
+        return [
+            content,
+            tool_identity(tool_paths),
+            config_hash(file_path, config_names),
+        ]
+
+    @staticmethod
+    def _key(tool: str, file_path: str) -> str:
+        return f"{tool}\0{os.path.realpath(file_path)}"
+
+    def get(self, tool: str, file_path: str, fingerprint: list | None) -> str | None:
+        """Stored result for tool on file_path, or None on a miss."""
+        if fingerprint is None:
+            return None
+        entry = self._entries.get(self._key(tool, file_path))
+        if entry and entry.get("fp") == fingerprint:
+            return entry.get("result")
+        return None
+
+    def put(
+        self, tool: str, file_path: str, fingerprint: list | None, result: str
+    ) -> None:
+        """Store tool's result for file_path under fingerprint."""
+        if fingerprint is None:
+            return
+        key = self._key(tool, file_path)
+        # Re-insert so dict order tracks recency for eviction
+        self._entries.pop(key, None)
+        self._entries[key] = {"fp": fingerprint, "result": str(result)}
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back if it changed. Never raises."""
+        if not self._dirty:
+            return
+        entries = self._entries
+        if len(entries) > MAX_ENTRIES:
+            entries = dict(list(entries.items())[-MAX_ENTRIES:])
+        tmp = f"{self.path}.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
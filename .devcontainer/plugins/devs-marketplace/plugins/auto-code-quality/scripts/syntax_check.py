@@ -0,0 +1,183 @@
+"""
+Data file syntax validation for the collect-edited-files.py hook.
+
+Validates JSON, JSONC, YAML, and TOML files after editing.
+Uses Python stdlib only (plus PyYAML if available).
+
+Each format gets the cheapest pass that still finds syntax errors, since
+this runs on every edit:
+
+  JSON/JSONC → the C scanner with an object hook that discards every object,
+               so no dicts are built
+  YAML       → the event stream only (yaml.parse, with libyaml's CSafeLoader
+               when present), read from the file as it is scanned; nothing
+               is constructed, which is several times faster than safe_load.
+               The scan stops after SCAN_BUDGET seconds, so an error near the
+               top of a huge file is still reported; a scan cut off there
+               returns None (not checked) rather than "" (valid)
+  TOML       → tomllib, skipped above TOML_MAX_BYTES (it has no cheaper pass)
+
+Files above MAX_BYTES are not validated. The caller caches results by
+content hash (result_cache.py), keyed on validator_files() as the "tool";
+None results are not cached, so the file is scanned again on its next edit.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+EXTENSIONS = {".json", ".jsonc", ".yaml", ".yml", ".toml"}
+
+# Larger files are not validated at all
+MAX_BYTES = 32 * 1024 * 1024
+
+# tomllib is pure Python and always builds the full document
+TOML_MAX_BYTES = 4 * 1024 * 1024
+
+# Seconds a YAML scan may run before giving up
+SCAN_BUDGET = 1.5
+
+# Events between deadline checks
+_CHECK_EVERY = 1000
+
+
+def strip_jsonc_comments(text: str) -> str:
+    """Remove // and /* */ comments from JSONC text.
+
+    Handles URLs (https://...) by only stripping // comments that are
+    preceded by whitespace or appear at line start, not those inside strings.
+    """
+    # Remove multi-line comments first
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    # Remove single-line comments: // preceded by start-of-line or whitespace
+    # This avoids stripping :// in URLs
+    text = re.sub(r"(^|[\s,\[\{])//.*$", r"\1", text, flags=re.MULTILINE)
+    return text
+
+
+def _discard(_pairs) -> None:
+    return None
+
+
+def validate_json(file_path: str, is_jsonc: bool) -> str:
+    """Validate JSON/JSONC syntax.
+
+    Returns:
+        Error message string, or empty string if valid.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if is_jsonc:
+        content = strip_jsonc_comments(content)
+
+    try:
+        json.loads(content, object_pairs_hook=_discard)
+        return ""
+    except json.JSONDecodeError as e:
+        return f"[Syntax] JSON error at line {e.lineno}, col {e.colno}: {e.msg}"
+
+
+def validate_yaml(file_path: str) -> str | None:
+    """Validate YAML syntax.
+
+    Returns:
+        Error message string, empty string if valid, or None if the scan
+        ran past SCAN_BUDGET before reaching the end of the file.
+    """
+    try:
+        import yaml
+    except ImportError:
+        return ""  # PyYAML not available, skip
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    deadline = time.monotonic() + SCAN_BUDGET
+
+    anchors: set[str] = set()
+    try:
+        with open(file_path, "rb") as f:
+            for count, event in enumerate(yaml.parse(f, Loader=loader)):
+                if isinstance(event, yaml.DocumentStartEvent):
+                    anchors.clear()
+                elif isinstance(event, yaml.AliasEvent):
+                    if event.anchor not in anchors:
+                        mark = event.start_mark
+                        return (
+                            f"[Syntax] YAML error at line {mark.line + 1}, "
+                            f"col {mark.column + 1}: found undefined alias "
+                            f"{event.anchor!r}"
+                        )
+                elif getattr(event, "anchor", None):
+                    anchors.add(event.anchor)
+                if count % _CHECK_EVERY == 0 and time.monotonic() > deadline:
+                    return None
+        return ""
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        if mark is not None:
+            return (
+                f"[Syntax] YAML error at line {mark.line + 1}, "
+                f"col {mark.column + 1}: {e.problem}"
+            )
+        return f"[Syntax] YAML error: {e}"
+
+
+def validate_toml(file_path: str) -> str:
+    """Validate TOML syntax.
+
+    Returns:
+        Error message string, or empty string if valid.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        return ""  # Python < 3.11, skip
+
+    if os.path.getsize(file_path) > TOML_MAX_BYTES:
+        return ""
+
+    try:
+        with open(file_path, "rb") as f:
+            tomllib.load(f)
+        return ""
+    except tomllib.TOMLDecodeError as e:
+        return f"[Syntax] TOML error: {e}"
+
+
+def validate(file_path: str) -> str | None:
+    """Validate file syntax based on extension.
+
+    Returns:
+        Error message string, empty string if valid, or None if the file
+        was only partly scanned (see validate_yaml).
+    """
+    ext = Path(file_path).suffix.lower()
+
+    if os.path.getsize(file_path) > MAX_BYTES:
+        return ""
+
+    if ext == ".jsonc":
+        return validate_json(file_path, is_jsonc=True)
+    elif ext == ".json":
+        return validate_json(file_path, is_jsonc=False)
+    elif ext in {".yaml", ".yml"}:
+        return validate_yaml(file_path)
+    elif ext == ".toml":
+        return validate_toml(file_path)
+
+    return ""
+
+
+def validator_files(file_path: str) -> list[str | None]:
+    """Files whose change invalidates a cached result for file_path."""
+    files: list[str | None] = [__file__]
+    if Path(file_path).suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError:
+            files.append(None)
+        else:
+            files.append(yaml.__file__)
+    return files
@@ -0,0 +1,181 @@
+"""
+Persistent tool resolution cache for the auto-code-quality Stop hooks.
+
+format-on-stop.py and lint-file.py resolve the same binaries (ruff, pyright,
+biome, ...) on every Stop. This module remembers where each tool was found
+across hook invocations:
+
+  which(name)              → PATH lookup; entry keyed by tool name and
+                             invalidated when PATH or the mtime of any PATH
+                             directory changes
+  find_local(file, tool)   → node_modules/.bin/<tool> walking up from a file;
+                             entry keyed by tool name and project root and
+                             invalidated when a lockfile or node_modules/.bin
+                             in the project root changes
+
+Lookups on a miss use shutil.which (no `which` subprocess). Cached paths are
+re-checked for existence before being returned. The cache lives in a small
+JSON file under /tmp and is written back once per process, at exit.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+CACHE_PATH = f"/tmp/claude-cq-tools-{os.getuid()}.json"
+
+# Files whose change means project-local tools may have moved
+LOCKFILES = (
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "bun.lock",
+)
+
+# Markers that identify a JS project root when walking up from a file
+ROOT_MARKERS = ("package.json", *LOCKFILES)
+
+MAX_WALK = 20
+
+_lock = threading.Lock()
+_entries: dict[str, dict] = {}
+_loaded = False
+_dirty = False
+
+
+# ── Persistence ─────────────────────────────────────────────────────
+
+
+def _load() -> None:
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        with open(CACHE_PATH) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            _entries.update(data)
+    except (OSError, ValueError):
+        pass
+    atexit.register(save)
+
+
+def save() -> None:
+    """Write the cache back if it changed. Never raises."""
+    global _dirty
+    with _lock:
+        if not _dirty:
+            return
+        tmp = f"{CACHE_PATH}.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(_entries, f)
+            os.replace(tmp, CACHE_PATH)
+            _dirty = False
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def clear() -> None:
+    """Forget all in-memory entries (the file is left alone)."""
+    global _loaded, _dirty
+    with _lock:
+        _entries.clear()
+        _loaded = False
+        _dirty = False
+
+
+def _lookup(key: str, fingerprint: list, compute) -> str | None:
+    """Return the cached value for key if its fingerprint still matches."""
+    global _dirty
+    with _lock:
+        _load()
+        entry = _entries.get(key)
+    if entry and entry.get("fp") == fingerprint:
+        path = entry.get("path")
+        if path is None or os.path.isfile(path):
+            return path
+
+    path = compute()
+    with _lock:
+        _entries[key] = {"fp": fingerprint, "path": path}
+        _dirty = True
+    return path
+
+
+# ── Fingerprints ────────────────────────────────────────────────────
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _path_fingerprint() -> list:
+    path_env = os.environ.get("PATH", "")
+    return [path_env] + [_mtime(d) for d in path_env.split(os.pathsep) if d]
+
+
+def project_root(file_path: str) -> str:
+    """Nearest ancestor of file_path with a package.json or lockfile.
+
+    Falls back to the file's own directory.
+    """
+    start = Path(file_path).resolve().parent
+    current = start
+    for _ in range(MAX_WALK):
+        if any((current / marker).exists() for marker in ROOT_MARKERS):
+            return str(current)
+        if current.parent == current:
+            break
+        current = current.parent
+    return str(start)
+
+
+def _project_fingerprint(root: str) -> list:
+    files = [os.path.join(root, name) for name in LOCKFILES]
+    files.append(os.path.join(root, "node_modules", ".bin"))
+    return [_mtime(f) for f in files]
+
+
+# ── Lookups ─────────────────────────────────────────────────────────
+
+
+def which(name: str) -> str | None:
+    """Find an executable on PATH (cached)."""
+    return _lookup(f"which:{name}", _path_fingerprint(), lambda: shutil.which(name))
+
+
+def _walk_up(start: Path, tool_name: str) -> str | None:
+    current = start
+    for _ in range(MAX_WALK):
+        candidate = current / "node_modules" / ".bin" / tool_name
+        if candidate.is_file():
+            return str(candidate)
+        parent = current.parent
+        if parent == current:
+            break
+        current = parent
+    return None
+
+
+def find_local(file_path: str, tool_name: str) -> str | None:
+    """Walk up from file_path looking for node_modules/.bin/<tool> (cached)."""
+    # node_modules sits next to package.json (or above it, when hoisted), so
+    # walking from the project root gives every file in it the same answer
+    root = project_root(file_path)
+    return _lookup(
+        f"local:{tool_name}:{root}",
+        _project_fingerprint(root),
+        lambda: _walk_up(Path(root), tool_name),
+    )
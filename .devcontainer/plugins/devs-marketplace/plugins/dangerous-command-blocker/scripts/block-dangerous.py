@@ -11,6 +11,10 @@ import json
 import re
 import sys
 
+import bash_policy
+
+POLICY = "dangerous-command-blocker"
+
 FORCE_PUSH_SUGGESTION = (
     "Blocked: force push is not allowed. "
     "If you rebased and need to update a remote branch, use "
@@ -152,29 +156,81 @@ DANGEROUS_PATTERNS = [
 ]
 
 
-def strip_command_prefixes(command: str) -> str:
-    """Strip common command prefixes that bypass word-boundary matching.
+# ---------------------------------------------------------------------------
+# Keyword prefilter
+# Every rule is anchored on a literal command word (rm, git, docker, ...) or
+# a redirect. One scan for those keywords selects the few rules that can
+# possibly match, so the cost of a Bash call no longer grows with the size of
+# DANGEROUS_PATTERNS. Rules without a recognizable keyword always run.
+# ---------------------------------------------------------------------------
+
+_RULE_KEYWORD_RE = re.compile(r"^\\b([a-z]+)(?=\\s|\\\.|\\b)|^(>)")
+
+_RULES = [
+    (re.compile(pattern, re.IGNORECASE), message)
+    for pattern, message in DANGEROUS_PATTERNS
+]
+
+
+def _build_rule_index() -> tuple[dict[str, tuple[int, ...]], tuple[int, ...]]:
+    """Map each leading keyword to the indices of the rules it anchors."""
+    by_keyword: dict[str, list[int]] = {}
+    unkeyed: list[int] = []
+    for i, (pattern, _) in enumerate(DANGEROUS_PATTERNS):
+        m = _RULE_KEYWORD_RE.match(pattern)
+        if m:
+            by_keyword.setdefault(m.group(1) or m.group(2), []).append(i)
+        else:
+            unkeyed.append(i)
+    return {k: tuple(v) for k, v in by_keyword.items()}, tuple(unkeyed)
+
+
+_RULES_BY_KEYWORD, _UNKEYED_RULES = _build_rule_index()
+
+_KEYWORD_RE = re.compile(
+    r"\b(?:"
+    + "|".join(sorted(k for k in _RULES_BY_KEYWORD if k != ">"))
+    + r")\b|>",
+    re.IGNORECASE,
+)
+
+
+def _candidate_rules(cmd: str) -> list[int]:
+    """Indices of rules whose keyword occurs in cmd, in list order."""
+    keywords = {k.lower() for k in _KEYWORD_RE.findall(cmd)}
+    candidates = set(_UNKEYED_RULES)
+    for keyword in keywords:
+        candidates.update(_RULES_BY_KEYWORD.get(keyword, ()))
+    return sorted(candidates)
+
+
+def match_rule(cmd: str) -> str | None:
+    """Return the message of the first rule (in list order) matching cmd."""
+    for i in _candidate_rules(cmd):
+        regex, message = _RULES[i]
+        if regex.search(cmd):
+            return message
+    return None
 
-    Handles: backslash prefix (\\rm), command prefix, env prefix.
-    """
-    stripped = command
-    # Strip leading backslash from commands (e.g. \rm -> rm)
-    stripped = re.sub(r"(?:^|(?<=\s))\\(?=\w)", "", stripped)
-    # Strip 'command' prefix (e.g. 'command rm' -> 'rm')
-    stripped = re.sub(r"\bcommand\s+", "", stripped)
-    # Strip 'env' prefix with optional VAR=val args (e.g. 'env VAR=x rm' -> 'rm')
-    stripped = re.sub(r"\benv\s+(?:\w+=\S+\s+)*", "", stripped)
-    return stripped
+
+def dangerous_policy(parsed: bash_policy.ParsedCommand, cwd: str) -> str | None:
+    """Return the block message for the first matching pattern, or None."""
+    # Check both original and stripped versions
+    for cmd in (parsed.raw, parsed.stripped):
+        message = match_rule(cmd)
+        if message:
+            return message
+    return None
+
+
+bash_policy.register(POLICY, dangerous_policy)
 
 
 def check_command(command: str) -> tuple[bool, str]:
     """Check if command matches any dangerous pattern."""
-    stripped = strip_command_prefixes(command)
-    # Check both original and stripped versions
-    for cmd in (command, stripped):
-        for pattern, message in DANGEROUS_PATTERNS:
-            if re.search(pattern, cmd, re.IGNORECASE):
-                return True, message
+    message = dangerous_policy(bash_policy.parse(command), "")
+    if message:
+        return True, message
     return False, ""
 
 
@@ -187,9 +243,9 @@ def main():
         if not command:
             sys.exit(0)
 
-        is_dangerous, message = check_command(command)
+        message = bash_policy.check(POLICY, command)
 
-        if is_dangerous:
+        if message:
             # Output error to stderr (exit 2 ignores stdout)
             print(message, file=sys.stderr)
             sys.exit(2)
@@ -0,0 +1,214 @@
+"""
+Shared Bash command parsing for CodeForge guard hooks.
+
+Every Bash PreToolUse guard (dangerous-command-blocker, protected-files-guard,
+workspace-scope-guard, agent-system's read-only guard) inspects the same
+command string with the same splitting rules. parse() does that work in one
+pass — prefix-stripped text, segments, pipe stages, redirects,
+substitutions, shell tokens and write targets — and a guard's rules run
+against the parsed form.
+
+Each guard is its own hook with its own vendored copy of this module, so
+each still parses a command once per tool call; what the guards share is the
+parsing code, not the parse. Within a guard the parse is cached, so
+agent-system's read-only guard runs both of its policies on one parse.
+
+Guards register a policy: a function (parsed, cwd) -> block message or None.
+check() runs one registered policy and returns its verdict.
+
+This file is vendored verbatim into each guard plugin's scripts/ directory so
+plugins stay self-contained. Keep the copies identical.
+"""
+
+import re
+import shlex
+from collections.abc import Callable
+from functools import cached_property, lru_cache
+
+# Parsed commands kept per module copy; a guard's policies run on the same
+# command back to back, so a small cache is enough to parse it once.
+PARSE_CACHE_SIZE = 64
+
+# ---------------------------------------------------------------------------
+# Write target patterns
+# Shared by guard-protected-bash.py and guard-workspace-scope.py.
+# Each captures the target file path.
+# ---------------------------------------------------------------------------
+WRITE_PATTERNS = [
+    # Redirect: >> file, > file (>> before > to avoid greedy match)
+    r"(?:>>|>)\s*([^\s;&|]+)",
+    # tee: tee file, tee -a file
+    r"\btee\s+(?:-a\s+)?([^\s;&|]+)",
+    # cp/mv: cp src dest, mv src dest
+    r"\b(?:cp|mv)\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",
+    # sed -i: sed -i '' file
+    r'\bsed\s+-i[^\s]*\s+(?:\'[^\']*\'\s+|"[^"]*"\s+|[^\s]+\s+)*([^\s;&|]+)',
+    # cat > file (heredoc style)
+    r"\bcat\s+(?:<<[^\s]*\s+)?>\s*([^\s;&|]+)",
+    r"\btouch\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # touch file
+    r"\bmkdir\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # mkdir [-p] dir
+    r"\brm\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # rm [-rf] path
+    r"\bln\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # ln [-s] src dest
+    r"\binstall\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # install src dest
+    r"\brsync\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # rsync src dest
+    r"\bchmod\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # chmod mode path
+    r"\bchown\s+(?:-[^\s]+\s+)*[^\s:]+(?::[^\s]+)?\s+([^\s;&|]+)",  # chown owner[:group] path
+    r"\bdd\b[^;|&]*\bof=([^\s;&|]+)",  # dd of=path
+    r"\bwget\s+(?:-[^\s]+\s+)*-O\s+([^\s;&|]+)",  # wget -O path
+    r"\bcurl\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # curl -o path
+    r"\btar\s+(?:-[^\s]+\s+)*-C\s+([^\s;&|]+)",  # tar -C dir
+    r"\bunzip\s+(?:-[^\s]+\s+)*-d\s+([^\s;&|]+)",  # unzip -d dir
+    r"\b(?:gcc|g\+\+|cc|c\+\+|clang)\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # gcc -o out
+    r"\bsqlite3\s+([^\s;&|]+)",  # sqlite3 dbpath
+]
+
+_WRITE_RES = [re.compile(p) for p in WRITE_PATTERNS]
+
+_BACKSLASH_PREFIX_RE = re.compile(r"(?:^|(?<=\s))\\(?=\w)")
+_COMMAND_PREFIX_RE = re.compile(r"\bcommand\s+")
+_ENV_PREFIX_RE = re.compile(r"\benv\s+(?:\w+=\S+\s+)*")
+_SEGMENT_SPLIT_RE = re.compile(r"\s*(?:;|&&|\|\||(?<![&])&(?![&]))\s*")
+_PIPE_SPLIT_RE = re.compile(r"(?<!\|)\|(?!\|)")
+_DEV_NULL_RE = re.compile(r"[12]?>{1,2}\s*/dev/null")
+_REDIRECT_RE = re.compile(r"(?:^|[\s)])(?:[12])?>{1,2}\s*[^\s&|;]")
+_DOLLAR_SUBST_RE = re.compile(r"\$\(([^)]+)\)")
+_BACKTICK_SUBST_RE = re.compile(r"`([^`]+)`")
+
+
+# ---------------------------------------------------------------------------
+# Parsing primitives
+# ---------------------------------------------------------------------------
+
+
+def strip_command_prefixes(command: str) -> str:
+    """Strip common command prefixes that bypass word-boundary matching.
+
+    Handles: backslash prefix (\\rm), command prefix, env prefix.
+    """
+    stripped = command
+    # Strip leading backslash from commands (e.g. \rm -> rm)
+    stripped = _BACKSLASH_PREFIX_RE.sub("", stripped)
+    # Strip 'command' prefix (e.g. 'command rm' -> 'rm')
+    stripped = _COMMAND_PREFIX_RE.sub("", stripped)
+    # Strip 'env' prefix with optional VAR=val args (e.g. 'env VAR=x rm' -> 'rm')
+    stripped = _ENV_PREFIX_RE.sub("", stripped)
+    return stripped
+
+
+def split_segments(command: str) -> list[str]:
+    """Split command on ;  &&  ||  & (background) into segments.
+
+    Handles line continuations (backslash-newline).  Does not attempt
+    to parse quoted strings — intentionally over-splits for safety.
+    """
+    command = command.replace("\\\n", " ")
+    segments = _SEGMENT_SPLIT_RE.split(command)
+    return [s.strip() for s in segments if s.strip()]
+
+
+def split_pipes(segment: str) -> list[str]:
+    """Split a segment on | (single pipe, not ||)."""
+    parts = _PIPE_SPLIT_RE.split(segment)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def has_redirect(command: str) -> bool:
+    """Detect output redirections (> or >>) excluding >/dev/null.
+
+    May produce false positives for '>' inside quoted strings — this is
+    intentional (safe-side).
+    """
+    cleaned = _DEV_NULL_RE.sub("", command)
+    return bool(_REDIRECT_RE.search(cleaned))
+
+
+def extract_substitution_commands(command: str) -> list[str]:
+    """Extract inner commands from $() and backtick substitutions."""
+    inner = [m.group(1) for m in _DOLLAR_SUBST_RE.finditer(command)]
+    inner.extend(m.group(1) for m in _BACKTICK_SUBST_RE.finditer(command))
+    return inner
+
+
+# ---------------------------------------------------------------------------
+# Parsed command
+# ---------------------------------------------------------------------------
+
+
+class ParsedCommand:
+    """A Bash command string with its derived forms computed on first use."""
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+    @cached_property
+    def stripped(self) -> str:
+        """Command with backslash/command/env prefixes removed."""
+        return strip_command_prefixes(self.raw)
+
+    @cached_property
+    def segments(self) -> tuple[str, ...]:
+        return tuple(split_segments(self.raw))
+
+    @cached_property
+    def stages(self) -> tuple[tuple[str, ...], ...]:
+        """Pipe stages for each segment, in order."""
+        return tuple(tuple(split_pipes(s)) for s in self.segments)
+
+    @cached_property
+    def has_redirect(self) -> bool:
+        return has_redirect(self.raw)
+
+    @cached_property
+    def has_substitution(self) -> bool:
+        return "$(" in self.raw or "`" in self.raw
+
+    @cached_property
+    def substitutions(self) -> tuple[str, ...]:
+        if not self.has_substitution:
+            return ()
+        return tuple(extract_substitution_commands(self.raw))
+
+    @cached_property
+    def tokens(self) -> tuple[str, ...] | None:
+        """shlex tokens, or None if the command does not tokenize."""
+        try:
+            return tuple(shlex.split(self.raw))
+        except ValueError:
+            return None
+
+    @cached_property
+    def write_targets(self) -> tuple[str, ...]:
+        """Paths captured by WRITE_PATTERNS, in pattern order."""
+        targets = []
+        for regex in _WRITE_RES:
+            for match in regex.finditer(self.raw):
+                target = match.group(1).strip("'\"")
+                if target:
+                    targets.append(target)
+        return tuple(targets)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(command: str) -> ParsedCommand:
+    """Return the (cached) parsed form of a command string."""
+    return ParsedCommand(command)
+
+
+# ---------------------------------------------------------------------------
+# Policies
+# ---------------------------------------------------------------------------
+
+Policy = Callable[[ParsedCommand, str], str | None]
+
+# policy name -> policy, in registration order
+POLICIES: dict[str, Policy] = {}
+
+
+def register(name: str, policy: Policy) -> None:
+    """Register a guard's policy under a unique name."""
+    POLICIES[name] = policy
+
+
+def check(name: str, command: str, cwd: str = "") -> str | None:
+    """Run one registered policy. Returns its block message or None."""
+    return POLICIES[name](parse(command), cwd)
@@ -10,9 +10,12 @@ Exit code 0 allows the command to proceed.
 
 import json
 import re
-import shlex
 import sys
 
+import bash_policy
+
+POLICY = "protected-files-guard"
+
 # Same patterns as guard-protected.py
 PROTECTED_PATTERNS = [
     (r"(^|/)\.env$", "Blocked: .env contains secrets - edit manually if needed"),
@@ -55,37 +58,8 @@ PROTECTED_PATTERNS = [
     (r"(^|/)id_ecdsa", "Blocked: SSH private key file"),
 ]
 
-# Patterns that indicate a bash command is writing to a file
-# Each captures the target file path for checking against PROTECTED_PATTERNS
-WRITE_PATTERNS = [
-    # Redirect: >> file, > file (>> before > to avoid greedy match)
-    r"(?:>>|>)\s*([^\s;&|]+)",
-    # tee: tee file, tee -a file
-    r"\btee\s+(?:-a\s+)?([^\s;&|]+)",
-    # cp/mv: cp src dest, mv src dest
-    r"\b(?:cp|mv)\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",
-    # sed -i: sed -i '' file
-    r'\bsed\s+-i[^\s]*\s+(?:\'[^\']*\'\s+|"[^"]*"\s+|[^\s]+\s+)*([^\s;&|]+)',
-    # cat > file (heredoc style)
-    r"\bcat\s+(?:<<[^\s]*\s+)?>\s*([^\s;&|]+)",
-    # --- Extended patterns (unified with guard-workspace-scope.py) ---
-    r"\btouch\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # touch file
-    r"\bmkdir\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # mkdir [-p] dir
-    r"\brm\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # rm [-rf] path
-    r"\bln\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # ln [-s] src dest
-    r"\binstall\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # install src dest
-    r"\brsync\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # rsync src dest
-    r"\bchmod\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # chmod mode path
-    r"\bchown\s+(?:-[^\s]+\s+)*[^\s:]+(?::[^\s]+)?\s+([^\s;&|]+)",  # chown owner[:group] path
-    r"\bdd\b[^;|&]*\bof=([^\s;&|]+)",  # dd of=path
-    r"\bwget\s+(?:-[^\s]+\s+)*-O\s+([^\s;&|]+)",  # wget -O path
-    r"\bcurl\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # curl -o path
-    r"\btar\s+(?:-[^\s]+\s+)*-C\s+([^\s;&|]+)",  # tar -C dir
-    r"\bunzip\s+(?:-[^\s]+\s+)*-d\s+([^\s;&|]+)",  # unzip -d dir
-    r"\b(?:gcc|g\+\+|cc|c\+\+|clang)\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # gcc -o out
-    r"\bsqlite3\s+([^\s;&|]+)",  # sqlite3 dbpath
-]
-
+# Write target patterns (redirects, tee, cp/mv, sed -i, ...) live in
+# bash_policy.WRITE_PATTERNS, shared with guard-workspace-scope.py
 
 # Commands where all trailing non-flag arguments are file targets
 _MULTI_TARGET_CMDS = frozenset({"rm", "touch", "mkdir"})
@@ -95,10 +69,11 @@ _SKIP_FIRST_ARG_CMDS = frozenset({"chmod", "chown"})
 
 def _extract_multi_targets(command: str) -> list[str]:
     """Extract all file targets from commands that accept multiple operands."""
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        return []
+    return _multi_targets(bash_policy.parse(command).tokens)
+
+
+def _multi_targets(tokens: tuple[str, ...] | None) -> list[str]:
+    """Multi-operand targets from already-tokenized command words."""
     if not tokens:
         return []
 
@@ -142,14 +117,13 @@ def _extract_multi_targets(command: str) -> list[str]:
 
 def extract_write_targets(command: str) -> list[str]:
     """Extract file paths that the command writes to."""
-    targets = []
-    for pattern in WRITE_PATTERNS:
-        for match in re.finditer(pattern, command):
-            target = match.group(1).strip("'\"")
-            if target:
-                targets.append(target)
+    return _write_targets(bash_policy.parse(command))
+
+
+def _write_targets(parsed: bash_policy.ParsedCommand) -> list[str]:
+    targets = list(parsed.write_targets)
     # Supplement with multi-target extraction for commands like rm, touch, chmod
-    for target in _extract_multi_targets(command):
+    for target in _multi_targets(parsed.tokens):
         if target not in targets:
             targets.append(target)
     return targets
@@ -164,6 +138,18 @@ def check_path(file_path: str) -> tuple[bool, str]:
     return False, ""
 
 
+def protected_policy(parsed: bash_policy.ParsedCommand, cwd: str) -> str | None:
+    """Return the block message for the first protected write target, or None."""
+    for target in _write_targets(parsed):
+        is_protected, message = check_path(target)
+        if is_protected:
+            return f"{message} (via bash command)"
+    return None
+
+
+bash_policy.register(POLICY, protected_policy)
+
+
 def main():
     try:
         input_data = json.load(sys.stdin)
@@ -173,13 +159,10 @@ def main():
         if not command:
             sys.exit(0)
 
-        targets = extract_write_targets(command)
-
-        for target in targets:
-            is_protected, message = check_path(target)
-            if is_protected:
-                print(f"{message} (via bash command)", file=sys.stderr)
-                sys.exit(2)
+        message = bash_policy.check(POLICY, command)
+        if message:
+            print(message, file=sys.stderr)
+            sys.exit(2)
 
         sys.exit(0)
 
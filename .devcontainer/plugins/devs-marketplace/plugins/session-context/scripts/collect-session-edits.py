@@ -2,9 +2,9 @@
 """
 Collect edited file paths for session-aware Stop hooks.
 
-Lightweight PostToolUse hook that appends the edited file path
-to a session-scoped temp file. The commit-reminder Stop hook
-reads this file to determine if the session modified any files.
+Lightweight PostToolUse hook that appends the edited file path to the
+session's edit journal (edit_journal.py). The commit-reminder Stop hook
+reads the journal to determine if the session modified any files.
 
 Non-blocking: always exits 0. Runs in <10ms.
 """
@@ -13,6 +13,8 @@ import json
 import os
 import sys
 
+import edit_journal
+
 
 def main():
     try:
@@ -30,12 +32,8 @@ def main():
     if not os.path.isfile(file_path):
         sys.exit(0)
 
-    tmp_path = f"/tmp/claude-session-edits-{session_id}"
-    try:
-        with open(tmp_path, "a") as f:
-            f.write(file_path + "\n")
-    except OSError:
-        pass  # non-critical, don't block Claude
+    # One record per edit; a no-op if auto-code-quality already wrote it
+    edit_journal.append(session_id, file_path, input_data.get("tool_use_id", ""))
 
     sys.exit(0)
 
@@ -2,8 +2,9 @@
 """
 Commit reminder — Stop hook that advises about uncommitted changes.
 
-On Stop, checks whether this session edited any files (via the tmp file
-written by collect-session-edits.py) and whether uncommitted changes exist.
+On Stop, checks whether this session edited any files (the whole edit
+journal written by collect-session-edits.py, edit_journal.py) and whether
+uncommitted changes exist.
 Uses tiered logic: meaningful changes (3+ files, 2+ source files, or test
 files touched) get an advisory suggestion; small changes are silent.
 
@@ -16,6 +17,8 @@ import os
 import subprocess
 import sys
 
+import edit_journal
+
 GIT_CMD_TIMEOUT = 5
 
 # Extensions considered source code (not config/docs)
@@ -46,21 +49,7 @@ def _run_git(args: list[str]) -> str | None:
 
 def _read_session_edits(session_id: str) -> list[str]:
     """Read the list of files edited this session."""
-    tmp_path = f"/tmp/claude-session-edits-{session_id}"
-    try:
-        with open(tmp_path, "r") as f:
-            raw = f.read()
-    except OSError:
-        return []
-
-    seen: set[str] = set()
-    result: list[str] = []
-    for line in raw.strip().splitlines():
-        path = line.strip()
-        if path and path not in seen:
-            seen.add(path)
-            result.append(path)
-    return result
+    return edit_journal.unique_paths(edit_journal.read_all(session_id))
 
 
 def _is_source_file(path: str) -> bool:
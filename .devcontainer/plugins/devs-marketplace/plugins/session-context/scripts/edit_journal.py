@@ -0,0 +1,230 @@
+"""
+Session edit journal shared by the edit collectors and the Stop hooks.
+
+Vendored identically into auto-code-quality and session-context.
+
+Every Edit/Write appends one binary record to
+/tmp/claude-edits-{uid}-{session_id}.journal:
+
+  header   → magic b"EJ", format version, path length, edit id length,
+             timestamp (seconds), sha256 of the file after the edit
+  body     → path and edit id (the hook's tool_use_id), utf-8
+  trailer  → record length, so the last record can be read from the end
+
+Both plugins' collectors call append(). Appends hold an flock and skip a
+record whose edit id matches the journal's last record, so one edit is one
+record even with both plugins enabled.
+
+Readers never truncate or unlink the journal. Each consumer ("format",
+"lint", "tests") keeps its own byte offset in
+/tmp/claude-edits-{uid}-{session_id}.{consumer}: Cursor.read() returns the
+records after it and Cursor.commit() moves it past them. Stop hooks that
+run at the same time therefore never race over one file. A record that is
+still being written is left for the next read. Journal and cursor files
+older than MAX_AGE are removed whenever a new journal is started.
+"""
+
+import fcntl
+import glob
+import hashlib
+import os
+import struct
+import time
+from typing import NamedTuple
+
+JOURNAL_DIR = "/tmp"
+
+MAX_AGE = 7 * 24 * 3600
+
+MAGIC = b"EJ"
+VERSION = 1
+
+# magic, version, path length, edit id length, timestamp, sha256 digest
+_HEADER = struct.Struct("<2sBHHd32s")
+# total record length
+_TRAILER = struct.Struct("<I")
+
+_NO_DIGEST = bytes(32)
+
+
+class Edit(NamedTuple):
+    path: str
+    timestamp: float
+    sha256: str  # hex digest of the file after the edit, "" if unreadable
+    edit_id: str
+
+
+def _prefix(session_id: str) -> str:
+    return os.path.join(JOURNAL_DIR, f"claude-edits-{os.getuid()}-{session_id}")
+
+
+def journal_path(session_id: str) -> str:
+    return _prefix(session_id) + ".journal"
+
+
+def cursor_path(session_id: str, consumer: str) -> str:
+    return f"{_prefix(session_id)}.{consumer}"
+
+
+# ── Records ─────────────────────────────────────────────────────────
+
+
+def _digest(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").digest()
+    except OSError:
+        return _NO_DIGEST
+
+
+def encode(edit: Edit) -> bytes:
+    path = edit.path.encode()
+    edit_id = edit.edit_id.encode()
+    digest = bytes.fromhex(edit.sha256) if edit.sha256 else _NO_DIGEST
+    header = _HEADER.pack(
+        MAGIC, VERSION, len(path), len(edit_id), edit.timestamp, digest
+    )
+    length = len(header) + len(path) + len(edit_id) + _TRAILER.size
+    return header + path + edit_id + _TRAILER.pack(length)
+
+
+def decode(data: bytes, offset: int = 0) -> tuple[list[Edit], int]:
+    """Records in data[offset:] and the offset just past the last whole one.
+
+    A corrupt record ends the journal: the returned offset skips to the end
+    of data so readers do not stop on it forever.
+    """
+    edits: list[Edit] = []
+    while offset + _HEADER.size <= len(data):
+        magic, version, path_len, id_len, timestamp, digest = _HEADER.unpack_from(
+            data, offset
+        )
+        if magic != MAGIC or version != VERSION:
+            return edits, len(data)
+        start = offset + _HEADER.size
+        end = start + path_len + id_len + _TRAILER.size
+        if end > len(data):
+            break
+        try:
+            path = data[start : start + path_len].decode()
+            edit_id = data[start + path_len : start + path_len + id_len].decode()
+        except UnicodeDecodeError:
+            return edits, len(data)
+        sha256 = digest.hex() if digest != _NO_DIGEST else ""
+        edits.append(Edit(path, timestamp, sha256, edit_id))
+        offset = end
+    return edits, offset
+
+
+def _last_edit_id(fd: int, size: int) -> str:
+    if size < _TRAILER.size:
+        return ""
+    (length,) = _TRAILER.unpack(os.pread(fd, _TRAILER.size, size - _TRAILER.size))
+    if length > size:
+        return ""
+    edits, _ = decode(os.pread(fd, length, size - length))
+    return edits[0].edit_id if edits else ""
+
+
+# ── Writing ─────────────────────────────────────────────────────────
+
+
+def append(session_id: str, path: str, edit_id: str = "") -> bool:
+    """Record an edit of path; False if it was already recorded or failed."""
+    record = encode(Edit(path, time.time(), _digest(path).hex(), edit_id))
+    journal = journal_path(session_id)
+    try:
+        fd = os.open(journal, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        size = os.fstat(fd).st_size
+        if edit_id and _last_edit_id(fd, size) == edit_id:
+            return False
+        os.write(fd, record)
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    if size == 0:
+        prune()
+    return True
+
+
+def prune() -> None:
+    """Remove journals and cursors not touched for MAX_AGE."""
+    cutoff = time.time() - MAX_AGE
+    for path in glob.glob(os.path.join(JOURNAL_DIR, f"claude-edits-{os.getuid()}-*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+# ── Reading ─────────────────────────────────────────────────────────
+
+
+def read_all(session_id: str) -> list[Edit]:
+    """Every edit recorded this session."""
+    try:
+        with open(journal_path(session_id), "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    return decode(data)[0]
+
+
+def unique_paths(edits: list[Edit]) -> list[str]:
+    """Edited paths, first edit first, each once."""
+    return list(dict.fromkeys(edit.path for edit in edits))
+
+
+class Cursor:
+    """One consumer's read position in a session's journal."""
+
+    def __init__(self, session_id: str, consumer: str) -> None:
+        self._journal = journal_path(session_id)
+        self._path = cursor_path(session_id, consumer)
+        self._offset = self._load()
+        self._next = self._offset
+
+    def _load(self) -> int:
+        try:
+            with open(self._path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def read(self) -> list[Edit]:
+        """Edits recorded since the last commit()."""
+        try:
+            with open(self._journal, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if self._offset > size:
+                    # A new journal under the same name; start over
+                    self._offset = 0
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return []
+        edits, end = decode(data)
+        self._next = self._offset + end
+        return edits
+
+    def commit(self) -> None:
+        """Mark everything returned by read() as consumed."""
+        if self._next == self._offset:
+            return
+        tmp = f"{self._path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(str(self._next))
+            os.replace(tmp, self._path)
+            self._offset = self._next
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
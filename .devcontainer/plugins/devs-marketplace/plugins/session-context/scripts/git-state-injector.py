@@ -6,20 +6,38 @@ Runs git commands to gather branch, status, recent commits, and uncommitted
 changes. Injects the results as additionalContext so Claude starts every
 session knowing the current git state.
 
+Branch and status come from one `git status --short --branch`; it runs
+concurrently with `git log` and `git diff --stat`, so a cold repository
+costs the slowest query instead of the sum of four. The rendered summary
+is cached per directory (/tmp/claude-git-state-{uid}-{hash}.json) against
+the mtime and size of .git/HEAD, the index, the current branch ref and
+packed-refs, and reused for CACHE_TTL seconds: a /clear, compaction or
+resume shortly after the last summary is answered without running git.
+Unstaged edits made in that window do not touch those files, which is why
+the cache expires.
+
 Reads hook input from stdin (JSON). Returns JSON on stdout.
 Always exits 0 (advisory, never blocking).
 """
 
+import hashlib
 import json
 import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 GIT_CMD_TIMEOUT = 5
 STATUS_LINE_CAP = 20
 DIFF_STAT_LINE_CAP = 15
 TOTAL_OUTPUT_CAP = 2000
 
+CACHE_DIR = "/tmp"
+CACHE_VERSION = 1
+# Seconds a cached summary is reused while the repository files are unchanged
+CACHE_TTL = 300
+
 
 def _run_git(args: list[str], cwd: str) -> str | None:
     """Run a git command and return stdout, or None on any failure."""
@@ -46,34 +64,137 @@ def _cap_lines(text: str, limit: int) -> str:
     return "\n".join(lines[:limit]) + f"\n...({len(lines) - limit} more lines)"
 
 
-def main():
-    # Parse hook input to get cwd from Claude Code (falls back to os.getcwd())
-    cwd = os.getcwd()
+def _parse_branch(header: str) -> str:
+    """Branch name from the `## ...` line of `git status --branch`."""
+    head = header[3:]
+    for prefix in ("No commits yet on ", "Initial commit on "):
+        if head.startswith(prefix):
+            return head[len(prefix) :]
+    if head.startswith("HEAD (no branch)"):
+        return ""
+    return head.split("...", 1)[0].split(" ", 1)[0]
+
+
+# ── Cache ───────────────────────────────────────────────────────────
+
+
+def _cache_path(cwd: str) -> str:
+    digest = hashlib.sha1(os.path.realpath(cwd).encode()).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"claude-git-state-{os.getuid()}-{digest}.json")
+
+
+def _git_dir(cwd: str) -> str | None:
+    """The repository's git directory, found without running git."""
+    path = os.path.realpath(cwd)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules: "gitdir: <path>"
+            try:
+                with open(dot_git) as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            return os.path.normpath(os.path.join(path, line[7:].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _fingerprint(cwd: str) -> list | None:
+    """Stat of the files every query result depends on, or None if unknown."""
+    git_dir = _git_dir(cwd)
+    if git_dir is None:
+        return None
+    common_dir = git_dir
     try:
-        input_data = json.load(sys.stdin)
-        cwd = input_data.get("cwd", cwd)
-    except (json.JSONDecodeError, ValueError):
+        with open(os.path.join(git_dir, "commondir")) as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
         pass
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    paths = [
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(git_dir, "index"),
+        os.path.join(common_dir, "packed-refs"),
+    ]
+    if head.startswith("ref: "):
+        paths.append(os.path.join(common_dir, head[5:]))
+
+    stats: list = [os.path.realpath(cwd)]
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats.append([path, st.st_mtime_ns, st.st_size])
+        except OSError:
+            stats.append([path, None, None])
+    return stats
 
-    # Check if we're in a git repo at all
-    branch = _run_git(["branch", "--show-current"], cwd)
-    if branch is None:
-        # Not a git repo or git not available — still inject working directory
-        output = (
-            f"[Git State]\n"
-            f"Working Directory: {cwd} — restrict all file operations to this "
-            f"directory unless explicitly instructed otherwise."
-        )
-        json.dump(
-            {
-                "hookSpecificOutput": {
-                    "hookEventName": "SessionStart",
-                    "additionalContext": output,
-                }
-            },
-            sys.stdout,
-        )
-        sys.exit(0)
+
+def _load_cached(cwd: str, fingerprint: list) -> str | None:
+    try:
+        with open(_cache_path(cwd)) as f:
+            data = json.load(f)
+        if (
+            data["version"] == CACHE_VERSION
+            and data["fingerprint"] == fingerprint
+            and 0 <= time.time() - data["time"] < CACHE_TTL
+        ):
+            return data["output"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_cached(cwd: str, fingerprint: list, output: str) -> None:
+    path = _cache_path(cwd)
+    tmp = f"{path}.{os.getpid()}"
+    data = {
+        "version": CACHE_VERSION,
+        "fingerprint": fingerprint,
+        "time": time.time(),
+        "output": output,
+    }
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# ── Summary ─────────────────────────────────────────────────────────
+
+
+def _render(cwd: str) -> str | None:
+    """The git state summary, or None outside a git repository."""
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        status_future = pool.submit(_run_git, ["status", "--short", "--branch"], cwd)
+        log_future = pool.submit(_run_git, ["log", "--oneline", "-5"], cwd)
+        diff_future = pool.submit(_run_git, ["diff", "--stat"], cwd)
+        status = status_future.result()
+        log = log_future.result()
+        diff_stat = diff_future.result()
+
+    if status is None or not status.startswith("## "):
+        # Not a git repo or git not available
+        return None
+
+    header, _, status = status.partition("\n")
+    branch = _parse_branch(header)
 
     sections = []
     sections.append(
@@ -83,12 +204,11 @@ def main():
     sections.append(f"Branch: {branch or '(detached HEAD)'}")
 
     # Git status
-    status = _run_git(["status", "--short"], cwd)
     if status:
         status_lines = status.splitlines()
-        modified = sum(1 for l in status_lines if l.strip() and l[0:1] == "M")
+        modified = sum(1 for l in status_lines if "M" in l[0:2])
         added = sum(1 for l in status_lines if l[0:1] == "A")
-        deleted = sum(1 for l in status_lines if l[0:1] == "D")
+        deleted = sum(1 for l in status_lines if "D" in l[0:2])
         untracked = sum(1 for l in status_lines if l[0:2] == "??")
 
         counts = []
@@ -108,12 +228,10 @@ def main():
         sections.append("Status: clean")
 
     # Recent commits
-    log = _run_git(["log", "--oneline", "-5"], cwd)
     if log:
         sections.append(f"Recent commits:\n{log}")
 
     # Uncommitted diff stats
-    diff_stat = _run_git(["diff", "--stat"], cwd)
     if diff_stat:
         sections.append(
             f"Uncommitted changes:\n{_cap_lines(diff_stat, DIFF_STAT_LINE_CAP)}"
@@ -124,6 +242,35 @@ def main():
     # Cap total output to avoid context bloat
     if len(output) > TOTAL_OUTPUT_CAP:
         output = output[:TOTAL_OUTPUT_CAP] + "\n...(truncated)"
+    return output
+
+
+def main():
+    # Parse hook input to get cwd from Claude Code (falls back to os.getcwd())
+    cwd = os.getcwd()
+    try:
+        input_data = json.load(sys.stdin)
+        cwd = input_data.get("cwd", cwd)
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    fingerprint = _fingerprint(cwd)
+    output = _load_cached(cwd, fingerprint) if fingerprint else None
+    if output is None:
+        output = _render(cwd)
+        if output is not None and fingerprint:
+            # git status may have refreshed the index; key on what it left
+            fingerprint = _fingerprint(cwd)
+            if fingerprint:
+                _save_cached(cwd, fingerprint, output)
+
+    if output is None:
+        # Not a git repo or git not available — still inject working directory
+        output = (
+            f"[Git State]\n"
+            f"Working Directory: {cwd} — restrict all file operations to this "
+            f"directory unless explicitly instructed otherwise."
+        )
 
     json.dump(
         {
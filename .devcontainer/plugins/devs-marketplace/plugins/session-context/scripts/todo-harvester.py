@@ -2,9 +2,11 @@
 """
 TODO/FIXME harvester — SessionStart hook that surfaces tech debt markers.
 
-Greps the codebase for TODO/FIXME/HACK/XXX comments and injects a count
-plus the top items as additionalContext so Claude can proactively mention
-tech debt when relevant.
+Reads the project's TODO/FIXME/HACK/XXX index (todo_index.py), which only
+re-reads files changed since the last session, and injects the total, the
+counts per top-level directory and the top items (most recently modified
+files first) as additionalContext so Claude can proactively mention tech
+debt when relevant.
 
 Reads hook input from stdin (JSON). Returns JSON on stdout.
 Always exits 0 (advisory, never blocking).
@@ -12,45 +14,14 @@ Always exits 0 (advisory, never blocking).
 
 import json
 import os
-import subprocess
 import sys
 
-GREP_TIMEOUT = 5
+import todo_index
+
 MAX_ITEMS = 10
+MAX_DIRS = 5
 TOTAL_OUTPUT_CAP = 800
 
-SOURCE_INCLUDES = [
-    "--include=*.py",
-    "--include=*.ts",
-    "--include=*.tsx",
-    "--include=*.js",
-    "--include=*.jsx",
-    "--include=*.go",
-    "--include=*.rs",
-    "--include=*.sh",
-    "--include=*.svelte",
-    "--include=*.vue",
-    "--include=*.rb",
-    "--include=*.java",
-    "--include=*.kt",
-]
-
-EXCLUDE_DIRS = [
-    "--exclude-dir=node_modules",
-    "--exclude-dir=.git",
-    "--exclude-dir=__pycache__",
-    "--exclude-dir=.venv",
-    "--exclude-dir=venv",
-    "--exclude-dir=dist",
-    "--exclude-dir=build",
-    "--exclude-dir=vendor",
-    "--exclude-dir=.next",
-    "--exclude-dir=.nuxt",
-    "--exclude-dir=target",
-    "--exclude-dir=.mypy_cache",
-    "--exclude-dir=.pytest_cache",
-]
-
 
 def main():
     try:
@@ -60,58 +31,32 @@ def main():
 
     cwd = os.getcwd()
 
-    cmd = (
-        ["grep", "-rn", "-E", r"\b(TODO|FIXME|HACK|XXX)\b"]
-        + SOURCE_INCLUDES
-        + EXCLUDE_DIRS
-        + [cwd]
-    )
-
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=GREP_TIMEOUT,
-        )
-    except (FileNotFoundError, OSError, subprocess.TimeoutExpired):
+        index = todo_index.load(cwd)
+    except OSError:
         sys.exit(0)
 
-    # grep returns 1 for no matches — that's fine
-    output = result.stdout.strip()
-    if not output:
+    if not index.total:
         sys.exit(0)
 
-    lines = output.splitlines()
-    total_count = len(lines)
-
-    # Count unique files
-    files_seen: set[str] = set()
-    items: list[str] = []
-
-    for line in lines:
-        # Format: filepath:linenum:content
-        parts = line.split(":", 2)
-        if len(parts) >= 3:
-            filepath = parts[0]
-            files_seen.add(filepath)
-
-            if len(items) < MAX_ITEMS:
-                # Make path relative to cwd for readability
-                rel_path = os.path.relpath(filepath, cwd)
-                line_num = parts[1]
-                content = parts[2].strip()
-
-                # Trim long lines
-                if len(content) > 80:
-                    content = content[:77] + "..."
-
-                items.append(f"  {rel_path}:{line_num}: {content}")
-
-    file_count = len(files_seen)
     header = (
-        f"[Tech Debt] {total_count} TODO/FIXME items found across {file_count} files"
+        f"[Tech Debt] {index.total} TODO/FIXME items found across "
+        f"{index.file_count} files"
     )
+    if index.pending:
+        header += f" ({index.pending} changed files not scanned yet)"
+
+    directories = index.by_directory()
+    if len(directories) > 1:
+        counts = ", ".join(f"{name} {count}" for name, count in directories[:MAX_DIRS])
+        header += f"\nBy directory: {counts}"
+
+    items = []
+    for rel_path, line_num, content in index.top(MAX_ITEMS):
+        # Trim long lines
+        if len(content) > 80:
+            content = content[:77] + "..."
+        items.append(f"  {rel_path}:{line_num}: {content}")
 
     if items:
         body = header + "\nTop items:\n" + "\n".join(items)
@@ -0,0 +1,248 @@
+"""
+Incremental tech-debt marker index for todo-harvester.py.
+
+Every TODO/FIXME/HACK/XXX line in the project's source files is cached per
+project together with each file's mtime and size. A SessionStart re-reads
+only the files whose mtime or size changed, so after the first session the
+cost is one file listing plus a stat per file.
+
+The index is kept with the project: in its git directory
+(.git/codeforge-todos-{project-hash}.json), which git never tracks and
+which lives on the workspace mount, so it survives container rebuilds.
+Outside a git work tree it falls back to
+/tmp/claude-todos-{uid}-{project-hash}.json.
+
+Files are listed with `git ls-files --cached --others --exclude-standard`
+inside a git work tree, so ignored build output is never read, and with a
+directory walk that skips SKIP_DIRS otherwise. Both are filtered to
+SOURCE_EXTS. Scanning stops at SCAN_BUDGET seconds: what was read so far
+is stored and the rest is picked up by the next session, so a large
+project fills its index over a few sessions instead of timing out.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+
+CACHE_DIR = "/tmp"
+CACHE_VERSION = 1
+
+SOURCE_EXTS = frozenset((
+    ".py", ".ts", ".tsx", ".js", ".jsx", ".go", ".rs",
+    ".sh", ".svelte", ".vue", ".rb", ".java", ".kt",
+))
+
+# Directories never walked outside git (besides hidden ones)
+SKIP_DIRS = {
+    "node_modules",
+    "__pycache__",
+    "venv",
+    "dist",
+    "build",
+    "vendor",
+    "target",
+}
+
+MARKER = re.compile(rb"\b(?:TODO|FIXME|HACK|XXX)\b")
+
+# Seconds spent reading changed files before the rest waits for next time
+SCAN_BUDGET = 3.0
+
+GIT_TIMEOUT = 3
+
+# Larger files (bundles, generated code) are not read
+MAX_FILE_BYTES = 1024 * 1024
+
+# Marker lines kept per file, and their length
+MAX_PER_FILE = 50
+MAX_LINE = 200
+
+MAX_FILES = 100000
+
+
+def _git_dir(root: str) -> str | None:
+    """The git directory of the work tree containing root, if any."""
+    current = os.path.realpath(root)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules point at their git directory
+            try:
+                with open(dot_git) as f:
+                    line = f.readline()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            return os.path.join(current, line[len("gitdir:") :].strip())
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def cache_path(root: str) -> str:
+    digest = hashlib.sha1(os.path.realpath(root).encode()).hexdigest()[:12]
+    git_dir = _git_dir(root)
+    if git_dir is not None and os.access(git_dir, os.W_OK):
+        return os.path.join(git_dir, f"codeforge-todos-{digest}.json")
+    return os.path.join(CACHE_DIR, f"claude-todos-{os.getuid()}-{digest}.json")
+
+
+# ── Listing ─────────────────────────────────────────────────────────
+
+
+def _git_files(root: str) -> list[str] | None:
+    """Tracked and untracked-but-not-ignored files, or None outside git."""
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            capture_output=True,
+            timeout=GIT_TIMEOUT,
+        )
+    except (FileNotFoundError, OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    paths = result.stdout.decode(errors="surrogateescape").split("\0")
+    return [os.path.normpath(p) for p in paths if p]
+
+
+def _walk_files(root: str) -> list[str]:
+    found: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS
+        ]
+        for name in filenames:
+            found.append(os.path.relpath(os.path.join(dirpath, name), root))
+        if len(found) > MAX_FILES:
+            break
+    return found
+
+
+def list_files(root: str) -> list[str]:
+    """Source files under root, relative to it."""
+    files = _git_files(root)
+    if files is None:
+        files = _walk_files(root)
+    return [f for f in files if os.path.splitext(f)[1] in SOURCE_EXTS][:MAX_FILES]
+
+
+# ── Scanning ────────────────────────────────────────────────────────
+
+
+def scan_file(path: str) -> tuple[int, list[list]]:
+    """Marker line count of a file, and the first MAX_PER_FILE of them.
+
+    Lines are [line number, stripped text].
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return 0, []
+    if len(data) > MAX_FILE_BYTES or not MARKER.search(data):
+        return 0, []
+
+    count = 0
+    items: list[list] = []
+    for number, line in enumerate(data.splitlines(), 1):
+        if MARKER.search(line):
+            count += 1
+            if len(items) < MAX_PER_FILE:
+                text = line.decode(errors="replace").strip()
+                items.append([number, text[:MAX_LINE]])
+    return count, items
+
+
+def load(root: str) -> "TodoIndex":
+    """The marker index for root, re-reading only files that changed."""
+    path = cache_path(root)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        cached = data["files"] if data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        cached = {}
+
+    deadline = time.monotonic() + SCAN_BUDGET
+    files: dict[str, list] = {}
+    pending = 0
+    changed = False
+    for rel in list_files(root):
+        try:
+            st = os.stat(os.path.join(root, rel))
+        except OSError:
+            continue
+        entry = cached.get(rel)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            files[rel] = entry
+        elif time.monotonic() < deadline:
+            count, items = scan_file(os.path.join(root, rel))
+            files[rel] = [st.st_mtime_ns, st.st_size, count, items]
+            changed = True
+        else:
+            # Keep reporting the old markers until it is re-read
+            if entry:
+                files[rel] = entry
+            pending += 1
+    changed = changed or len(files) != len(cached)
+
+    if changed:
+        tmp = f"{path}.{os.getpid()}"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"version": CACHE_VERSION, "files": files}, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    return TodoIndex(files, pending)
+
+
+# ── Reporting ───────────────────────────────────────────────────────
+
+
+class TodoIndex:
+    """Marker lines per file, plus the number of files not yet read."""
+
+    def __init__(self, files: dict[str, list], pending: int = 0):
+        # relpath → [mtime_ns, size, marker count, [[line, text], ...]]
+        self._files = {rel: entry for rel, entry in files.items() if entry[2]}
+        self.pending = pending
+
+    @property
+    def total(self) -> int:
+        return sum(entry[2] for entry in self._files.values())
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def by_directory(self) -> list[tuple[str, int]]:
+        """Marker count per top-level directory, largest first."""
+        counts: dict[str, int] = {}
+        for rel, entry in self._files.items():
+            top = rel.split(os.sep, 1)[0] if os.sep in rel else "."
+            counts[top] = counts.get(top, 0) + entry[2]
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def top(self, limit: int) -> list[tuple[str, int, str]]:
+        """(relpath, line, text) from the most recently modified files."""
+        items: list[tuple[str, int, str]] = []
+        for rel in sorted(self._files, key=lambda r: (-self._files[r][0], r)):
+            for number, text in self._files[rel][3]:
+                items.append((rel, number, text))
+                if len(items) >= limit:
+                    return items
+        return items
@@ -0,0 +1,206 @@
+"""
+Precompiled skill vocabulary index for skill-suggester.py.
+
+Every phrase, term, negative pattern and context guard of every skill
+found by skill_manifest.py (the `suggest:` blocks of SKILL.md frontmatter)
+is normalized (lowered) into one vocabulary. regex_for() picks the words
+that occur in a piece of lowered prompt (a C-level substring test each)
+and compiles just those into one trie-shaped regex, so the text is scanned
+once by the regex engine (all overlapping hits, longest first at each
+position) instead of once per skill and vocabulary entry. Compiling a
+regex over the whole vocabulary would cost more than the scan, and grows
+with the number of skills.
+
+Reading the SKILL.md files costs more than the scan too, so the index is
+stored in /tmp/claude-skill-index-{uid}-{plugins-dir-checksum}.json, keyed
+by the path, mtime and size of every SKILL.md, a checksum of the two
+modules that build it, and the Python version. A prompt then lists and
+stats the SKILL.md files and reads one JSON file; the files themselves are
+only read when the key changes, including when a skill is added or
+removed. A process that stays up (the hook-daemon feature) keeps the
+loaded index while the key is unchanged.
+
+zlib.crc32 stands in for hashlib here: importing hashlib alone costs more
+than loading the whole index.
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+
+import skill_manifest
+
+CACHE_DIR = "/tmp"
+
+
+def index_path() -> str:
+    digest = zlib.crc32(skill_manifest.PLUGINS_DIR.encode())
+    name = f"claude-skill-index-{os.getuid()}-{digest:08x}.json"
+    return os.path.join(CACHE_DIR, name)
+
+
+def _source_key(paths: list[str]) -> str | None:
+    """Checksum of the skill files' stat, the code reading them and Python."""
+    checksum = zlib.crc32(sys.version.encode())
+    for module in (skill_manifest.__file__, __file__):
+        try:
+            with open(module, "rb") as f:
+                checksum = zlib.crc32(f.read(), checksum)
+        except OSError:
+            return None
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = f"{path}\0{st.st_mtime_ns}\0{st.st_size}\0"
+        checksum = zlib.crc32(entry.encode(errors="surrogateescape"), checksum)
+    return f"{checksum:08x}"
+
+
+# ── Building ────────────────────────────────────────────────────────
+
+
+def _trie_pattern(words) -> str:
+    """A regex matching any of *words*, factored by common prefix.
+
+    Optional tails are greedy, so at a given position the longest word
+    that matches there wins.
+    """
+    root: dict = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node: dict) -> str:
+        branches = [
+            re.escape(char) + pattern(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1:
+            body = branches[0]
+        else:
+            body = "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return pattern(root)
+
+
+def build(skills: dict[str, dict]) -> dict:
+    """The serializable index of skill configs (skill_manifest.read_skills).
+
+    skills      → [name, priority, has context guards] in skill file order
+    vocabulary  → lowered word → [[skill, kind, phrase weight], ...], kind
+                  being "phrase", "term", "negative" or "guard"
+    """
+    vocabulary: dict[str, list] = {}
+    for skill, cfg in skills.items():
+        entries = (
+            [(phrase, "phrase", weight) for phrase, weight in cfg["phrases"]]
+            + [(term.lower(), "term", 0.0) for term in cfg["terms"]]
+            + [(neg, "negative", 0.0) for neg in cfg.get("negative", [])]
+            + [(guard, "guard", 0.0) for guard in cfg.get("context_guards", [])]
+        )
+        for word, kind, weight in entries:
+            if word:
+                vocabulary.setdefault(word, []).append([skill, kind, weight])
+
+    return {
+        "skills": [
+            [skill, cfg.get("priority", 0), bool(cfg.get("context_guards"))]
+            for skill, cfg in skills.items()
+        ],
+        "vocabulary": vocabulary,
+    }
+
+
+# ── Loading ─────────────────────────────────────────────────────────
+
+
+class SkillIndex:
+    """A loaded index."""
+
+    def __init__(self, data: dict) -> None:
+        self.skills: list[list] = data["skills"]
+        self.vocabulary: dict[str, list] = data["vocabulary"]
+        self._prefixes: dict[str, list[str]] = {}
+
+    def prefixes(self, word: str) -> list[str]:
+        """The words *word* starts with, itself first.
+
+        The scan reports the longest word at each position; these are the
+        other words found at the same place.
+        """
+        found = self._prefixes.get(word)
+        if found is None:
+            found = self._prefixes[word] = [
+                word[:n] for n in range(len(word), 0, -1) if word[:n] in self.vocabulary
+            ]
+        return found
+
+    def regex_for(self, text: str) -> re.Pattern[str] | None:
+        """The scan regex over the words that occur in *text*, if any.
+
+        It finds the same hits in *text* as a regex over the whole
+        vocabulary would. The words are inside a lookahead so that
+        overlapping words are all found.
+        """
+        words = [word for word in self.vocabulary if word in text]
+        if not words:
+            return None
+        return re.compile("(?=(" + _trie_pattern(words) + "))")
+
+
+def _read(path: str, key: str) -> dict | None:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data["key"] == key:
+            return data
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write(path: str, data: dict) -> None:
+    tmp = f"{path}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# (key, index) of the last load() in this process
+_loaded: tuple[str, SkillIndex] | None = None
+
+
+def load() -> SkillIndex:
+    """The index for the current skill files, rebuilt if any of them changed."""
+    global _loaded
+    paths = skill_manifest.skill_files()
+    key = _source_key(paths)
+    if key and _loaded and _loaded[0] == key:
+        return _loaded[1]
+    path = index_path()
+    data = _read(path, key) if key else None
+    if data is None:
+        data = build(skill_manifest.read_skills(paths))
+        if key:
+            data["key"] = key
+            _write(path, data)
+    index = SkillIndex(data)
+    if key:
+        _loaded = (key, index)
+    return index
@@ -0,0 +1,218 @@
+"""
+Skill definitions discovered from SKILL.md frontmatter for skill-suggester.py.
+
+Every plugin next to skill-engine (plugins/*/skills/*/SKILL.md) and every
+user skill (~/.claude/skills/*/SKILL.md) can opt into auto-suggestion with
+a `suggest:` block in its frontmatter:
+
+  suggest:
+    priority: 7
+    phrases:
+      "build a fastapi app": 1.0
+      "fastapi": 0.9
+    terms: ["fastapi", "uvicorn"]
+    negative: ["pydantic-ai"]
+    context_guards: [
+      "api", "endpoint", "route"
+    ]
+
+  priority        → integer tie-breaker. Higher = preferred when scores are
+                    equal. 10 = explicit commands, 7 = technology,
+                    5 = practice/pattern, 3 = meta/generic
+  phrases         → lowercase substring → weight 0.0-1.0, how confidently
+                    the phrase indicates the skill
+  terms           → whole-word terms (case-insensitive), all scored at the
+                    suggester's TERM_WEIGHT
+  negative        → (optional) substrings that instantly disqualify the
+                    skill, even if phrases/terms matched
+  context_guards  → (optional) substrings. When the best match score is
+                    below the suggester's CONTEXT_GUARD_THRESHOLD, at least
+                    one guard must be present in the prompt or the match is
+                    dropped
+
+Values are written in JSON syntax (double-quoted strings, numbers, arrays),
+which is also valid YAML, so the block is read here without PyYAML. A
+skill whose block does not parse is left out. Skills without the block can
+still be activated manually but are never suggested.
+
+skill_index.py compiles what this module reads into the stored index, and
+only calls read_skills() when one of the files from skill_files() changed.
+"""
+
+import json
+import os
+import re
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The marketplace's plugins directory: skill-engine/scripts/../..
+PLUGINS_DIR = os.path.dirname(os.path.dirname(_HERE))
+USER_SKILLS_DIR = os.path.expanduser("~/.claude/skills")
+
+_NAME = re.compile(r"^name:\s*(.+?)\s*$", re.MULTILINE)
+_KEY = re.compile(r"^  ([a-z_]+):\s*(.*)$")
+
+
+def _subdirs(path: str) -> list[str]:
+    try:
+        return [
+            entry.path
+            for entry in os.scandir(path)
+            if entry.is_dir() and not entry.name.startswith(".")
+        ]
+    except OSError:
+        return []
+
+
+def _skill_files_in(skill_dirs: list[str]) -> list[str]:
+    files = (os.path.join(d, "SKILL.md") for d in skill_dirs)
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def skill_files() -> list[str]:
+    """Every SKILL.md that may define a suggestable skill, in load order.
+
+    Plugin skills come first, sorted by path (plugin directory, then skill
+    directory), then user skills. The suggester breaks ties in score and
+    priority by this order.
+
+    Listed with os.scandir() rather than glob, whose import alone costs
+    about as much as the listing on a cold start.
+    """
+    skill_dirs = [
+        skill_dir
+        for plugin in _subdirs(PLUGINS_DIR)
+        for skill_dir in _subdirs(os.path.join(plugin, "skills"))
+    ]
+    return _skill_files_in(skill_dirs) + _skill_files_in(_subdirs(USER_SKILLS_DIR))
+
+
+# ── Frontmatter ─────────────────────────────────────────────────────
+
+
+def _frontmatter(text: str) -> str | None:
+    if not text.startswith("---\n"):
+        return None
+    end = text.find("\n---", 3)
+    if end == -1:
+        return None
+    return text[4 : end + 1]
+
+
+def _block(frontmatter: str) -> list[str] | None:
+    """The indented lines under `suggest:`, or None without one."""
+    lines = frontmatter.splitlines()
+    try:
+        start = lines.index("suggest:")
+    except ValueError:
+        return None
+    block: list[str] = []
+    for line in lines[start + 1 :]:
+        if line and not line[0].isspace():
+            break
+        if line.strip() and not line.lstrip().startswith("#"):
+            block.append(line)
+    return block
+
+
+def _string_list(value, key: str) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{key} must be a list of strings")
+    return value
+
+
+def parse_suggest(frontmatter: str) -> dict | None:
+    """The `suggest:` block as a skill config, or None if there is none.
+
+    Phrases come back as (phrase, weight) pairs in file order. Raises
+    ValueError when the block is malformed.
+    """
+    lines = _block(frontmatter)
+    if lines is None:
+        return None
+
+    raw: dict = {}
+    i = 0
+    while i < len(lines):
+        match = _KEY.match(lines[i])
+        if not match:
+            raise ValueError(f"unexpected line: {lines[i].strip()}")
+        key, value = match.groups()
+        i += 1
+        if not value:
+            # A mapping: `"phrase": weight` lines indented further
+            pairs: list[tuple[str, float]] = []
+            while i < len(lines) and lines[i].startswith("    "):
+                entry = lines[i].strip()
+                try:
+                    phrase, end = json.JSONDecoder().raw_decode(entry)
+                    colon, number = entry[end:].split(":", 1)
+                    weight = json.loads(number)
+                except ValueError:
+                    raise ValueError(f"bad {key} entry: {entry}") from None
+                if colon.strip() or not isinstance(phrase, str):
+                    raise ValueError(f"bad {key} entry: {entry}")
+                if not isinstance(weight, (int, float)):
+                    raise ValueError(f"bad {key} weight: {entry}")
+                pairs.append((phrase, float(weight)))
+                i += 1
+            raw[key] = pairs
+            continue
+        # A scalar, or an array that may continue up to the next key
+        while True:
+            try:
+                raw[key] = json.loads(value)
+                break
+            except ValueError:
+                if i >= len(lines) or _KEY.match(lines[i]):
+                    raise ValueError(f"bad {key} value") from None
+                value += "\n" + lines[i]
+                i += 1
+
+    priority = raw.get("priority", 0)
+    if not isinstance(priority, int):
+        raise ValueError("priority must be an integer")
+    phrases = raw.get("phrases", [])
+    if phrases == {}:
+        phrases = []
+    if not isinstance(phrases, list):
+        raise ValueError("phrases must be a mapping")
+    cfg: dict = {
+        "phrases": phrases,
+        "terms": _string_list(raw.get("terms", []), "terms"),
+        "priority": priority,
+    }
+    for key in ("negative", "context_guards"):
+        if key in raw:
+            cfg[key] = _string_list(raw[key], key)
+    return cfg
+
+
+# ── Skills ──────────────────────────────────────────────────────────
+
+
+def read_skills(paths: list[str]) -> dict[str, dict]:
+    """Skill name → config for every file with a valid `suggest:` block.
+
+    A name already defined by an earlier file is not redefined.
+    """
+    skills: dict[str, dict] = {}
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                frontmatter = _frontmatter(f.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        if frontmatter is None:
+            continue
+        try:
+            cfg = parse_suggest(frontmatter)
+        except ValueError:
+            continue
+        if cfg is None:
+            continue
+        match = _NAME.search(frontmatter)
+        name = match.group(1).strip("\"'") if match else ""
+        name = name or os.path.basename(os.path.dirname(path))
+        skills.setdefault(name, cfg)
+    return skills
@@ -6,20 +6,52 @@ When the user's prompt contains #123 or a full GitHub issue/PR URL,
 fetches the ticket body via `gh` and injects it as additionalContext
 so Claude has the full ticket context without the user copy-pasting.
 
+Prompts longer than the scan window (a pasted log, say) are searched in
+slices: the head, the tail and evenly spaced samples of the middle, and
+the search stops at MAX_REFS references, so its cost does not grow with
+the prompt.
+
+Tickets are fetched concurrently, one `gh api` call each, and the
+rendered ticket is cached per repository and number in
+/tmp/claude-tickets-{uid}.json together with the response's ETag. For
+CACHE_TTL seconds a cached ticket is used without calling gh at all;
+after that the request carries If-None-Match, so an unchanged ticket is
+answered with 304 Not Modified instead of its body. When gh fails, a
+cached ticket up to CACHE_MAX_AGE seconds old is used instead.
+
 Reads hook input from stdin (JSON). Returns JSON on stdout.
 Always exits 0 (advisory, never blocking).
 """
 
 import json
+import os
 import re
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 GH_CMD_TIMEOUT = 5
 MAX_REFS = 3
 BODY_CHAR_CAP = 1500
 TOTAL_OUTPUT_CAP = 3000
 
+CACHE_DIR = "/tmp"
+CACHE_VERSION = 1
+# Seconds a cached ticket is used without asking GitHub whether it changed
+CACHE_TTL = 300
+# Seconds a cached ticket is kept, and used when gh fails
+CACHE_MAX_AGE = 86400
+
+# Prompts up to SCAN_HEAD + SCAN_TAIL + SCAN_SAMPLES * SCAN_SAMPLE_CHARS
+# characters are searched whole; longer ones only in the first SCAN_HEAD
+# characters, SCAN_SAMPLES evenly spaced slices of the middle and the last
+# SCAN_TAIL characters.
+SCAN_HEAD = 16_000
+SCAN_TAIL = 4_000
+SCAN_SAMPLES = 8
+SCAN_SAMPLE_CHARS = 1_000
+
 # Short refs: #123 (but not inside URLs or hex colors)
 SHORT_REF_RE = re.compile(r"(?<![/\w])#(\d+)\b")
 
@@ -27,38 +59,100 @@ SHORT_REF_RE = re.compile(r"(?<![/\w])#(\d+)\b")
 URL_REF_RE = re.compile(r"github\.com/[^/\s]+/[^/\s]+/(?:issues|pull)/(\d+)")
 
 
+def _scan_spans(length: int) -> list[tuple[int, int]]:
+    """The (start, end) slices of a prompt of *length* characters to search."""
+    window = SCAN_HEAD + SCAN_TAIL + SCAN_SAMPLES * SCAN_SAMPLE_CHARS
+    if length <= window:
+        return [(0, length)]
+    spans = [(0, SCAN_HEAD)]
+    # Each sample sits in the middle of its share of the unsearched middle
+    step = (length - SCAN_HEAD - SCAN_TAIL) / SCAN_SAMPLES
+    offset = SCAN_HEAD + (step - SCAN_SAMPLE_CHARS) / 2
+    for i in range(SCAN_SAMPLES):
+        start = int(offset + step * i)
+        spans.append((start, start + SCAN_SAMPLE_CHARS))
+    spans.append((length - SCAN_TAIL, length))
+    return spans
+
+
 def extract_refs(prompt: str) -> list[int]:
-    """Extract deduplicated issue/PR numbers from the prompt."""
+    """Extract up to MAX_REFS deduplicated issue/PR numbers from the prompt.
+
+    Short refs come first, then URL refs, each in prompt order.
+    """
     seen: set[int] = set()
     refs: list[int] = []
+    spans = _scan_spans(len(prompt))
+
+    for pattern in (SHORT_REF_RE, URL_REF_RE):
+        for start, end in spans:
+            # The slices are searched in place; lookbehinds still see the
+            # text before a slice, but a number may be cut at its end
+            for match in pattern.finditer(prompt, start, end):
+                if match.end() == end < len(prompt) and prompt[end].isdigit():
+                    continue
+                num = int(match.group(1))
+                if num not in seen and num > 0:
+                    seen.add(num)
+                    refs.append(num)
+                    if len(refs) == MAX_REFS:
+                        return refs
+
+    return refs
+
+
+def format_ticket(number: int, data: dict) -> str:
+    """Render an issue/PR from the GitHub API as context text."""
+    title = data.get("title") or "(no title)"
+    state = (data.get("state") or "unknown").upper()
+    body = (data.get("body", "") or "").strip()
+    labels = data.get("labels") or []
 
-    for match in SHORT_REF_RE.finditer(prompt):
-        num = int(match.group(1))
-        if num not in seen and num > 0:
-            seen.add(num)
-            refs.append(num)
+    label_names = [lb.get("name", "") for lb in labels if lb.get("name")]
+    label_str = ", ".join(label_names) if label_names else "none"
 
-    for match in URL_REF_RE.finditer(prompt):
-        num = int(match.group(1))
-        if num not in seen and num > 0:
-            seen.add(num)
-            refs.append(num)
+    # Truncate body
+    if len(body) > BODY_CHAR_CAP:
+        body = body[:BODY_CHAR_CAP] + "\n...(truncated)"
 
-    return refs[:MAX_REFS]
+    parts = [
+        f"[Ticket #{number}] {title}",
+        f"State: {state} | Labels: {label_str}",
+    ]
+    if body:
+        parts.append(body)
+
+    return "\n".join(parts)
 
 
-def fetch_ticket(number: int) -> str | None:
-    """Fetch a GitHub issue/PR via gh CLI. Returns formatted string or None."""
+def _parse_response(stdout: str) -> tuple[int, dict[str, str], str] | None:
+    """Status, lowercased headers and body of `gh api --include` output."""
+    head, _, body = stdout.replace("\r\n", "\n").partition("\n\n")
+    status_line, *header_lines = head.split("\n")
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        return None
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers, body
+
+
+def fetch_ticket(number: int, cwd: str, etag: str | None = None) -> dict | None:
+    """Fetch a GitHub issue/PR via `gh api`.
+
+    Returns {"etag": ..., "text": ...} for a fetched ticket, {"etag": etag,
+    "text": None} when it has not changed since *etag*, and None on any
+    failure.
+    """
+    args = ["gh", "api", "--include", f"repos/{{owner}}/{{repo}}/issues/{number}"]
+    if etag:
+        args += ["-H", f"If-None-Match: {etag}"]
     try:
         result = subprocess.run(
-            [
-                "gh",
-                "issue",
-                "view",
-                str(number),
-                "--json",
-                "number,title,body,state,labels",
-            ],
+            args,
+            cwd=cwd,
             capture_output=True,
             text=True,
             timeout=GH_CMD_TIMEOUT,
@@ -66,34 +160,146 @@ def fetch_ticket(number: int) -> str | None:
     except (FileNotFoundError, OSError, subprocess.TimeoutExpired):
         return None
 
-    if result.returncode != 0:
+    # gh exits non-zero for a 304, but still prints the status line
+    response = _parse_response(result.stdout)
+    if response is None:
+        return None
+    status, headers, body = response
+    if status == 304 and etag:
+        return {"etag": etag, "text": None}
+    if status != 200 or result.returncode != 0:
         return None
 
     try:
-        data = json.loads(result.stdout)
+        data = json.loads(body)
     except json.JSONDecodeError:
         return None
+    if not isinstance(data, dict):
+        return None
 
-    title = data.get("title", "(no title)")
-    state = data.get("state", "UNKNOWN")
-    body = data.get("body", "") or ""
-    labels = data.get("labels", [])
+    return {"etag": headers.get("etag"), "text": format_ticket(number, data)}
 
-    label_names = [lb.get("name", "") for lb in labels if lb.get("name")]
-    label_str = ", ".join(label_names) if label_names else "none"
 
-    # Truncate body
-    if len(body) > BODY_CHAR_CAP:
-        body = body[:BODY_CHAR_CAP] + "\n...(truncated)"
+# ── Cache ───────────────────────────────────────────────────────────
 
-    parts = [
-        f"[Ticket #{number}] {title}",
-        f"State: {state} | Labels: {label_str}",
-    ]
-    if body.strip():
-        parts.append(body.strip())
 
-    return "\n".join(parts)
+def _cache_path() -> str:
+    return os.path.join(CACHE_DIR, f"claude-tickets-{os.getuid()}.json")
+
+
+def _git_config(cwd: str) -> str:
+    """The repository's .git/config, found without running git."""
+    path = os.path.realpath(cwd)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.exists(dot_git):
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            return ""
+        path = parent
+    git_dir = dot_git
+    try:
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules: "gitdir: <path>"
+            with open(dot_git) as f:
+                line = f.readline().strip()
+            git_dir = os.path.join(path, line.removeprefix("gitdir:").strip())
+            try:
+                with open(os.path.join(git_dir, "commondir")) as f:
+                    git_dir = os.path.join(git_dir, f.read().strip())
+            except OSError:
+                pass
+        with open(os.path.join(git_dir, "config")) as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def repo_key(cwd: str) -> str:
+    """What gh resolves {owner}/{repo} from: $GH_REPO or the git remotes."""
+    if os.environ.get("GH_REPO"):
+        return os.environ["GH_REPO"]
+    urls = re.findall(r"^\s*url\s*=\s*(\S+)", _git_config(cwd), re.MULTILINE)
+    return " ".join(urls) or os.path.realpath(cwd)
+
+
+def _load_cache() -> dict:
+    try:
+        with open(_cache_path()) as f:
+            data = json.load(f)
+        if data["version"] == CACHE_VERSION and isinstance(data["tickets"], dict):
+            return data["tickets"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return {}
+
+
+def _save_cache(tickets: dict) -> None:
+    now = time.time()
+    tickets = {
+        key: entry
+        for key, entry in tickets.items()
+        if 0 <= now - entry["checked"] < CACHE_MAX_AGE
+    }
+    path = _cache_path()
+    tmp = f"{path}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "tickets": tickets}, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _entry(cache: dict, key: str, max_age: float) -> dict | None:
+    """The cached ticket under *key* if it was last confirmed within max_age."""
+    entry = cache.get(key)
+    try:
+        if 0 <= time.time() - entry["checked"] < max_age and entry["text"]:
+            return entry
+    except (KeyError, TypeError):
+        pass
+    return None
+
+
+def get_tickets(refs: list[int], cwd: str) -> list[str]:
+    """Rendered tickets for *refs*, from the cache or fetched concurrently."""
+    repo = repo_key(cwd)
+    cache = _load_cache()
+    keys = {number: f"{repo}#{number}" for number in refs}
+
+    stale = [n for n in refs if _entry(cache, keys[n], CACHE_TTL) is None]
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            futures = {}
+            for number in stale:
+                entry = _entry(cache, keys[number], CACHE_MAX_AGE)
+                etag = entry.get("etag") if entry else None
+                futures[number] = pool.submit(fetch_ticket, number, cwd, etag)
+            results = {number: future.result() for number, future in futures.items()}
+
+        now = time.time()
+        for number, result in results.items():
+            if result is None:
+                # gh failed; a cached copy is still used below
+                continue
+            if result["text"] is None:
+                # Not modified since the cached copy
+                cache[keys[number]]["checked"] = now
+            else:
+                cache[keys[number]] = {"checked": now, **result}
+        _save_cache(cache)
+
+    tickets: list[str] = []
+    for number in refs:
+        entry = _entry(cache, keys[number], CACHE_MAX_AGE)
+        if entry:
+            tickets.append(entry["text"])
+    return tickets
 
 
 def main():
@@ -114,12 +320,7 @@ def main():
     if not refs:
         sys.exit(0)
 
-    tickets: list[str] = []
-    for number in refs:
-        ticket = fetch_ticket(number)
-        if ticket:
-            tickets.append(ticket)
-
+    tickets = get_tickets(refs, data.get("cwd") or os.getcwd())
     if not tickets:
         sys.exit(0)
 
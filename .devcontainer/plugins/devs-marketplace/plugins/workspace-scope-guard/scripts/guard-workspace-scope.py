@@ -14,9 +14,12 @@ Exit code 0 allows the operation to proceed.
 import json
 import os
 import re
-import shlex
 import sys
 
+import bash_policy
+
+POLICY = "workspace-scope-guard"
+
 # ---------------------------------------------------------------------------
 # BLACKLIST — checked FIRST, overrides everything.
 # Nothing touches these paths. Ever. No exceptions.
@@ -50,32 +53,8 @@ PATH_FIELDS = {
 
 # ---------------------------------------------------------------------------
 # Bash Layer 1: Write target patterns
-# Ported from guard-protected-bash.py + new patterns
+# bash_policy.WRITE_PATTERNS, shared with guard-protected-bash.py
 # ---------------------------------------------------------------------------
-WRITE_PATTERNS = [
-    # --- Ported from guard-protected-bash.py ---
-    r"(?:>>|>)\s*([^\s;&|]+)",  # >> file, > file
-    r"\btee\s+(?:-a\s+)?([^\s;&|]+)",  # tee file
-    r"\b(?:cp|mv)\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # cp/mv src dest
-    r'\bsed\s+-i[^\s]*\s+(?:\'[^\']*\'\s+|"[^"]*"\s+|[^\s]+\s+)*([^\s;&|]+)',  # sed -i
-    r"\bcat\s+(?:<<[^\s]*\s+)?>\s*([^\s;&|]+)",  # cat > file
-    # --- New patterns ---
-    r"\btouch\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # touch file
-    r"\bmkdir\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # mkdir [-p] dir
-    r"\brm\s+(?:-[^\s]+\s+)*([^\s;&|]+)",  # rm [-rf] path
-    r"\bln\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # ln [-s] src dest
-    r"\binstall\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # install src dest
-    r"\brsync\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # rsync src dest
-    r"\bchmod\s+(?:-[^\s]+\s+)*[^\s]+\s+([^\s;&|]+)",  # chmod mode path
-    r"\bchown\s+(?:-[^\s]+\s+)*[^\s:]+(?::[^\s]+)?\s+([^\s;&|]+)",  # chown owner[:group] path
-    r"\bdd\b[^;|&]*\bof=([^\s;&|]+)",  # dd of=path
-    r"\bwget\s+(?:-[^\s]+\s+)*-O\s+([^\s;&|]+)",  # wget -O path
-    r"\bcurl\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # curl -o path
-    r"\btar\s+(?:-[^\s]+\s+)*-C\s+([^\s;&|]+)",  # tar -C dir
-    r"\bunzip\s+(?:-[^\s]+\s+)*-d\s+([^\s;&|]+)",  # unzip -d dir
-    r"\b(?:gcc|g\+\+|cc|c\+\+|clang)\s+(?:-[^\s]+\s+)*-o\s+([^\s;&|]+)",  # gcc -o out
-    r"\bsqlite3\s+([^\s;&|]+)",  # sqlite3 dbpath
-]
 
 # ---------------------------------------------------------------------------
 # Bash Layer 2: Workspace path scan (ALWAYS runs, never exempt)
@@ -167,20 +146,16 @@ def get_target_path(tool_name: str, tool_input: dict) -> str | None:
 
 def extract_write_targets(command: str) -> list[str]:
     """Extract file paths that the command writes to (Layer 1)."""
-    targets = []
-    for pattern in WRITE_PATTERNS:
-        for match in re.finditer(pattern, command):
-            target = match.group(1).strip("'\"")
-            if target:
-                targets.append(target)
-    return targets
+    return list(bash_policy.parse(command).write_targets)
 
 
 def extract_primary_command(command: str) -> str:
     """Extract the primary command, stripping sudo/env/variable prefixes."""
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
+    return _primary_command(bash_policy.parse(command).tokens)
+
+
+def _primary_command(tokens: tuple[str, ...] | None) -> str:
+    if tokens is None:
         # Unclosed quotes or other parse errors — no exemption
         return ""
     i = 0
@@ -223,13 +198,14 @@ def extract_primary_command(command: str) -> str:
     return ""
 
 
-def check_bash_scope(command: str, cwd: str) -> None:
-    """Enforce scope on Bash commands. Calls sys.exit(2) on violation."""
+def scope_policy(parsed: bash_policy.ParsedCommand, cwd: str) -> str | None:
+    """Return the block message for a Bash scope violation, or None."""
+    command = parsed.raw
     if not command:
-        return
+        return None
 
     # --- Extract paths from command ---
-    write_targets = extract_write_targets(command)
+    write_targets = parsed.write_targets
     workspace_paths = WORKSPACE_PATH_RE.findall(command)
 
     # --- BLACKLIST check (FIRST — before cwd bypass, before everything) ---
@@ -237,30 +213,26 @@ def check_bash_scope(command: str, cwd: str) -> None:
     for target in write_targets:
         resolved = os.path.realpath(target.strip("'\""))
         if is_blacklisted(resolved):
-            print(
+            return (
                 f"Blocked: Bash command writes to blacklisted path '{target}'. "
-                f"/workspaces/.devcontainer/ is permanently blocked.",
-                file=sys.stderr,
+                f"/workspaces/.devcontainer/ is permanently blocked."
             )
-            sys.exit(2)
 
     for path_str in workspace_paths:
         resolved = os.path.realpath(path_str)
         if is_blacklisted(resolved):
-            print(
+            return (
                 f"Blocked: Bash command references blacklisted path '{path_str}'. "
-                f"/workspaces/.devcontainer/ is permanently blocked.",
-                file=sys.stderr,
+                f"/workspaces/.devcontainer/ is permanently blocked."
             )
-            sys.exit(2)
 
     # --- cwd=/workspaces bypass (blacklist already checked above) ---
     if cwd == "/workspaces":
-        return
+        return None
 
     # --- Layer 1: Write target scope check ---
     if write_targets:
-        primary_cmd = extract_primary_command(command)
+        primary_cmd = _primary_command(parsed.tokens)
         is_system_cmd = primary_cmd in SYSTEM_COMMANDS
 
         resolved_targets = [
@@ -286,23 +258,34 @@ def check_bash_scope(command: str, cwd: str) -> None:
         if not skip_layer1:
             for target, resolved in resolved_targets:
                 if not is_in_scope(resolved, cwd) and not is_allowlisted(resolved):
-                    print(
+                    return (
                         f"Blocked: Bash command writes to '{target}' which is "
-                        f"outside the working directory ({cwd}).",
-                        file=sys.stderr,
+                        f"outside the working directory ({cwd})."
                     )
-                    sys.exit(2)
 
     # --- Layer 2: Workspace path scan (ALWAYS runs, never exempt) ---
     for path_str in workspace_paths:
         resolved = os.path.realpath(path_str)
         if not is_in_scope(resolved, cwd) and not is_allowlisted(resolved):
-            print(
+            return (
                 f"Blocked: Bash command references '{path_str}' which is "
-                f"outside the working directory ({cwd}).",
-                file=sys.stderr,
+                f"outside the working directory ({cwd})."
             )
-            sys.exit(2)
+
+    return None
+
+
+bash_policy.register(POLICY, scope_policy)
+
+
+def check_bash_scope(command: str, cwd: str) -> None:
+    """Enforce scope on Bash commands. Calls sys.exit(2) on violation."""
+    if not command:
+        return
+    message = bash_policy.check(POLICY, command, cwd)
+    if message:
+        print(message, file=sys.stderr)
+        sys.exit(2)
 
 
 # ---------------------------------------------------------------------------
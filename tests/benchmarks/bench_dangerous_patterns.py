@@ -0,0 +1,92 @@
+"""Benchmark: DANGEROUS_PATTERNS keyword prefilter vs. per-rule linear scan.
+
+Runs block-dangerous.py's rule matching over the command corpus in
+commands.txt, comparing the shipped keyword-prefiltered matcher with the
+original approach (one re.search per rule, in list order) and with a single
+combined alternation regex. Also checks that all three agree on every
+command.
+
+Usage:
+    python -m tests.benchmarks.bench_dangerous_patterns [--rounds N]
+"""
+
+import argparse
+import re
+import timeit
+from pathlib import Path
+
+from tests.conftest import block_dangerous
+
+CORPUS = [
+    line
+    for line in (Path(__file__).parent / "commands.txt").read_text().splitlines()
+    if line.strip()
+]
+
+_LINEAR = [
+    (re.compile(pattern, re.IGNORECASE), message)
+    for pattern, message in block_dangerous.DANGEROUS_PATTERNS
+]
+
+_COMBINED = re.compile(
+    "|".join(
+        f"(?P<r{i}>{pattern})"
+        for i, (pattern, _) in enumerate(block_dangerous.DANGEROUS_PATTERNS)
+    ),
+    re.IGNORECASE,
+)
+
+
+def linear_scan(cmd: str) -> str | None:
+    """Reference matcher: every rule, in order, until one matches."""
+    for regex, message in _LINEAR:
+        if regex.search(cmd):
+            return message
+    return None
+
+
+def combined_scan(cmd: str) -> str | None:
+    """One alternation over all rules; list order restored on a hit."""
+    m = _COMBINED.search(cmd)
+    if m is None:
+        return None
+    hit = int(m.lastgroup[1:])
+    for regex, message in _LINEAR[: hit + 1]:
+        if regex.search(cmd):
+            return message
+    return None
+
+
+MATCHERS = {
+    "linear": linear_scan,
+    "combined": combined_scan,
+    "prefilter": block_dangerous.match_rule,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    for cmd in CORPUS:
+        expected = linear_scan(cmd)
+        for name, matcher in MATCHERS.items():
+            assert matcher(cmd) == expected, f"{name} disagrees on {cmd!r}"
+
+    print(
+        f"{len(CORPUS)} commands x {args.rounds} rounds, "
+        f"{len(block_dangerous.DANGEROUS_PATTERNS)} rules"
+    )
+    baseline = None
+    for name, matcher in MATCHERS.items():
+        elapsed = timeit.timeit(
+            lambda m=matcher: [m(cmd) for cmd in CORPUS], number=args.rounds
+        )
+        per_cmd = elapsed / (args.rounds * len(CORPUS)) * 1e6
+        baseline = baseline or elapsed
+        print(f"  {name:<10} {per_cmd:7.2f} us/command  ({baseline / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-"""Conftest for plugin tests.
+"""Conftest for plugin and feature tests.
 
-Loads plugin scripts by absolute path since they don't have package structure.
-Each module is loaded once and cached by importlib.
+Loads plugin and feature scripts by absolute path since they don't have
+package structure. Each module is loaded once and cached by importlib.
 """
 
 import importlib.util
+import sys
 from pathlib import Path
 
 # Root of the plugin scripts
@@ -16,6 +17,30 @@ PLUGINS_ROOT = (
     / "plugins"
 )
 
+# Root of the devcontainer features
+FEATURES_ROOT = Path(__file__).resolve().parent.parent / ".devcontainer" / "features"
+
+
+def _load_path(script_path: Path):
+    """Load a standalone script file as a Python module."""
+    if not script_path.exists():
+        raise FileNotFoundError(f"Script not found: {script_path}")
+
+    # Scripts import sibling helper modules (e.g. bash_policy), which works
+    # when run directly because python3 puts the script's directory on sys.path
+    script_dir = str(script_path.parent)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    # Convert filename to valid module name
+    module_name = script_path.name.replace("-", "_").replace(".py", "")
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+
+    spec.loader.exec_module(module)
+
+    return module
+
 
 def _load_script(plugin_name: str, script_name: str):
     """Load a plugin script as a Python module.
@@ -27,18 +52,20 @@ def _load_script(plugin_name: str, script_name: str):
     Returns:
         The loaded module.
     """
-    script_path = PLUGINS_ROOT / plugin_name / "scripts" / script_name
-    if not script_path.exists():
-        raise FileNotFoundError(f"Plugin script not found: {script_path}")
+    return _load_path(PLUGINS_ROOT / plugin_name / "scripts" / script_name)
 
-    # Convert filename to valid module name
-    module_name = script_name.replace("-", "_").replace(".py", "")
-    spec = importlib.util.spec_from_file_location(module_name, script_path)
-    module = importlib.util.module_from_spec(spec)
 
-    spec.loader.exec_module(module)
+def _load_feature_script(feature_name: str, script_name: str):
+    """Load a devcontainer feature script as a Python module.
 
-    return module
+    Args:
+        feature_name: Feature directory name (e.g. "hook-daemon")
+        script_name: Script filename (e.g. "hookd.py")
+
+    Returns:
+        The loaded module.
+    """
+    return _load_path(FEATURES_ROOT / feature_name / script_name)
 
 
 # Pre-load all tested plugin modules
@@ -50,3 +77,33 @@ guard_protected = _load_script("protected-files-guard", "guard-protected.py")
 guard_protected_bash = _load_script("protected-files-guard", "guard-protected-bash.py")
 guard_readonly_bash = _load_script("agent-system", "guard-readonly-bash.py")
 redirect_builtin_agents = _load_script("agent-system", "redirect-builtin-agents.py")
+lint_file = _load_script("auto-code-quality", "lint-file.py")
+format_on_stop = _load_script("auto-code-quality", "format-on-stop.py")
+advisory_test_runner = _load_script("auto-code-quality", "advisory-test-runner.py")
+collect_edited_files = _load_script("auto-code-quality", "collect-edited-files.py")
+git_state_injector = _load_script("session-context", "git-state-injector.py")
+todo_harvester = _load_script("session-context", "todo-harvester.py")
+skill_suggester = _load_script("skill-engine", "skill-suggester.py")
+ticket_linker = _load_script("ticket-workflow", "ticket-linker.py")
+import edit_journal  # noqa: E402
+import framework_detect  # noqa: E402
+import import_graph  # noqa: E402
+import pyright_session  # noqa: E402
+import pytest_results  # noqa: E402
+import pytest_shards  # noqa: E402
+import result_cache  # noqa: E402
+import result_stream  # noqa: E402
+import skill_index  # noqa: E402
+import skill_manifest  # noqa: E402
+import suite_coordinator  # noqa: E402
+import syntax_check  # noqa: E402
+import todo_index  # noqa: E402
+import tool_cache  # noqa: E402
+
+# Shared Bash policy engine, vendored into each guard plugin. Guards import it
+# by module name, so all of them share the instance loaded here.
+import bash_policy  # noqa: E402
+
+# Pre-load tested feature modules
+hookd = _load_feature_script("hook-daemon", "hookd.py")
+hook_client = _load_feature_script("hook-daemon", "hook-client.py")
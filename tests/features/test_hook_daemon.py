@@ -0,0 +1,279 @@
+"""Tests for the hook-daemon feature.
+
+Verifies that hookd.run_script() reproduces a standalone `python3 <script>`
+run (exit code, stdout, stderr, argv, cwd), that scripts and the helper
+modules they import are cached and reloaded on change, and that a request
+round-trips over the Unix socket through the codeforge-hook client.
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, hook_client, hookd
+
+BLOCK_DANGEROUS = str(
+    PLUGINS_ROOT / "dangerous-command-blocker" / "scripts" / "block-dangerous.py"
+)
+READONLY_BASH = str(PLUGINS_ROOT / "agent-system" / "scripts" / "guard-readonly-bash.py")
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def bash_input(command: str) -> bytes:
+    """Build a PreToolUse Bash payload."""
+    return json.dumps({"tool_input": {"command": command}}).encode()
+
+
+def write_script(path, body: str) -> str:
+    path.write_text(body)
+    return str(path)
+
+
+# ---------------------------------------------------------------------------
+# 1. In-process execution
+# ---------------------------------------------------------------------------
+
+
+class TestRunScript:
+    def test_dangerous_command_blocked(self, tmp_path) -> None:
+        code, out, err = hookd.run_script(
+            BLOCK_DANGEROUS, [], str(tmp_path), bash_input("rm -rf /")
+        )
+        assert code == 2
+        assert out == ""
+        assert "Blocked" in err
+
+    def test_safe_command_allowed(self, tmp_path) -> None:
+        code, _out, err = hookd.run_script(
+            BLOCK_DANGEROUS, [], str(tmp_path), bash_input("ls -la")
+        )
+        assert code == 0
+        assert err == ""
+
+    @pytest.mark.parametrize(
+        "mode, expected_code",
+        [
+            ("general-readonly", 0),
+            ("git-readonly", 2),
+        ],
+    )
+    def test_argv_passed_through(self, tmp_path, mode, expected_code) -> None:
+        code, _out, _err = hookd.run_script(
+            READONLY_BASH, ["--mode", mode], str(tmp_path), bash_input("npm test")
+        )
+        assert code == expected_code
+
+    def test_cwd_and_stdout(self, tmp_path) -> None:
+        script = write_script(
+            tmp_path / "cwd.py",
+            "import os\ndef main():\n    print(os.getcwd())\n",
+        )
+        work = tmp_path / "work"
+        work.mkdir()
+        before = os.getcwd()
+        code, out, _err = hookd.run_script(script, [], str(work), b"")
+        assert code == 0
+        assert out.strip() == str(work)
+        assert os.getcwd() == before
+
+    def test_uncaught_exception_exits_one(self, tmp_path) -> None:
+        script = write_script(
+            tmp_path / "boom.py", "def main():\n    raise RuntimeError('boom')\n"
+        )
+        code, _out, err = hookd.run_script(script, [], str(tmp_path), b"")
+        assert code == 1
+        assert "RuntimeError: boom" in err
+
+    def test_string_exit_goes_to_stderr(self, tmp_path) -> None:
+        script = write_script(
+            tmp_path / "msg.py", "import sys\ndef main():\n    sys.exit('nope')\n"
+        )
+        code, _out, err = hookd.run_script(script, [], str(tmp_path), b"")
+        assert code == 1
+        assert "nope" in err
+
+    def test_reloads_on_change(self, tmp_path) -> None:
+        path = tmp_path / "ver.py"
+        write_script(path, "def main():\n    print('one')\n")
+        assert hookd.run_script(str(path), [], str(tmp_path), b"")[1] == "one\n"
+        assert hookd.run_script(str(path), [], str(tmp_path), b"")[1] == "one\n"
+
+        path.write_text("def main():\n    print('two')\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert hookd.run_script(str(path), [], str(tmp_path), b"")[1] == "two\n"
+
+    def test_vendored_helper_resolves_per_plugin(self, tmp_path) -> None:
+        scripts = []
+        for plugin in ("one", "two"):
+            scripts_dir = tmp_path / plugin / "scripts"
+            scripts_dir.mkdir(parents=True)
+            write_script(scripts_dir / "hookd_vendored.py", f"NAME = {plugin!r}\n")
+            scripts.append(
+                write_script(
+                    scripts_dir / "hook.py",
+                    "def main():\n"
+                    "    import hookd_vendored\n"
+                    "    print(hookd_vendored.NAME)\n",
+                )
+            )
+        outputs = [
+            hookd.run_script(script, [], str(tmp_path), b"")[1]
+            for script in (*scripts, *scripts)
+        ]
+        assert outputs == ["one\n", "two\n", "one\n", "two\n"]
+
+    def test_reloads_on_helper_change(self, tmp_path) -> None:
+        helper = tmp_path / "hookd_helper.py"
+        helper.write_text("VALUE = 'one'\n")
+        script = write_script(
+            tmp_path / "uses_helper.py",
+            "import hookd_helper\ndef main():\n    print(hookd_helper.VALUE)\n",
+        )
+        assert hookd.run_script(script, [], str(tmp_path), b"")[1] == "one\n"
+
+        helper.write_text("VALUE = 'two'\n")
+        stat = helper.stat()
+        os.utime(helper, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert hookd.run_script(script, [], str(tmp_path), b"")[1] == "two\n"
+
+
+class TestNotHandled:
+    def test_relative_path(self, tmp_path) -> None:
+        assert hookd.run_script("block-dangerous.py", [], str(tmp_path), b"")[0] == (
+            hookd.NOT_HANDLED
+        )
+
+    def test_non_python_file(self, tmp_path) -> None:
+        script = write_script(tmp_path / "hook.sh", "echo hi\n")
+        assert hookd.run_script(script, [], str(tmp_path), b"")[0] == hookd.NOT_HANDLED
+
+    def test_missing_main(self, tmp_path) -> None:
+        script = write_script(tmp_path / "nomain.py", "X = 1\n")
+        assert hookd.run_script(script, [], str(tmp_path), b"")[0] == hookd.NOT_HANDLED
+
+    def test_import_error(self, tmp_path) -> None:
+        script = write_script(tmp_path / "broken.py", "import not_a_real_module_xyz\n")
+        assert hookd.run_script(script, [], str(tmp_path), b"")[0] == hookd.NOT_HANDLED
+
+    def test_missing_cwd(self, tmp_path) -> None:
+        code, _out, _err = hookd.run_script(
+            BLOCK_DANGEROUS, [], str(tmp_path / "gone"), bash_input("ls")
+        )
+        assert code == hookd.NOT_HANDLED
+
+
+# ---------------------------------------------------------------------------
+# 2. Socket round-trip
+# ---------------------------------------------------------------------------
+
+
+class TestSocketRoundTrip:
+    @pytest.fixture
+    def server(self, tmp_path):
+        path = str(tmp_path / "hookd.sock")
+        sock = hookd.bind_socket(path)
+        assert sock is not None
+        yield sock, path
+        sock.close()
+
+    def _serve_once(self, sock) -> threading.Thread:
+        def _accept():
+            conn, _ = sock.accept()
+            with conn:
+                hookd.handle_connection(conn)
+
+        thread = threading.Thread(target=_accept, daemon=True)
+        thread.start()
+        return thread
+
+    def test_blocked_command_round_trip(self, server) -> None:
+        sock, path = server
+        thread = self._serve_once(sock)
+        response = hook_client.request(
+            path, BLOCK_DANGEROUS, [], bash_input("git push --force origin main")
+        )
+        thread.join(timeout=5)
+        assert response is not None
+        code, out, err = response
+        assert code == 2
+        assert out == b""
+        assert b"Blocked" in err
+
+    def test_argv_round_trip(self, server) -> None:
+        sock, path = server
+        thread = self._serve_once(sock)
+        response = hook_client.request(
+            path, READONLY_BASH, ["--mode", "git-readonly"], bash_input("git log")
+        )
+        thread.join(timeout=5)
+        assert response is not None
+        assert response[0] == 0
+
+    def test_second_bind_detects_live_daemon(self, server) -> None:
+        _sock, path = server
+        assert hookd.bind_socket(path) is None
+
+    def test_stale_socket_replaced(self, tmp_path) -> None:
+        path = str(tmp_path / "stale.sock")
+        first = hookd.bind_socket(path)
+        first.close()  # socket file remains, nothing listening
+        second = hookd.bind_socket(path)
+        assert second is not None
+        second.close()
+
+    def test_socket_is_owner_only(self, server) -> None:
+        _sock, path = server
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def test_client_request_without_daemon(self, tmp_path) -> None:
+        assert (
+            hook_client.request(str(tmp_path / "none.sock"), BLOCK_DANGEROUS, [], b"")
+            is None
+        )
+
+    def _reply_with(self, sock, reply: bytes | None) -> threading.Thread:
+        """Accept one request and send *reply*, or hold it open unanswered."""
+        done = threading.Event()
+
+        def _accept():
+            conn, _ = sock.accept()
+            with conn:
+                conn.recv(65536)
+                if reply is None:
+                    done.wait(timeout=5)
+                else:
+                    conn.sendall(reply)
+
+        thread = threading.Thread(target=_accept, daemon=True)
+        thread.start()
+        thread.done = done
+        return thread
+
+    def test_late_reply_not_run_again(self, server, monkeypatch) -> None:
+        sock, path = server
+        monkeypatch.setattr(hook_client, "RESPONSE_TIMEOUT", 0.2)
+        thread = self._reply_with(sock, None)
+        code, out, err = hook_client.request(path, BLOCK_DANGEROUS, [], b"{}")
+        thread.done.set()
+        thread.join(timeout=5)
+        assert code == hook_client.NO_REPLY
+        assert out == b""
+        assert b"no reply from hook daemon" in err
+
+    def test_malformed_reply_not_run_again(self, server) -> None:
+        sock, path = server
+        thread = self._reply_with(sock, b"0 99\nshort")
+        response = hook_client.request(path, BLOCK_DANGEROUS, [], b"{}")
+        thread.join(timeout=5)
+        assert response == (
+            hook_client.NO_REPLY,
+            b"",
+            b"codeforge-hook: malformed reply from hook daemon\n",
+        )
@@ -0,0 +1,50 @@
+"""Minimal `gh api --include` stand-in used by test_ticket_linker.py.
+
+Serves repos/{owner}/{repo}/issues/N from the JSON object in the file
+named by FAKE_GH_ISSUES ({"N": {"etag": ..., "title": ..., ...}}), and
+answers 304 Not Modified when If-None-Match carries the issue's etag.
+Every call is appended to FAKE_GH_LOG as a JSON line. FAKE_GH_DELAY
+sleeps that many seconds before answering.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main():
+    args = sys.argv[1:]
+    with open(os.environ["FAKE_GH_LOG"], "a") as f:
+        f.write(json.dumps({"args": args, "cwd": os.getcwd()}) + "\n")
+    time.sleep(float(os.environ.get("FAKE_GH_DELAY", "0")))
+
+    if args[:2] != ["api", "--include"]:
+        sys.stderr.write("unsupported\n")
+        sys.exit(2)
+    number = args[2].rsplit("/", 1)[1]
+    headers = dict(
+        args[i + 1].split(": ", 1) for i in range(3, len(args), 2) if args[i] == "-H"
+    )
+
+    with open(os.environ["FAKE_GH_ISSUES"]) as f:
+        issues = json.load(f)
+    issue = issues.get(number)
+    if issue is None:
+        sys.stdout.write('HTTP/2.0 404 Not Found\r\n\r\n{"message": "Not Found"}')
+        sys.stderr.write("gh: Not Found (HTTP 404)\n")
+        sys.exit(1)
+
+    etag = issue.pop("etag")
+    if headers.get("If-None-Match") == etag:
+        sys.stdout.write(f"HTTP/2.0 304 Not Modified\r\nEtag: {etag}\r\n\r\n")
+        sys.stderr.write("gh: HTTP 304\n")
+        sys.exit(1)
+    sys.stdout.write(
+        "HTTP/2.0 200 OK\r\nContent-Type: application/json\r\n"
+        f"Etag: {etag}\r\n\r\n{json.dumps({'number': int(number), **issue})}"
+    )
+
+
+if __name__ == "__main__":
+    main()
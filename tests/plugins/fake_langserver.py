@@ -0,0 +1,114 @@
+"""Minimal stdio language server used by test_pyright_session.py.
+
+Publishes one error diagnostic for every line containing "bad", and for
+every `from mod import name` whose module (open document, else mod.py on
+disk next to the importer) has no `def name`, whenever a document is opened
+or changed. Like pyright, it clears a closed document's diagnostics with a
+versionless publish, and asks the client for workspace/configuration after
+initialize. With FAKE_LS_SILENT=1 it never publishes.
+"""
+
+import json
+import os
+import re
+import sys
+from urllib.parse import unquote, urlparse
+
+IMPORT_RE = re.compile(r"^from (\w+) import (\w+)")
+
+# uri → text of open documents
+documents = {}
+
+
+def read_message():
+    length = None
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(sys.stdin.buffer.read(length))
+
+
+def send(message):
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+    sys.stdout.buffer.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    sys.stdout.buffer.flush()
+
+
+def module_text(uri, module):
+    path = os.path.join(os.path.dirname(unquote(urlparse(uri).path)), module + ".py")
+    for open_uri, text in documents.items():
+        if unquote(urlparse(open_uri).path) == path:
+            return text
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def diagnose(uri, text):
+    for i, line in enumerate(text.splitlines()):
+        message = "bad thing" if "bad" in line else None
+        imported = IMPORT_RE.match(line)
+        if imported and f"def {imported[2]}" not in module_text(uri, imported[1]):
+            message = f'"{imported[2]}" is unknown'
+        if message:
+            yield {
+                "severity": 1,
+                "message": message,
+                "range": {"start": {"line": i, "character": 0}},
+            }
+
+
+def publish(uri, version, text):
+    if os.environ.get("FAKE_LS_SILENT"):
+        return
+    params = {"uri": uri, "diagnostics": list(diagnose(uri, text) if text else [])}
+    if version is not None:
+        params["version"] = version
+    send({"method": "textDocument/publishDiagnostics", "params": params})
+
+
+def main():
+    while True:
+        message = read_message()
+        if message is None:
+            return
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "initialize":
+            send({"id": message["id"], "result": {"capabilities": {}}})
+            send(
+                {
+                    "id": "cfg",
+                    "method": "workspace/configuration",
+                    "params": {"items": [{"section": "python"}]},
+                }
+            )
+        elif method == "textDocument/didOpen":
+            doc = params["textDocument"]
+            documents[doc["uri"]] = doc["text"]
+            publish(doc["uri"], doc["version"], doc["text"])
+        elif method == "textDocument/didChange":
+            doc = params["textDocument"]
+            documents[doc["uri"]] = params["contentChanges"][-1]["text"]
+            publish(doc["uri"], doc["version"], documents[doc["uri"]])
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            documents.pop(uri, None)
+            publish(uri, None, "")
+        elif method == "shutdown":
+            send({"id": message["id"], "result": None})
+        elif method == "exit":
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Tests for the shared bash_policy engine used by the Bash guard plugins.
+
+Verifies that the vendored copies stay identical, that a command is parsed
+once and its derived forms are cached, and that check() runs the
+registered guard policies.
+"""
+
+import pytest
+
+from tests.conftest import (
+    PLUGINS_ROOT,
+    bash_policy,
+    block_dangerous,
+    guard_protected_bash,
+    guard_readonly_bash,
+    guard_workspace_scope,
+)
+
+VENDORED_PLUGINS = [
+    "dangerous-command-blocker",
+    "protected-files-guard",
+    "workspace-scope-guard",
+    "agent-system",
+]
+
+BASH_GUARDS = [
+    block_dangerous.POLICY,
+    guard_protected_bash.POLICY,
+    guard_workspace_scope.POLICY,
+]
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+class TestVendoredCopies:
+    def test_copies_identical(self) -> None:
+        sources = {
+            plugin: (PLUGINS_ROOT / plugin / "scripts" / "bash_policy.py").read_text()
+            for plugin in VENDORED_PLUGINS
+        }
+        reference = sources[VENDORED_PLUGINS[0]]
+        for plugin, source in sources.items():
+            assert source == reference, f"{plugin}/scripts/bash_policy.py has drifted"
+
+
+# ---------------------------------------------------------------------------
+# 2. Parsing
+# ---------------------------------------------------------------------------
+
+
+class TestParse:
+    def test_parse_is_cached(self) -> None:
+        assert bash_policy.parse("ls -la") is bash_policy.parse("ls -la")
+
+    def test_derived_forms_computed_once(self) -> None:
+        parsed = bash_policy.parse("echo a > out.txt && cat b | grep c")
+        assert parsed.stages is parsed.stages
+        assert parsed.write_targets is parsed.write_targets
+
+    def test_segments_and_stages(self) -> None:
+        parsed = bash_policy.parse("cd src && cat a | grep b; ls &")
+        assert parsed.segments == ("cd src", "cat a | grep b", "ls")
+        assert parsed.stages == (("cd src",), ("cat a", "grep b"), ("ls",))
+
+    def test_stripped(self) -> None:
+        assert bash_policy.parse("env FOO=1 \\rm -rf /").stripped == "rm -rf /"
+
+    @pytest.mark.parametrize(
+        "command, expected",
+        [
+            ("echo x > out.txt", True),
+            ("ls 2>/dev/null", False),
+            ("cat file", False),
+        ],
+    )
+    def test_has_redirect(self, command, expected) -> None:
+        assert bash_policy.parse(command).has_redirect is expected
+
+    def test_substitutions(self) -> None:
+        parsed = bash_policy.parse("echo $(rm a) `touch b`")
+        assert parsed.substitutions == ("rm a", "touch b")
+        assert bash_policy.parse("echo plain").substitutions == ()
+
+    def test_tokens(self) -> None:
+        assert bash_policy.parse("rm 'a b' c").tokens == ("rm", "a b", "c")
+        assert bash_policy.parse("echo 'unclosed").tokens is None
+
+    def test_write_targets(self) -> None:
+        parsed = bash_policy.parse("cp src dest && echo x >> log.txt")
+        assert set(parsed.write_targets) == {"dest", "log.txt"}
+
+
+# ---------------------------------------------------------------------------
+# 3. Policies
+# ---------------------------------------------------------------------------
+
+
+class TestPolicies:
+    def test_guards_registered(self) -> None:
+        for name in BASH_GUARDS + [
+            guard_readonly_bash.POLICY_GENERAL,
+            guard_readonly_bash.POLICY_GIT,
+        ]:
+            assert name in bash_policy.POLICIES
+
+    @pytest.mark.parametrize(
+        "command, policy",
+        [
+            ("rm -rf /", block_dangerous.POLICY),
+            ("echo SECRET=1 > .env", guard_protected_bash.POLICY),
+            ("touch /workspaces/other/file", guard_workspace_scope.POLICY),
+        ],
+    )
+    def test_check_blocks(self, command, policy) -> None:
+        message = bash_policy.check(policy, command, "/workspaces/proj")
+        assert message.startswith("Blocked:")
+
+    @pytest.mark.parametrize("policy", BASH_GUARDS)
+    def test_check_allows(self, policy) -> None:
+        assert bash_policy.check(policy, "ls -la", "/workspaces/proj") is None
+
+    def test_check_matches_guard_function(self) -> None:
+        command = "git status && npm install"
+        assert bash_policy.check(
+            guard_readonly_bash.POLICY_GENERAL, command
+        ) == guard_readonly_bash.check_general_readonly(command)
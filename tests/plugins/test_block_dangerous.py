@@ -4,6 +4,9 @@ Verifies that check_command() correctly identifies dangerous shell commands
 and allows safe commands through without false positives.
 """
 
+import re
+from pathlib import Path
+
 import pytest
 
 from tests.conftest import block_dangerous
@@ -361,3 +364,53 @@ class TestGitExtended:
             "git push --force-if-includes origin main",
             substr="force push",
         )
+
+
+# ---------------------------------------------------------------------------
+# Keyword prefilter
+# ---------------------------------------------------------------------------
+
+CORPUS = [
+    line
+    for line in (Path(__file__).parent.parent / "benchmarks" / "commands.txt")
+    .read_text()
+    .splitlines()
+    if line.strip()
+]
+
+
+def linear_scan(cmd: str) -> str | None:
+    """Reference matcher: re.search every rule in list order."""
+    for pattern, message in block_dangerous.DANGEROUS_PATTERNS:
+        if re.search(pattern, cmd, re.IGNORECASE):
+            return message
+    return None
+
+
+class TestKeywordPrefilter:
+    def test_every_rule_indexed(self) -> None:
+        indexed = sorted(
+            i for rules in block_dangerous._RULES_BY_KEYWORD.values() for i in rules
+        ) + list(block_dangerous._UNKEYED_RULES)
+        assert sorted(indexed) == list(range(len(block_dangerous.DANGEROUS_PATTERNS)))
+
+    def test_all_current_rules_keyed(self) -> None:
+        # A rule without a leading keyword runs on every command
+        assert block_dangerous._UNKEYED_RULES == ()
+
+    @pytest.mark.parametrize("command", CORPUS)
+    def test_matches_linear_scan(self, command) -> None:
+        assert block_dangerous.match_rule(command) == linear_scan(command)
+
+    @pytest.mark.parametrize(
+        "command",
+        ["RM -RF /", "Git Push --Force origin main", "echo x >/etc/hosts"],
+    )
+    def test_keywords_case_insensitive(self, command) -> None:
+        assert block_dangerous.match_rule(command) == linear_scan(command)
+        assert block_dangerous.match_rule(command) is not None
+
+    def test_first_listed_rule_wins(self) -> None:
+        # Matches both the sudo rm rule and the later find -exec rm rule
+        command = "find . -exec rm {} \\; && sudo rm x"
+        assert block_dangerous.match_rule(command) == linear_scan(command)
@@ -0,0 +1,203 @@
+"""Tests for the auto-code-quality PostToolUse collector.
+
+Verifies that one run both records the edit in the session's edit journal
+and reports syntax errors in data files, that files which are not data
+files, or are valid, produce no output, that YAML is checked from its event
+stream within a time budget, and that verdicts are cached by content.
+"""
+
+import io
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import (
+    collect_edited_files,
+    edit_journal,
+    result_cache,
+    syntax_check,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_journal(tmp_path, monkeypatch):
+    journal_dir = tmp_path / "journals"
+    journal_dir.mkdir()
+    monkeypatch.setattr(edit_journal, "JOURNAL_DIR", str(journal_dir))
+    monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path))
+
+
+def run_main(file_path, session_id: str = "s1") -> tuple[int, str]:
+    """Run main() for an Edit of file_path, return (exit_code, stdout_text)."""
+    payload = json.dumps(
+        {
+            "session_id": session_id,
+            "tool_use_id": "toolu_1",
+            "tool_input": {"file_path": str(file_path)},
+        }
+    )
+    stdout = io.StringIO()
+    with patch("sys.stdin", io.StringIO(payload)), patch("sys.stdout", stdout):
+        with pytest.raises(SystemExit) as exc:
+            collect_edited_files.main()
+    return (exc.value.code or 0, stdout.getvalue())
+
+
+# ---------------------------------------------------------------------------
+# Collection and validation
+# ---------------------------------------------------------------------------
+
+
+class TestCollect:
+    def test_source_file_recorded_silently(self, tmp_path) -> None:
+        path = tmp_path / "app.py"
+        path.write_text("x = 1\n")
+        assert run_main(path) == (0, "")
+        assert edit_journal.unique_paths(edit_journal.read_all("s1")) == [str(path)]
+
+    def test_missing_file_ignored(self, tmp_path) -> None:
+        assert run_main(tmp_path / "gone.json") == (0, "")
+        assert edit_journal.read_all("s1") == []
+
+    def test_without_session_still_validated(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        path.write_text("{")
+        code, output = run_main(path, session_id="")
+        assert code == 0
+        assert "JSON error" in json.loads(output)["additionalContext"]
+
+    def test_bad_input_ignored(self) -> None:
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO("not json")), patch("sys.stdout", stdout):
+            with pytest.raises(SystemExit):
+                collect_edited_files.main()
+        assert stdout.getvalue() == ""
+
+
+class TestValidate:
+    def test_invalid_json_reported_and_recorded(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        path.write_text('{"a": 1,}\n')
+        code, output = run_main(path)
+        assert code == 0
+        message = json.loads(output)["additionalContext"]
+        assert message.startswith("[Syntax] JSON error at line 1")
+        assert len(edit_journal.read_all("s1")) == 1
+
+    def test_jsonc_comments_and_urls(self, tmp_path) -> None:
+        path = tmp_path / "settings.jsonc"
+        path.write_text('{\n  // comment\n  "url": "https://example.com"\n}\n')
+        assert run_main(path) == (0, "")
+
+    def test_invalid_toml(self, tmp_path) -> None:
+        path = tmp_path / "pyproject.toml"
+        path.write_text("[project\n")
+        _, output = run_main(path)
+        assert "TOML error" in json.loads(output)["additionalContext"]
+
+    def test_valid_toml(self, tmp_path) -> None:
+        path = tmp_path / "pyproject.toml"
+        path.write_text('[project]\nname = "x"\n')
+        assert run_main(path) == (0, "")
+
+    def test_unreadable_file_does_not_fail(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        path.write_bytes(b"\xff\xfe\x00")
+        code, output = run_main(path)
+        assert (code, output) == (0, "")
+        assert len(edit_journal.read_all("s1")) == 1
+
+    def test_multi_document_yaml(self, tmp_path) -> None:
+        path = tmp_path / "manifests.yaml"
+        path.write_text("kind: A\n---\nkind: B\n")
+        assert run_main(path) == (0, "")
+
+    def test_custom_yaml_tags_accepted(self, tmp_path) -> None:
+        path = tmp_path / "template.yaml"
+        path.write_text("Value: !Ref Bucket\n")
+        assert run_main(path) == (0, "")
+
+    def test_invalid_yaml(self, tmp_path) -> None:
+        path = tmp_path / "config.yaml"
+        path.write_text("a: [1, 2\nb: 3\n")
+        _, output = run_main(path)
+        assert "YAML error at line" in json.loads(output)["additionalContext"]
+
+    def test_undefined_yaml_alias(self, tmp_path) -> None:
+        path = tmp_path / "config.yaml"
+        path.write_text("base: &base {a: 1}\n---\nother: *base\n")
+        _, output = run_main(path)
+        message = json.loads(output)["additionalContext"]
+        assert message == (
+            "[Syntax] YAML error at line 3, col 8: found undefined alias 'base'"
+        )
+
+
+# ---------------------------------------------------------------------------
+# Fast paths
+# ---------------------------------------------------------------------------
+
+
+class TestFastPaths:
+    def test_unchanged_content_not_rechecked(self, tmp_path, monkeypatch) -> None:
+        path = tmp_path / "data.json"
+        path.write_text("{")
+        _, first = run_main(path)
+        calls = []
+        monkeypatch.setattr(syntax_check, "validate", calls.append)
+        _, second = run_main(path)
+        assert second == first
+        assert calls == []
+
+    def test_edit_rechecked(self, tmp_path) -> None:
+        path = tmp_path / "data.json"
+        path.write_text("{")
+        run_main(path)
+        path.write_text("{}")
+        assert run_main(path) == (0, "")
+
+    def test_oversized_file_skipped(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(syntax_check, "MAX_BYTES", 10)
+        path = tmp_path / "data.json"
+        path.write_text('{"broken": ' + "1" * 20)
+        assert run_main(path) == (0, "")
+
+    def test_yaml_scan_budget(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(syntax_check, "SCAN_BUDGET", -1.0)
+        monkeypatch.setattr(syntax_check, "_CHECK_EVERY", 1)
+        path = tmp_path / "big.yaml"
+        path.write_text("a: 1\n" * 100 + "b: [\n")
+        start = time.monotonic()
+        assert syntax_check.validate(str(path)) is None
+        assert time.monotonic() - start < 5
+
+    def test_truncated_yaml_scan_not_cached(self, tmp_path, monkeypatch) -> None:
+        path = tmp_path / "big.yaml"
+        path.write_text("a: 1\n" * 100 + "b: [\n")
+        monkeypatch.setattr(syntax_check, "SCAN_BUDGET", -1.0)
+        monkeypatch.setattr(syntax_check, "_CHECK_EVERY", 1)
+        assert run_main(path) == (0, "")
+        monkeypatch.setattr(syntax_check, "SCAN_BUDGET", 1.5)
+        _, output = run_main(path)
+        assert "YAML error" in output
+
+    def test_error_before_budget_reported(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(syntax_check, "_CHECK_EVERY", 10**9)
+        path = tmp_path / "big.yaml"
+        path.write_text("a: [\n" + "b: 1\n" * 100)
+        assert syntax_check.validate(str(path)).startswith("[Syntax] YAML error")
+
+    def test_pure_python_yaml(self, tmp_path, monkeypatch) -> None:
+        import yaml
+
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+        path = tmp_path / "config.yaml"
+        path.write_text("a: [1, 2\n")
+        assert "YAML error" in syntax_check.validate(str(path))
@@ -0,0 +1,221 @@
+"""Tests for the shared session edit journal.
+
+Verifies that the vendored copies stay identical, that records round-trip
+and a half-written record is left for later, that an edit reported by both
+collectors is recorded once, and that each consumer's cursor moves on its
+own and only when committed.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, edit_journal
+
+VENDORED_PLUGINS = ["auto-code-quality", "session-context"]
+
+COLLECTORS = [
+    PLUGINS_ROOT / "auto-code-quality" / "scripts" / "collect-edited-files.py",
+    PLUGINS_ROOT / "session-context" / "scripts" / "collect-session-edits.py",
+]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_dir(tmp_path, monkeypatch):
+    journal_dir = tmp_path / "journals"
+    journal_dir.mkdir()
+    monkeypatch.setattr(edit_journal, "JOURNAL_DIR", str(journal_dir))
+    return journal_dir
+
+
+@pytest.fixture
+def edited(tmp_path):
+    paths = []
+    for name in ("a.py", "b.py"):
+        path = tmp_path / name
+        path.write_text(f"# {name}\n")
+        paths.append(str(path))
+    return paths
+
+
+def paths(edits) -> list[str]:
+    return [os.path.basename(edit.path) for edit in edits]
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+def test_copies_identical() -> None:
+    sources = {
+        plugin: (PLUGINS_ROOT / plugin / "scripts" / "edit_journal.py").read_text()
+        for plugin in VENDORED_PLUGINS
+    }
+    reference = sources[VENDORED_PLUGINS[0]]
+    for plugin, source in sources.items():
+        assert source == reference, f"{plugin}/scripts/edit_journal.py has drifted"
+
+
+# ---------------------------------------------------------------------------
+# 2. Records
+# ---------------------------------------------------------------------------
+
+
+class TestRecords:
+    def test_round_trip(self) -> None:
+        edit = edit_journal.Edit("/src/ü.py", 1700000000.5, "ab" * 32, "toolu_1")
+        data = edit_journal.encode(edit) + edit_journal.encode(edit._replace(sha256=""))
+        edits, end = edit_journal.decode(data)
+        assert edits == [edit, edit._replace(sha256="")]
+        assert end == len(data)
+
+    def test_partial_record_left_unread(self) -> None:
+        whole = edit_journal.encode(edit_journal.Edit("/a.py", 1.0, "", ""))
+        data = whole + whole[:-3]
+        edits, end = edit_journal.decode(data)
+        assert len(edits) == 1
+        assert end == len(whole)
+
+    def test_corrupt_record_skipped_to_end(self) -> None:
+        whole = edit_journal.encode(edit_journal.Edit("/a.py", 1.0, "", ""))
+        data = whole + b"garbage-garbage-garbage-garbage-garbage-garbage"
+        edits, end = edit_journal.decode(data)
+        assert len(edits) == 1
+        assert end == len(data)
+
+    def test_append_records_hash(self, edited) -> None:
+        edit_journal.append("s1", edited[0], "toolu_1")
+        (edit,) = edit_journal.read_all("s1")
+        assert edit.path == edited[0]
+        assert edit.sha256 == edit_journal._digest(edited[0]).hex()
+        assert abs(edit.timestamp - time.time()) < 60
+
+
+# ---------------------------------------------------------------------------
+# 3. Appending
+# ---------------------------------------------------------------------------
+
+
+class TestAppend:
+    def test_same_edit_recorded_once(self, edited) -> None:
+        assert edit_journal.append("s1", edited[0], "toolu_1")
+        assert not edit_journal.append("s1", edited[0], "toolu_1")
+        assert edit_journal.append("s1", edited[0], "toolu_2")
+        assert len(edit_journal.read_all("s1")) == 2
+
+    def test_without_edit_id_always_recorded(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        edit_journal.append("s1", edited[0])
+        assert len(edit_journal.read_all("s1")) == 2
+
+    def test_sessions_separate(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        edit_journal.append("s2", edited[1])
+        assert paths(edit_journal.read_all("s1")) == ["a.py"]
+
+    def test_unique_paths(self, edited) -> None:
+        for path in (edited[1], edited[0], edited[1]):
+            edit_journal.append("s1", path)
+        assert edit_journal.unique_paths(edit_journal.read_all("s1")) == [
+            edited[1],
+            edited[0],
+        ]
+
+    def test_new_journal_prunes_old_files(self, isolated_dir, edited) -> None:
+        stale = isolated_dir / f"claude-edits-{os.getuid()}-old.journal"
+        stale.write_bytes(b"")
+        old = time.time() - edit_journal.MAX_AGE - 60
+        os.utime(stale, (old, old))
+        edit_journal.append("s1", edited[0])
+        assert not stale.exists()
+
+
+# ---------------------------------------------------------------------------
+# 4. Cursors
+# ---------------------------------------------------------------------------
+
+
+class TestCursor:
+    def test_consumers_independent(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        fmt = edit_journal.Cursor("s1", "format")
+        assert paths(fmt.read()) == ["a.py"]
+        fmt.commit()
+        edit_journal.append("s1", edited[1])
+        assert paths(edit_journal.Cursor("s1", "format").read()) == ["b.py"]
+        assert paths(edit_journal.Cursor("s1", "lint").read()) == ["a.py", "b.py"]
+
+    def test_uncommitted_read_repeats(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        edit_journal.Cursor("s1", "tests").read()
+        assert paths(edit_journal.Cursor("s1", "tests").read()) == ["a.py"]
+
+    def test_half_written_record_read_later(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        record = edit_journal.encode(edit_journal.Edit(edited[1], 1.0, "", ""))
+        with open(edit_journal.journal_path("s1"), "ab") as f:
+            f.write(record[:10])
+        cursor = edit_journal.Cursor("s1", "lint")
+        assert paths(cursor.read()) == ["a.py"]
+        cursor.commit()
+        with open(edit_journal.journal_path("s1"), "ab") as f:
+            f.write(record[10:])
+        assert paths(edit_journal.Cursor("s1", "lint").read()) == ["b.py"]
+
+    def test_replaced_journal_read_from_start(self, edited) -> None:
+        edit_journal.append("s1", edited[0])
+        edit_journal.append("s1", edited[1])
+        cursor = edit_journal.Cursor("s1", "lint")
+        cursor.read()
+        cursor.commit()
+        os.unlink(edit_journal.journal_path("s1"))
+        edit_journal.append("s1", edited[0])
+        assert paths(edit_journal.Cursor("s1", "lint").read()) == ["a.py"]
+
+    def test_missing_journal(self) -> None:
+        assert edit_journal.Cursor("none", "lint").read() == []
+        assert edit_journal.read_all("none") == []
+
+
+# ---------------------------------------------------------------------------
+# 5. Collectors
+# ---------------------------------------------------------------------------
+
+
+def test_both_collectors_write_one_record(edited) -> None:
+    # The scripts write to the real journal directory
+    session_id = f"test-{uuid.uuid4().hex}"
+    payload = json.dumps(
+        {
+            "session_id": session_id,
+            "tool_use_id": "toolu_1",
+            "tool_input": {"file_path": edited[0]},
+        }
+    )
+    journal = os.path.join("/tmp", f"claude-edits-{os.getuid()}-{session_id}.journal")
+    try:
+        for script in COLLECTORS:
+            subprocess.run(
+                [sys.executable, str(script)],
+                input=payload,
+                text=True,
+                check=True,
+                timeout=10,
+            )
+        with open(journal, "rb") as f:
+            edits, _ = edit_journal.decode(f.read())
+        assert [edit.path for edit in edits] == [edited[0]]
+    finally:
+        if os.path.exists(journal):
+            os.unlink(journal)
@@ -0,0 +1,176 @@
+"""Tests for the auto-code-quality format-on-stop Stop hook.
+
+Verifies that format_files() groups edited paths by formatter and runs each
+formatter once with all of its files, with a per-formatter timeout capped
+by the hook budget, and skips files the content-hash cache already saw in
+their formatted state.
+"""
+
+import subprocess
+
+import pytest
+
+from tests.conftest import format_on_stop, result_cache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Record formatter subprocess calls; every tool resolves to /bin/<name>."""
+    recorded: list[tuple[list[str], float]] = []
+
+    def _run(cmd, **kwargs):
+        recorded.append((cmd, kwargs.get("timeout")))
+        return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+    monkeypatch.setattr(format_on_stop.subprocess, "run", _run)
+    monkeypatch.setattr(
+        format_on_stop, "_resolve_tool", lambda name, fallback="": f"/bin/{name}"
+    )
+    monkeypatch.setattr(format_on_stop, "find_biome", lambda path: "/bin/biome")
+    return recorded
+
+
+# ---------------------------------------------------------------------------
+# 1. Dispatch
+# ---------------------------------------------------------------------------
+
+
+class TestFormatterFor:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("a.py", "format_python"),
+            ("main.go", "format_go"),
+            ("index.tsx", "format_biome"),
+            ("run.sh", "format_shell"),
+            ("README.md", "format_dprint"),
+            ("Dockerfile", "format_dprint"),
+            ("lib.rs", "format_rust"),
+        ],
+    )
+    def test_dispatch(self, path, expected) -> None:
+        assert format_on_stop.formatter_for(path).__name__ == expected
+
+    def test_unknown_extension(self) -> None:
+        assert format_on_stop.formatter_for("notes.txt") is None
+
+
+# ---------------------------------------------------------------------------
+# 2. Batching
+# ---------------------------------------------------------------------------
+
+
+class TestFormatFiles:
+    def test_one_call_per_formatter(self, calls) -> None:
+        format_on_stop.format_files(
+            ["a.ts", "a.py", "b.ts", "run.sh", "b.py", "c.ts", "notes.txt"]
+        )
+        assert [cmd for cmd, _ in calls] == [
+            ["/bin/biome", "check", "--write", "a.ts", "b.ts", "c.ts"],
+            ["/bin/ruff", "format", "--quiet", "a.py", "b.py"],
+            ["/bin/shfmt", "-w", "run.sh"],
+        ]
+
+    def test_biome_grouped_by_binary(self, calls, monkeypatch) -> None:
+        monkeypatch.setattr(
+            format_on_stop,
+            "find_biome",
+            lambda path: "/p1/biome" if path.startswith("p1/") else "/p2/biome",
+        )
+        format_on_stop.format_files(["p1/a.ts", "p2/b.ts", "p1/c.ts"])
+        assert [cmd for cmd, _ in calls] == [
+            ["/p1/biome", "check", "--write", "p1/a.ts", "p1/c.ts"],
+            ["/p2/biome", "check", "--write", "p2/b.ts"],
+        ]
+
+    def test_ruff_timeout_falls_back_to_black(self, monkeypatch, calls) -> None:
+        def _run(cmd, **kwargs):
+            calls.append((cmd, kwargs.get("timeout")))
+            if cmd[0] == "/bin/ruff":
+                raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+        monkeypatch.setattr(format_on_stop.subprocess, "run", _run)
+        format_on_stop.format_files(["a.py", "b.py"])
+        assert [cmd for cmd, _ in calls] == [
+            ["/bin/ruff", "format", "--quiet", "a.py", "b.py"],
+            ["/bin/black", "--quiet", "a.py", "b.py"],
+        ]
+
+    def test_timeout_per_formatter_capped_by_budget(self, calls) -> None:
+        format_on_stop.format_files(["a.py", "a.ts"], budget=5)
+        timeouts = [timeout for _, timeout in calls]
+        assert all(0 < t <= 5 for t in timeouts)
+
+    def test_budget_exhausted_skips_remaining(self, calls) -> None:
+        format_on_stop.format_files(["a.py", "a.ts"], budget=0)
+        assert calls == []
+
+    def test_single_file(self, calls) -> None:
+        format_on_stop.format_files(["main.go"])
+        assert [cmd for cmd, _ in calls] == [["/bin/gofmt", "-w", "main.go"]]
+
+
+# ---------------------------------------------------------------------------
+# 3. Result cache
+# ---------------------------------------------------------------------------
+
+
+class TestFormatCache:
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path))
+        return result_cache.ResultCache("format", str(tmp_path))
+
+    @pytest.fixture
+    def sources(self, tmp_path):
+        a = tmp_path / "a.py"
+        b = tmp_path / "b.py"
+        a.write_text("x=1\n")
+        b.write_text("y=2\n")
+        return str(a), str(b)
+
+    def test_unchanged_files_skipped(self, calls, cache, sources) -> None:
+        format_on_stop.format_files(list(sources), cache=cache)
+        format_on_stop.format_files(list(sources), cache=cache)
+        assert len(calls) == 1
+
+    def test_only_changed_file_reformatted(self, calls, cache, sources) -> None:
+        a, b = sources
+        format_on_stop.format_files([a, b], cache=cache)
+        with open(b, "a") as f:
+            f.write("z=3\n")
+        format_on_stop.format_files([a, b], cache=cache)
+        assert [cmd for cmd, _ in calls][-1] == ["/bin/ruff", "format", "--quiet", b]
+
+    def test_formatted_content_is_cached(
+        self, calls, cache, sources, monkeypatch
+    ) -> None:
+        a, _ = sources
+
+        def _run(cmd, **kwargs):
+            calls.append((cmd, kwargs.get("timeout")))
+            with open(a, "w") as f:
+                f.write("x = 1\n")
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+        monkeypatch.setattr(format_on_stop.subprocess, "run", _run)
+        format_on_stop.format_files([a], cache=cache)
+        format_on_stop.format_files([a], cache=cache)
+        assert len(calls) == 1
+
+    def test_failed_run_not_cached(self, calls, cache, sources, monkeypatch) -> None:
+        def _run(cmd, **kwargs):
+            calls.append((cmd, kwargs.get("timeout")))
+            raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+
+        monkeypatch.setattr(format_on_stop.subprocess, "run", _run)
+        format_on_stop.format_files(list(sources), cache=cache)
+        format_on_stop.format_files(list(sources), cache=cache)
+        # ruff then black, twice
+        assert len(calls) == 4
@@ -0,0 +1,179 @@
+"""Tests for the shared, cached test-framework detection.
+
+Verifies that the vendored copies stay identical, that each framework is
+recognised, and that a cached answer is reused until a manifest is edited
+or a file is added to or removed from the project directory.
+"""
+
+import json
+import os
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, framework_detect
+
+VENDORED_PLUGINS = ["agent-system", "auto-code-quality"]
+
+PYTEST_CMD = ["python3", "-m", "pytest", "--tb=short", "-q"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(framework_detect, "CACHE_PATH", str(tmp_path / "cache.json"))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Count uncached scans."""
+    calls = []
+    original = framework_detect.scan_test_framework
+
+    def _scan(cwd):
+        calls.append(cwd)
+        return original(cwd)
+
+    monkeypatch.setattr(framework_detect, "scan_test_framework", _scan)
+    return calls
+
+
+def touch_later(path) -> None:
+    """Move a path's mtime forward so the change is visible at any resolution."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+class TestVendoredCopies:
+    def test_copies_identical(self) -> None:
+        sources = {
+            plugin: (
+                PLUGINS_ROOT / plugin / "scripts" / "framework_detect.py"
+            ).read_text()
+            for plugin in VENDORED_PLUGINS
+        }
+        reference = sources[VENDORED_PLUGINS[0]]
+        for plugin, source in sources.items():
+            assert source == reference, (
+                f"{plugin}/scripts/framework_detect.py has drifted"
+            )
+
+
+# ---------------------------------------------------------------------------
+# 2. Detection
+# ---------------------------------------------------------------------------
+
+
+class TestDetection:
+    @pytest.mark.parametrize(
+        "name, content, expected",
+        [
+            ("pytest.ini", "", ("pytest", PYTEST_CMD)),
+            ("conftest.py", "", ("pytest", PYTEST_CMD)),
+            ("pyproject.toml", "[tool.pytest.ini_options]\n", ("pytest", PYTEST_CMD)),
+            ("test_app.py", "", ("pytest", PYTEST_CMD)),
+            (
+                "vitest.config.ts",
+                "",
+                ("vitest", ["npx", "vitest", "run", "--reporter=verbose"]),
+            ),
+            ("jest.config.js", "", ("jest", ["npx", "jest", "--verbose"])),
+            ("go.mod", "module x\n", ("go", ["go", "test", "./...", "-count=1"])),
+            ("Cargo.toml", "[package]\n", ("cargo", ["cargo", "test"])),
+            ("README.md", "", ("", [])),
+        ],
+    )
+    def test_frameworks(self, project, name, content, expected) -> None:
+        (project / name).write_text(content)
+        assert framework_detect.detect_test_framework(str(project)) == expected
+
+    @pytest.mark.parametrize(
+        "pkg, expected",
+        [
+            ({"jest": {}}, "jest"),
+            ({"devDependencies": {"mocha": "^10"}}, "mocha"),
+            ({"scripts": {"test": "node test.js"}}, "npm-test"),
+            ({"scripts": {"test": 'echo "Error: no test specified"'}}, ""),
+        ],
+    )
+    def test_package_json(self, project, pkg, expected) -> None:
+        (project / "package.json").write_text(json.dumps(pkg))
+        assert framework_detect.detect_test_framework(str(project))[0] == expected
+
+    def test_missing_directory(self, tmp_path) -> None:
+        assert framework_detect.detect_test_framework(str(tmp_path / "nope")) == (
+            "",
+            [],
+        )
+
+
+# ---------------------------------------------------------------------------
+# 3. Cache
+# ---------------------------------------------------------------------------
+
+
+class TestCache:
+    def test_hit_skips_scan(self, project, scans) -> None:
+        (project / "pytest.ini").write_text("")
+        first = framework_detect.detect_test_framework(str(project))
+        assert framework_detect.detect_test_framework(str(project)) == first
+        assert len(scans) == 1
+
+    def test_no_framework_cached(self, project, scans) -> None:
+        framework_detect.detect_test_framework(str(project))
+        framework_detect.detect_test_framework(str(project))
+        assert len(scans) == 1
+
+    def test_package_json_edit_invalidates(self, project, scans) -> None:
+        pkg = project / "package.json"
+        pkg.write_text(json.dumps({"scripts": {"test": "node t.js"}}))
+        assert framework_detect.detect_test_framework(str(project))[0] == "npm-test"
+        pkg.write_text(json.dumps({"devDependencies": {"mocha": "^10"}}))
+        touch_later(pkg)
+        assert framework_detect.detect_test_framework(str(project))[0] == "mocha"
+        assert len(scans) == 2
+
+    def test_pyproject_edit_invalidates(self, project) -> None:
+        pyproject = project / "pyproject.toml"
+        pyproject.write_text("[project]\n")
+        (project / "go.mod").write_text("module x\n")
+        assert framework_detect.detect_test_framework(str(project))[0] == "go"
+        pyproject.write_text("[project]\n[tool.pytest.ini_options]\n")
+        touch_later(pyproject)
+        assert framework_detect.detect_test_framework(str(project))[0] == "pytest"
+
+    def test_new_file_invalidates(self, project) -> None:
+        assert framework_detect.detect_test_framework(str(project)) == ("", [])
+        (project / "Cargo.toml").write_text("[package]\n")
+        touch_later(project)
+        assert framework_detect.detect_test_framework(str(project))[0] == "cargo"
+
+    def test_corrupt_cache_ignored(self, project) -> None:
+        with open(framework_detect.CACHE_PATH, "w") as f:
+            f.write("not json")
+        (project / "conftest.py").write_text("")
+        assert framework_detect.detect_test_framework(str(project))[0] == "pytest"
+
+    def test_oldest_entries_dropped(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(framework_detect, "MAX_ENTRIES", 2)
+        for name in ("a", "b", "c"):
+            (tmp_path / name).mkdir()
+            framework_detect.detect_test_framework(str(tmp_path / name))
+        with open(framework_detect.CACHE_PATH) as f:
+            cached = json.load(f)
+        assert sorted(os.path.basename(key) for key in cached) == ["b", "c"]
@@ -0,0 +1,180 @@
+"""Tests for the session-context git state injector.
+
+Verifies the summary rendered from one `git status --short --branch` plus
+concurrent log and diff queries, the fallback outside a repository, and
+that the cached summary is reused until HEAD, the index or the branch ref
+change or it expires.
+"""
+
+import io
+import json
+import os
+import subprocess
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import git_state_injector
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(git_state_injector, "CACHE_DIR", str(cache_dir))
+
+
+def git(root, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q", "-b", "main")
+    (root / "app.py").write_text("x = 1\n")
+    git(root, "add", "app.py")
+    git(root, "commit", "-q", "-m", "Initial commit")
+    return root
+
+
+def run_main(cwd) -> str:
+    """Run main() for a SessionStart in cwd, return the injected context."""
+    payload = json.dumps({"cwd": str(cwd)})
+    stdout = io.StringIO()
+    with patch("sys.stdin", io.StringIO(payload)), patch("sys.stdout", stdout):
+        with pytest.raises(SystemExit) as exc:
+            git_state_injector.main()
+    assert (exc.value.code or 0) == 0
+    return json.loads(stdout.getvalue())["hookSpecificOutput"]["additionalContext"]
+
+
+def fail_git(args, cwd):
+    raise AssertionError(f"git {' '.join(args)} ran")
+
+
+# ---------------------------------------------------------------------------
+# 1. Summary
+# ---------------------------------------------------------------------------
+
+
+class TestSummary:
+    def test_clean_repo(self, repo) -> None:
+        lines = run_main(repo).splitlines()
+        assert lines[0] == "[Git State]"
+        assert lines[2] == "Branch: main"
+        assert lines[3] == "Status: clean"
+        assert lines[4] == "Recent commits:"
+        assert lines[5].endswith(" Initial commit")
+
+    def test_changes_counted(self, repo) -> None:
+        (repo / "app.py").write_text("x = 2\n")
+        (repo / "new.py").write_text("")
+        context = run_main(repo)
+        assert "Status: 1 modified, 1 untracked" in context
+        assert " M app.py\n?? new.py" in context
+        assert "Uncommitted changes:\napp.py | 2 +-" in context
+
+    def test_detached_head(self, repo) -> None:
+        git(repo, "checkout", "-q", "--detach")
+        assert "Branch: (detached HEAD)" in run_main(repo)
+
+    def test_no_commits_yet(self, tmp_path) -> None:
+        git(tmp_path, "init", "-q", "-b", "trunk")
+        context = run_main(tmp_path)
+        assert "Branch: trunk" in context
+        assert "Recent commits" not in context
+
+    def test_not_a_repository(self, tmp_path) -> None:
+        context = run_main(tmp_path)
+        assert context == (
+            f"[Git State]\nWorking Directory: {tmp_path} — restrict all file "
+            "operations to this directory unless explicitly instructed otherwise."
+        )
+
+    @pytest.mark.parametrize(
+        "header, branch",
+        [
+            ("## main", "main"),
+            ("## feature/x...origin/feature/x [ahead 2]", "feature/x"),
+            ("## No commits yet on dev", "dev"),
+            ("## Initial commit on dev", "dev"),
+            ("## HEAD (no branch)", ""),
+        ],
+    )
+    def test_parse_branch(self, header, branch) -> None:
+        assert git_state_injector._parse_branch(header) == branch
+
+    def test_queries_run_concurrently(self, repo) -> None:
+        # Each query waits for the other two; serial calls would time out
+        barrier = threading.Barrier(3, timeout=5)
+        original = git_state_injector._run_git
+
+        def waiting(args, cwd):
+            barrier.wait()
+            return original(args, cwd)
+
+        with patch.object(git_state_injector, "_run_git", waiting):
+            assert "Branch: main" in run_main(repo)
+
+
+# ---------------------------------------------------------------------------
+# 2. Cache
+# ---------------------------------------------------------------------------
+
+
+class TestCache:
+    def test_reused_without_running_git(self, repo) -> None:
+        first = run_main(repo)
+        with patch.object(git_state_injector, "_run_git", fail_git):
+            assert run_main(repo) == first
+
+    def test_commit_invalidates(self, repo) -> None:
+        run_main(repo)
+        (repo / "app.py").write_text("x = 2\n")
+        git(repo, "commit", "-q", "-am", "Second commit")
+        assert "Second commit" in run_main(repo)
+
+    def test_staging_invalidates(self, repo) -> None:
+        run_main(repo)
+        (repo / "new.py").write_text("")
+        git(repo, "add", "new.py")
+        assert "A  new.py" in run_main(repo)
+
+    def test_branch_switch_invalidates(self, repo) -> None:
+        run_main(repo)
+        git(repo, "checkout", "-q", "-b", "other")
+        assert "Branch: other" in run_main(repo)
+
+    def test_expires(self, repo, monkeypatch) -> None:
+        run_main(repo)
+        monkeypatch.setattr(git_state_injector, "CACHE_TTL", 0)
+        (repo / "new.py").write_text("")
+        assert "?? new.py" in run_main(repo)
+
+    def test_not_cached_outside_repository(self, tmp_path) -> None:
+        run_main(tmp_path)
+        assert os.listdir(git_state_injector.CACHE_DIR) == []
+
+    def test_worktree_git_dir(self, repo, tmp_path) -> None:
+        worktree = tmp_path / "wt"
+        git(repo, "worktree", "add", "-q", "-b", "wt", str(worktree))
+        git_dir = git_state_injector._git_dir(str(worktree))
+        assert git_dir == os.path.realpath(repo / ".git" / "worktrees" / "wt")
+        fingerprint = git_state_injector._fingerprint(str(worktree))
+        ref = os.path.join(os.path.realpath(repo / ".git"), "refs", "heads", "wt")
+        assert ref in [entry[0] for entry in fingerprint[1:]]
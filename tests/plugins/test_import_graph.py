@@ -0,0 +1,264 @@
+"""Tests for the auto-code-quality import-graph test selection.
+
+Verifies that imports are resolved to project files (absolute, relative,
+src/ layout and sibling test helpers), that an edited module selects every
+test that imports it transitively, that conftest.py scopes to its directory,
+that a file's transitive imports are reported, and that the on-disk cache
+re-parses only changed files.
+"""
+
+import os
+
+import pytest
+
+from tests.conftest import advisory_test_runner, import_graph
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(import_graph, "CACHE_DIR", str(cache_dir))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A small src/ layout project with tests importing it."""
+    root = tmp_path / "proj"
+    files = {
+        "src/app/__init__.py": "",
+        "src/app/models.py": "X = 1\n",
+        "src/app/service.py": "from .models import X\n",
+        "src/app/api/__init__.py": "",
+        "src/app/api/routes.py": "from ..service import X\nimport json\n",
+        "src/app/util.py": "",
+        "tests/conftest.py": "",
+        "tests/helpers.py": "from app import util\n",
+        "tests/test_models.py": "from app.models import X\n",
+        "tests/test_routes.py": "import app.api.routes\n",
+        "tests/test_util.py": "from helpers import *\n",
+        "tests/unit/conftest.py": "",
+        "tests/unit/test_plain.py": "def test_x(): pass\n",
+        "scripts/tool.py": "from app import service\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def selected(root, *edited) -> list[str]:
+    graph = import_graph.load(str(root))
+    tests = graph.affected_tests([str(root / e) for e in edited])
+    return [os.path.relpath(t, root) for t in tests]
+
+
+# ---------------------------------------------------------------------------
+# 1. Selection
+# ---------------------------------------------------------------------------
+
+
+class TestAffectedTests:
+    def test_transitive_importers(self, project) -> None:
+        assert selected(project, "src/app/models.py") == [
+            "tests/test_models.py",
+            "tests/test_routes.py",
+        ]
+
+    def test_relative_imports(self, project) -> None:
+        assert selected(project, "src/app/service.py") == ["tests/test_routes.py"]
+
+    def test_package_init_affects_importers(self, project) -> None:
+        assert "tests/test_routes.py" in selected(project, "src/app/api/__init__.py")
+
+    def test_sibling_helper_module(self, project) -> None:
+        assert selected(project, "src/app/util.py") == ["tests/test_util.py"]
+
+    def test_edited_test_selects_itself(self, project) -> None:
+        assert selected(project, "tests/test_models.py") == ["tests/test_models.py"]
+
+    def test_unimported_module_selects_nothing(self, project) -> None:
+        assert selected(project, "scripts/tool.py") == []
+
+    def test_nested_conftest_scoped_to_directory(self, project) -> None:
+        assert selected(project, "tests/unit/conftest.py") == [
+            "tests/unit/test_plain.py"
+        ]
+
+    def test_root_test_conftest_selects_all_tests(self, project) -> None:
+        assert selected(project, "tests/conftest.py") == [
+            "tests/test_models.py",
+            "tests/test_routes.py",
+            "tests/test_util.py",
+            "tests/unit/test_plain.py",
+        ]
+
+    def test_skipped_directories(self, project) -> None:
+        venv = project / ".venv" / "lib" / "test_vendor.py"
+        venv.parent.mkdir(parents=True)
+        venv.write_text("from app import models\n")
+        assert selected(project, "src/app/models.py") == [
+            "tests/test_models.py",
+            "tests/test_routes.py",
+        ]
+
+    def test_too_many_files(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(import_graph, "MAX_FILES", 3)
+        assert import_graph.load(str(project)) is None
+
+
+class TestDependencies:
+    def test_transitive_imports(self, project) -> None:
+        graph = import_graph.load(str(project))
+        assert graph.dependencies("tests/test_routes.py") == {
+            "tests/test_routes.py",
+            "src/app/__init__.py",
+            "src/app/api/__init__.py",
+            "src/app/api/routes.py",
+            "src/app/service.py",
+            "src/app/models.py",
+        }
+
+    def test_no_project_imports(self, project) -> None:
+        graph = import_graph.load(str(project))
+        assert graph.dependencies("tests/unit/test_plain.py") == {
+            "tests/unit/test_plain.py"
+        }
+
+    def test_test_files(self, project) -> None:
+        assert import_graph.load(str(project)).test_files() == [
+            "tests/test_models.py",
+            "tests/test_routes.py",
+            "tests/test_util.py",
+            "tests/unit/test_plain.py",
+        ]
+
+
+# ---------------------------------------------------------------------------
+# 2. Incremental cache
+# ---------------------------------------------------------------------------
+
+
+class TestCache:
+    def count_parses(self, monkeypatch) -> list:
+        calls = []
+        original = import_graph.parse_imports
+
+        def _parse(path):
+            calls.append(os.path.basename(path))
+            return original(path)
+
+        monkeypatch.setattr(import_graph, "parse_imports", _parse)
+        return calls
+
+    def test_unchanged_files_not_reparsed(self, project, monkeypatch) -> None:
+        import_graph.load(str(project))
+        calls = self.count_parses(monkeypatch)
+        import_graph.load(str(project))
+        assert calls == []
+
+    def test_changed_file_reparsed(self, project, monkeypatch) -> None:
+        import_graph.load(str(project))
+        calls = self.count_parses(monkeypatch)
+        (project / "scripts" / "tool.py").write_text("import app.models  # new\n")
+        graph = import_graph.load(str(project))
+        assert calls == ["tool.py"]
+        assert "scripts/tool.py" in graph.dependents()["src/app/models.py"]
+
+    def test_new_test_picked_up(self, project) -> None:
+        import_graph.load(str(project))
+        (project / "tests" / "test_service.py").write_text("from app import service\n")
+        assert "tests/test_service.py" in selected(project, "src/app/models.py")
+
+    def test_syntax_error_file_has_no_imports(self, tmp_path) -> None:
+        bad = tmp_path / "bad.py"
+        bad.write_text("def (:\n")
+        assert import_graph.parse_imports(str(bad)) == []
+
+    def test_multiline_and_nested_imports(self, tmp_path) -> None:
+        source = tmp_path / "mod.py"
+        source.write_text(
+            '"""\nfrom the docs: import nothing here\n"""\n'
+            "from pkg.sub import (\n    a,\n    b,\n)\n"
+            "import x, \\\n    y\n"
+            "def f():\n    from . import lazy\n"
+        )
+        assert import_graph.parse_imports(str(source)) == [
+            [0, "pkg.sub", ["a", "b"]],
+            [0, "x", []],
+            [0, "y", []],
+            [1, "", ["lazy"]],
+        ]
+
+    def test_several_statements_on_one_line(self, tmp_path) -> None:
+        source = tmp_path / "mod.py"
+        source.write_text("import os; import mypkg.core\nfrom a import b; x = 1\n")
+        assert import_graph.parse_imports(str(source)) == [
+            [0, "os", []],
+            [0, "mypkg.core", []],
+            [0, "a", ["b"]],
+        ]
+
+
+# ---------------------------------------------------------------------------
+# 3. advisory-test-runner integration
+# ---------------------------------------------------------------------------
+
+
+class TestResolvePytestTests:
+    def test_graph_selection(self, project) -> None:
+        tests, run_all = advisory_test_runner.resolve_pytest_tests(
+            [str(project / "src/app/service.py")], str(project)
+        )
+        assert run_all is False
+        assert tests == [str(project / "tests/test_routes.py")]
+
+    def test_conftest_no_longer_runs_everything(self, project) -> None:
+        tests, run_all = advisory_test_runner.resolve_pytest_tests(
+            [str(project / "tests/unit/conftest.py")], str(project)
+        )
+        assert run_all is False
+        assert tests == [str(project / "tests/unit/test_plain.py")]
+
+    def test_mirrored_test_kept(self, project) -> None:
+        # Mirrors src/app/models.py by path but does not import it
+        (project / "tests" / "app").mkdir()
+        mirror = project / "tests" / "app" / "test_models.py"
+        mirror.write_text("def test_x(): pass\n")
+        tests, _ = advisory_test_runner.resolve_pytest_tests(
+            [str(project / "src/app/models.py")], str(project)
+        )
+        assert str(mirror) in tests
+
+    def test_mirrored_test_kept_with_conftest_edit(self, project) -> None:
+        (project / "tests" / "app").mkdir()
+        mirror = project / "tests" / "app" / "test_models.py"
+        mirror.write_text("def test_x(): pass\n")
+        tests, run_all = advisory_test_runner.resolve_pytest_tests(
+            [
+                str(project / "tests/unit/conftest.py"),
+                str(project / "src/app/models.py"),
+            ],
+            str(project),
+        )
+        assert run_all is False
+        assert str(mirror) in tests
+        assert str(project / "tests/unit/test_plain.py") in tests
+
+    def test_fallback_to_mirroring(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(import_graph, "MAX_FILES", 3)
+        tests, run_all = advisory_test_runner.resolve_pytest_tests(
+            [str(project / "tests/conftest.py")], str(project)
+        )
+        assert (tests, run_all) == ([], True)
+
+    def test_non_python_edits(self, project) -> None:
+        assert advisory_test_runner.resolve_pytest_tests(
+            [str(project / "README.md")], str(project)
+        ) == ([], False)
@@ -0,0 +1,412 @@
+"""Tests for the auto-code-quality lint-file Stop hook.
+
+Verifies that run_linters() dispatches files to the right linters, batches
+Pyright/Ruff/Biome into one call per tool and clippy into one call per
+Cargo package, reports results grouped by
+linter in a fixed order regardless of completion order, and returns partial
+results when the lint budget runs out. Batched linter output is split back
+out per file, and results of file-local linters are replayed from the
+content-hash cache.
+"""
+
+import json
+import subprocess
+import time
+
+import pytest
+
+from tests.conftest import lint_file, result_cache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def fake_linter(delay: float = 0.0, prefix: str = ""):
+    """Build a per-file lint function that sleeps, then reports the file."""
+
+    def _lint(path: str) -> str:
+        time.sleep(delay)
+        return f"{prefix}{path}"
+
+    return _lint
+
+
+def fake_batch_linter(prefix: str, calls: list | None = None):
+    """Build a batched lint function reporting each file it was given."""
+
+    def _lint(paths: list[str]) -> list[str]:
+        if calls is not None:
+            calls.append(list(paths))
+        return [f"{prefix}{p}" for p in paths]
+
+    return _lint
+
+
+@pytest.fixture
+def fake_linters(monkeypatch):
+    """Replace every real linter with an instant fake."""
+    batched = {
+        "lint_python_pyright": "pyright:",
+        "lint_python_ruff": "ruff:",
+        "lint_biome": "biome:",
+        "lint_clippy": "clippy:",
+    }
+    per_file = {
+        "lint_shellcheck": "shellcheck:",
+        "lint_go_vet": "vet:",
+        "lint_hadolint": "hadolint:",
+    }
+    for attr, prefix in batched.items():
+        monkeypatch.setattr(lint_file, attr, fake_batch_linter(prefix))
+    for attr, prefix in per_file.items():
+        monkeypatch.setattr(lint_file, attr, fake_linter(prefix=prefix))
+
+
+def completed(stdout: str) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=1, stdout=stdout, stderr="")
+
+
+# ---------------------------------------------------------------------------
+# 1. Dispatch
+# ---------------------------------------------------------------------------
+
+
+class TestLintersFor:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("src/app.py", ["Pyright", "Ruff"]),
+            ("web/index.tsx", ["Biome"]),
+            ("scripts/run.sh", ["ShellCheck"]),
+            ("cmd/main.go", ["go vet"]),
+            ("Dockerfile", ["hadolint"]),
+            ("src/lib.rs", ["clippy"]),
+            ("README.md", []),
+        ],
+    )
+    def test_dispatch(self, path, expected) -> None:
+        assert [name for name, _ in lint_file.linters_for(path)] == expected
+
+
+# ---------------------------------------------------------------------------
+# 2. Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestRunLinters:
+    def test_grouped_in_fixed_order(self, fake_linters) -> None:
+        results, skipped = lint_file.run_linters(
+            ["run.sh", "a.py", "index.ts", "b.py"]
+        )
+        assert skipped == 0
+        assert list(results) == ["Pyright", "Ruff", "Biome", "ShellCheck"]
+        assert results["Pyright"] == ["pyright:a.py", "pyright:b.py"]
+        assert results["Ruff"] == ["ruff:a.py", "ruff:b.py"]
+
+    def test_file_order_kept_when_completion_order_differs(
+        self, monkeypatch
+    ) -> None:
+        delays = {"slow.sh": 0.2, "fast.sh": 0.0}
+        monkeypatch.setattr(
+            lint_file, "lint_shellcheck", lambda p: time.sleep(delays[p]) or p
+        )
+        results, _ = lint_file.run_linters(["slow.sh", "fast.sh"])
+        assert results["ShellCheck"] == ["slow.sh", "fast.sh"]
+
+    def test_batched_linters_called_once(self, monkeypatch, fake_linters) -> None:
+        calls: list = []
+        monkeypatch.setattr(
+            lint_file, "lint_python_pyright", fake_batch_linter("p:", calls)
+        )
+        results, _ = lint_file.run_linters(["a.py", "run.sh", "b.py", "c.pyi"])
+        assert calls == [["a.py", "b.py", "c.pyi"]]
+        assert results["Pyright"] == ["p:a.py", "p:b.py", "p:c.pyi"]
+
+    def test_plan_jobs(self, fake_linters) -> None:
+        jobs = lint_file.plan_jobs(["a.sh", "a.py", "b.sh", "b.py"])
+        assert [(linter, files) for linter, _, files in jobs] == [
+            ("Pyright", ["a.py", "b.py"]),
+            ("Ruff", ["a.py", "b.py"]),
+            ("ShellCheck", ["a.sh"]),
+            ("ShellCheck", ["b.sh"]),
+        ]
+
+    def test_empty_results_omitted(self, monkeypatch, fake_linters) -> None:
+        monkeypatch.setattr(lint_file, "lint_python_ruff", lambda paths: [])
+        results, _ = lint_file.run_linters(["a.py"])
+        assert list(results) == ["Pyright"]
+
+    def test_linter_exception_ignored(self, monkeypatch, fake_linters) -> None:
+        def _boom(paths):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(lint_file, "lint_python_pyright", _boom)
+        results, skipped = lint_file.run_linters(["a.py"])
+        assert list(results) == ["Ruff"]
+        assert skipped == 0
+
+    def test_no_lintable_files(self) -> None:
+        assert lint_file.run_linters(["notes.txt"]) == ({}, 0)
+
+    def test_budget_returns_partial_results(self, monkeypatch) -> None:
+        monkeypatch.setattr(lint_file, "MAX_WORKERS", 1)
+        monkeypatch.setattr(lint_file, "lint_shellcheck", fake_linter(delay=0.3))
+        paths = [f"s{i}.sh" for i in range(5)]
+
+        start = time.monotonic()
+        results, skipped = lint_file.run_linters(paths, budget=0.1)
+        assert time.monotonic() - start < 0.3
+
+        assert results == {}
+        assert skipped == 5
+
+    def test_subprocess_timeout_capped_by_budget(self, monkeypatch) -> None:
+        seen = []
+        monkeypatch.setattr(
+            lint_file, "lint_go_vet", lambda p: seen.append(lint_file._timeout()) or ""
+        )
+        lint_file.run_linters(["main.go"], budget=2)
+        assert 0 < seen[0] <= 2
+
+
+# ---------------------------------------------------------------------------
+# 3. Splitting batched diagnostics per file
+# ---------------------------------------------------------------------------
+
+
+class TestBatchedOutput:
+    @pytest.fixture
+    def files(self, tmp_path):
+        a = tmp_path / "a.py"
+        b = tmp_path / "b.py"
+        a.write_text("x = 1\n")
+        b.write_text("y = 2\n")
+        return str(a), str(b)
+
+    def test_pyright_split_per_file(self, monkeypatch, files) -> None:
+        a, b = files
+        output = {
+            "generalDiagnostics": [
+                {
+                    "file": b,
+                    "severity": "error",
+                    "message": "bad b",
+                    "range": {"start": {"line": 4}},
+                },
+                {
+                    "file": a,
+                    "severity": "warning",
+                    "message": "bad a",
+                    "range": {"start": {"line": 0}},
+                },
+            ]
+        }
+        argv = []
+        monkeypatch.setattr(lint_file, "_which", lambda name: "/bin/pyright")
+        monkeypatch.setattr(
+            lint_file.subprocess,
+            "run",
+            lambda cmd, **kw: argv.append(cmd) or completed(json.dumps(output)),
+        )
+
+        results = lint_file.lint_python_pyright([a, b])
+
+        assert argv == [["/bin/pyright", "--outputjson", a, b]]
+        assert len(results) == 2
+        assert results[0].startswith("  a.py: 1 issue(s)")
+        assert "Line 1: bad a" in results[0]
+        assert results[1].startswith("  b.py: 1 issue(s)")
+        assert "Line 5: bad b" in results[1]
+
+    def test_ruff_clean_file_empty(self, monkeypatch, files) -> None:
+        a, b = files
+        output = [
+            {
+                "filename": b,
+                "code": "F401",
+                "message": "unused import",
+                "location": {"row": 3},
+            }
+        ]
+        monkeypatch.setattr(lint_file, "_which", lambda name: "/bin/ruff")
+        monkeypatch.setattr(
+            lint_file.subprocess, "run", lambda cmd, **kw: completed(json.dumps(output))
+        )
+
+        results = lint_file.lint_python_ruff([a, b])
+
+        assert len(results) == 2
+        assert results[0] == ""
+        assert results[1].startswith("  b.py: 1 issue(s)")
+        assert "[F401] unused import" in results[1]
+
+    def test_batch_timeout_reported_once(self, monkeypatch, files) -> None:
+        def _timeout(cmd, **kw):
+            raise subprocess.TimeoutExpired(cmd, kw.get("timeout"))
+
+        monkeypatch.setattr(lint_file, "_which", lambda name: "/bin/ruff")
+        monkeypatch.setattr(lint_file.subprocess, "run", _timeout)
+
+        results = lint_file.lint_python_ruff(list(files))
+        assert results == ["  2 file(s): ruff timed out", ""]
+        assert all(isinstance(msg, lint_file.Transient) for msg in results)
+
+    def test_clippy_once_per_package(self, monkeypatch, tmp_path) -> None:
+        paths = []
+        for crate in ("one", "two"):
+            (tmp_path / crate / "src").mkdir(parents=True)
+            (tmp_path / crate / "Cargo.toml").write_text("[package]\n")
+            for name in ("lib.rs", "util.rs"):
+                path = tmp_path / crate / "src" / name
+                path.write_text("\n")
+                paths.append(str(path))
+
+        def _clippy(cmd, cwd, **kw):
+            calls.append(cwd)
+            span = {"is_primary": True, "file_name": "src/util.rs", "line_start": 3}
+            message = {"level": "warning", "message": "bad", "spans": [span]}
+            return completed(
+                json.dumps({"reason": "compiler-message", "message": message})
+            )
+
+        calls: list = []
+        monkeypatch.setattr(lint_file, "_which", lambda name: "/bin/cargo")
+        monkeypatch.setattr(lint_file.subprocess, "run", _clippy)
+
+        results = lint_file.lint_clippy(paths)
+
+        assert calls == [str((tmp_path / crate).resolve()) for crate in ("one", "two")]
+        assert [bool(msg) for msg in results] == [False, True, False, True]
+        assert "Line 3: bad" in results[1]
+
+
+# ---------------------------------------------------------------------------
+# 4. Result cache
+# ---------------------------------------------------------------------------
+
+
+class TestResultCache:
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(lint_file, "_which", lambda name: None)
+        return result_cache.ResultCache("lint", str(tmp_path))
+
+    @pytest.fixture
+    def script(self, tmp_path):
+        path = tmp_path / "run.sh"
+        path.write_text("echo $x\n")
+        return str(path)
+
+    def counting_linter(self, monkeypatch, calls: list, message: str = "warn"):
+        def _lint(path):
+            calls.append(path)
+            return message
+
+        monkeypatch.setattr(lint_file, "lint_shellcheck", _lint)
+
+    def test_unchanged_file_replayed(self, monkeypatch, cache, script) -> None:
+        calls: list = []
+        self.counting_linter(monkeypatch, calls)
+
+        first, _ = lint_file.run_linters([script], cache=cache)
+        second, _ = lint_file.run_linters([script], cache=cache)
+
+        assert calls == [script]
+        assert first == second == {"ShellCheck": ["warn"]}
+
+    def test_content_change_relints(self, monkeypatch, cache, script) -> None:
+        calls: list = []
+        self.counting_linter(monkeypatch, calls)
+
+        lint_file.run_linters([script], cache=cache)
+        with open(script, "a") as f:
+            f.write("echo done\n")
+        lint_file.run_linters([script], cache=cache)
+
+        assert calls == [script, script]
+
+    def test_config_change_relints(
+        self, monkeypatch, cache, script, tmp_path
+    ) -> None:
+        calls: list = []
+        self.counting_linter(monkeypatch, calls)
+        monkeypatch.setattr(result_cache, "_config_hashes", {})
+
+        lint_file.run_linters([script], cache=cache)
+        (tmp_path / ".shellcheckrc").write_text("disable=SC2086\n")
+        result_cache._config_hashes.clear()
+        lint_file.run_linters([script], cache=cache)
+
+        assert len(calls) == 2
+
+    def test_tool_change_relints(self, monkeypatch, cache, script, tmp_path) -> None:
+        calls: list = []
+        self.counting_linter(monkeypatch, calls)
+        tool = tmp_path / "shellcheck"
+        tool.write_text("v1")
+        monkeypatch.setattr(lint_file, "_which", lambda name: str(tool))
+
+        lint_file.run_linters([script], cache=cache)
+        tool.write_text("version 2")
+        lint_file.run_linters([script], cache=cache)
+
+        assert len(calls) == 2
+
+    def test_transient_result_not_cached(self, monkeypatch, cache, script) -> None:
+        calls: list = []
+        monkeypatch.setattr(
+            lint_file,
+            "lint_shellcheck",
+            lambda p: calls.append(p) or lint_file.Transient("timed out"),
+        )
+
+        lint_file.run_linters([script], cache=cache)
+        results, _ = lint_file.run_linters([script], cache=cache)
+
+        assert len(calls) == 2
+        assert results == {"ShellCheck": ["timed out"]}
+
+    def test_cross_file_linters_not_cached(
+        self, monkeypatch, cache, tmp_path
+    ) -> None:
+        path = tmp_path / "main.go"
+        path.write_text("package main\n")
+        calls: list = []
+        monkeypatch.setattr(lint_file, "lint_go_vet", lambda p: calls.append(p) or "")
+
+        lint_file.run_linters([str(path)], cache=cache)
+        lint_file.run_linters([str(path)], cache=cache)
+
+        assert len(calls) == 2
+
+    def test_batched_linter_gets_only_misses(
+        self, monkeypatch, fake_linters, cache, tmp_path
+    ) -> None:
+        a = tmp_path / "a.py"
+        b = tmp_path / "b.py"
+        a.write_text("x = 1\n")
+        b.write_text("y = 2\n")
+        calls: list = []
+        monkeypatch.setattr(
+            lint_file, "lint_python_ruff", fake_batch_linter("r:", calls)
+        )
+
+        lint_file.run_linters([str(a)], cache=cache)
+        results, _ = lint_file.run_linters([str(a), str(b)], cache=cache)
+
+        assert calls == [[str(a)], [str(b)]]
+        assert results["Ruff"] == [f"r:{a}", f"r:{b}"]
+
+    def test_persisted_between_runs(self, monkeypatch, cache, script, tmp_path) -> None:
+        calls: list = []
+        self.counting_linter(monkeypatch, calls)
+
+        lint_file.run_linters([script], cache=cache)
+        cache.save()
+        reloaded = result_cache.ResultCache("lint", str(tmp_path))
+        lint_file.run_linters([script], cache=reloaded)
+
+        assert calls == [script]
@@ -0,0 +1,214 @@
+"""Tests for the auto-code-quality persistent pyright session.
+
+Drives LanguageServer, the session daemon and its client against a small
+fake language server (fake_langserver.py), and checks that lint-file.py
+only uses the session when CODEFORGE_PYRIGHT_LSP is set and falls back to
+the pyright CLI when the session fails.
+"""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import lint_file, pyright_session
+
+FAKE_SERVER = [sys.executable, str(Path(__file__).parent / "fake_langserver.py")]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def server(tmp_path):
+    ls = pyright_session.LanguageServer(FAKE_SERVER, str(tmp_path))
+    ls.initialize(timeout=5)
+    yield ls
+    ls.shutdown()
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """Serve a session daemon for tmp_path in a thread."""
+    path = str(tmp_path / "s.sock")
+    monkeypatch.setattr(pyright_session, "socket_path", lambda root: path)
+
+    def _start():
+        listener = pyright_session.bind_socket(path)
+        ls = pyright_session.LanguageServer(FAKE_SERVER, str(tmp_path))
+        ls.initialize(timeout=5)
+        thread = threading.Thread(
+            target=pyright_session.serve,
+            args=(listener, path, ls, 1.0),
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    return path, _start
+
+
+def write(path: Path, text: str) -> str:
+    path.write_text(text)
+    return str(path)
+
+
+# ---------------------------------------------------------------------------
+# 1. Language server protocol
+# ---------------------------------------------------------------------------
+
+
+class TestLanguageServer:
+    def test_open_reports_diagnostics(self, server, tmp_path) -> None:
+        a = write(tmp_path / "a.py", "x = 1\nbad = 2\n")
+        assert server.diagnostics([a], timeout=5) == [
+            (a, {"severity": "error", "line": 2, "message": "bad thing"})
+        ]
+
+    def test_clean_file(self, server, tmp_path) -> None:
+        a = write(tmp_path / "a.py", "x = 1\n")
+        assert server.diagnostics([a], timeout=5) == []
+
+    def test_documents_closed_after_request(self, server, tmp_path) -> None:
+        a = tmp_path / "a.py"
+        write(a, "x = 1\n")
+        server.diagnostics([str(a)], timeout=5)
+        write(a, "bad\nbad\n")
+        results = server.diagnostics([str(a)], timeout=5)
+        assert [diag["line"] for _, diag in results] == [1, 2]
+        assert server._open == set()
+        assert server._versions[a.resolve().as_uri()] == 2
+
+    def test_dependency_change_reported(self, server, tmp_path) -> None:
+        dep = write(tmp_path / "dep.py", "def helper():\n    pass\n")
+        main = write(tmp_path / "main.py", "from dep import helper\n")
+        assert server.diagnostics([main, dep], timeout=5) == []
+        # Changed on disk without main.py changing, as a checkout would
+        write(tmp_path / "dep.py", "def other():\n    pass\n")
+        assert server.diagnostics([main], timeout=5) == [
+            (main, {"severity": "error", "line": 1, "message": '"helper" is unknown'})
+        ]
+
+    def test_repeated_request_answered(self, server, tmp_path) -> None:
+        a = write(tmp_path / "a.py", "bad\n")
+        first = server.diagnostics([a], timeout=5)
+        for _ in range(5):
+            assert server.diagnostics([a, a], timeout=5) == first
+
+    def test_silent_server_times_out(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("FAKE_LS_SILENT", "1")
+        ls = pyright_session.LanguageServer(FAKE_SERVER, str(tmp_path))
+        try:
+            ls.initialize(timeout=5)
+            a = write(tmp_path / "a.py", "bad\n")
+            with pytest.raises(TimeoutError):
+                ls.diagnostics([a], timeout=0.3)
+        finally:
+            ls.shutdown()
+
+    def test_shutdown_stops_process(self, tmp_path) -> None:
+        ls = pyright_session.LanguageServer(FAKE_SERVER, str(tmp_path))
+        ls.initialize(timeout=5)
+        ls.shutdown()
+        assert not ls.alive()
+
+
+# ---------------------------------------------------------------------------
+# 2. Daemon and client
+# ---------------------------------------------------------------------------
+
+
+class TestSessionDaemon:
+    def test_round_trip(self, daemon, tmp_path) -> None:
+        _path, start = daemon
+        start()
+        a = write(tmp_path / "a.py", "bad\n")
+        assert pyright_session.check([a], str(tmp_path), FAKE_SERVER, 5) == [
+            (a, {"severity": "error", "line": 1, "message": "bad thing"})
+        ]
+
+    def test_spawns_daemon_when_missing(self, daemon, tmp_path, monkeypatch) -> None:
+        _path, start = daemon
+        spawned = []
+        monkeypatch.setattr(
+            pyright_session,
+            "_spawn",
+            lambda root, command: spawned.append(start()),
+        )
+        a = write(tmp_path / "a.py", "ok\n")
+        assert pyright_session.check([a], str(tmp_path), FAKE_SERVER, 5) == []
+        assert len(spawned) == 1
+
+    def test_no_daemon_returns_none(self, daemon, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(pyright_session, "_spawn", lambda root, command: None)
+        monkeypatch.setattr(pyright_session, "SPAWN_TIMEOUT", 0.2)
+        a = write(tmp_path / "a.py", "bad\n")
+        assert pyright_session.check([a], str(tmp_path), FAKE_SERVER, 5) is None
+
+    def test_second_bind_detects_live_daemon(self, daemon) -> None:
+        path, start = daemon
+        start()
+        assert pyright_session.bind_socket(path) is None
+
+    def test_idle_daemon_exits(self, daemon, tmp_path) -> None:
+        path, start = daemon
+        thread = start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert not Path(path).exists()
+
+
+# ---------------------------------------------------------------------------
+# 3. lint-file.py integration
+# ---------------------------------------------------------------------------
+
+
+class TestLintIntegration:
+    @pytest.fixture
+    def source(self, tmp_path):
+        return write(tmp_path / "a.py", "bad\n")
+
+    def test_disabled_by_default(self, monkeypatch) -> None:
+        monkeypatch.delenv(pyright_session.ENV_FLAG, raising=False)
+        assert not pyright_session.enabled()
+
+    @pytest.mark.parametrize("value", ["1", "true", "yes"])
+    def test_enabled(self, monkeypatch, value) -> None:
+        monkeypatch.setenv(pyright_session.ENV_FLAG, value)
+        assert pyright_session.enabled()
+
+    def test_session_used_when_enabled(self, monkeypatch, source) -> None:
+        monkeypatch.setenv(pyright_session.ENV_FLAG, "1")
+        monkeypatch.setattr(lint_file, "_which", lambda name: f"/bin/{name}")
+        monkeypatch.setattr(
+            pyright_session,
+            "check",
+            lambda paths, root, command, timeout: [
+                (paths[0], {"severity": "error", "line": 1, "message": "warm"})
+            ],
+        )
+        monkeypatch.setattr(
+            lint_file.subprocess,
+            "run",
+            lambda *a, **kw: pytest.fail("pyright CLI should not run"),
+        )
+        results = lint_file.lint_python_pyright([source])
+        assert "Line 1: warm" in results[0]
+
+    def test_cli_fallback_when_session_fails(self, monkeypatch, source) -> None:
+        monkeypatch.setenv(pyright_session.ENV_FLAG, "1")
+        monkeypatch.setattr(lint_file, "_which", lambda name: f"/bin/{name}")
+        monkeypatch.setattr(pyright_session, "check", lambda *a: None)
+        argv = []
+        monkeypatch.setattr(
+            lint_file.subprocess,
+            "run",
+            lambda cmd, **kw: argv.append(cmd)
+            or subprocess.CompletedProcess(cmd, 0, '{"generalDiagnostics": []}', ""),
+        )
+        assert lint_file.lint_python_pyright([source]) == [""]
+        assert argv == [["/bin/pyright", "--outputjson", source]]
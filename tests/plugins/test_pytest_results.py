@@ -0,0 +1,295 @@
+"""Tests for the per-test-file pytest result cache.
+
+Verifies that the vendored copies stay identical, that per-file outcomes
+are read from pytest's progress output (including output cut short by a
+timeout), and that a passing test file is skipped until the file, a module
+it imports, a conftest.py above it or the pytest config changes.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, import_graph, pytest_results
+
+VENDORED_PLUGINS = ["auto-code-quality", "agent-system"]
+
+PYTEST_CMD = [
+    sys.executable,
+    "-m",
+    "pytest",
+    "--tb=short",
+    "-q",
+    "-p",
+    "no:cacheprovider",
+]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(import_graph, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(pytest_results, "STORE_DIR", str(cache_dir))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A flat project whose tests import two modules."""
+    root = tmp_path / "proj"
+    files = {
+        "pytest.ini": "[pytest]\n",
+        "app.py": "VALUE = 1\n",
+        "util.py": "def double(x):\n    return 2 * x\n",
+        "conftest.py": "",
+        "test_app.py": "from app import VALUE\n\n"
+        "def test_value():\n    assert VALUE == 1\n",
+        "test_util.py": "from util import double\n\n"
+        "def test_double():\n    assert double(2) == 4\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def run(root, tests=None) -> tuple["pytest_results.CachedRun", int | None]:
+    """Plan a cached run, execute it and record the outcome."""
+    cached_run = pytest_results.plan(PYTEST_CMD, str(root), tests)
+    if cached_run.cmd is None:
+        return cached_run, None
+    result = subprocess.run(
+        cached_run.cmd, cwd=root, capture_output=True, text=True, timeout=60
+    )
+    cached_run.record(result.stdout, result.returncode)
+    return cached_run, result.returncode
+
+
+def names(paths) -> list[str]:
+    return sorted(os.path.basename(p) for p in paths)
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+class TestVendoredCopies:
+    @pytest.mark.parametrize("module", ["pytest_results.py", "import_graph.py"])
+    def test_copies_identical(self, module) -> None:
+        sources = {
+            plugin: (PLUGINS_ROOT / plugin / "scripts" / module).read_text()
+            for plugin in VENDORED_PLUGINS
+        }
+        reference = sources[VENDORED_PLUGINS[0]]
+        for plugin, source in sources.items():
+            assert source == reference, f"{plugin}/scripts/{module} has drifted"
+
+
+# ---------------------------------------------------------------------------
+# 2. Output parsing
+# ---------------------------------------------------------------------------
+
+
+class TestParseOutcomes:
+    @pytest.fixture
+    def files(self, tmp_path):
+        for name in ("test_a.py", "test_b.py", "test_c.py"):
+            (tmp_path / name).write_text("")
+        return tmp_path
+
+    def outcomes(self, files, output) -> dict[str, bool]:
+        result = pytest_results.parse_outcomes(output, str(files))
+        return {os.path.basename(p): passed for p, passed in result.items()}
+
+    def test_progress_lines(self, files) -> None:
+        output = (
+            "============ test session starts ============\n"
+            "rootdir: " + str(files) + "\n"
+            "collected 4 items\n\n"
+            "test_a.py ..s                         [ 75%]\n"
+            "test_b.py F                           [100%]\n\n"
+            "================= FAILURES ==================\n"
+            "test_c.py:3: in helper\n"
+            "=========== short test summary info =========\n"
+            "FAILED test_b.py::test_x - assert 0\n"
+            "========= 1 failed, 2 passed in 0.05s =======\n"
+        )
+        assert self.outcomes(files, output) == {
+            "test_a.py": True,
+            "test_b.py": False,
+        }
+
+    def test_wrapped_progress_line(self, files) -> None:
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py ..........................  [ 50%]\n"
+            "..........F...............            [ 90%]\n"
+            "test_b.py ..                          [100%]\n"
+            "=== 1 failed, 41 passed in 0.30s ===\n"
+        )
+        assert self.outcomes(files, output) == {
+            "test_a.py": False,
+            "test_b.py": True,
+        }
+
+    def test_verbose_lines(self, files) -> None:
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py::test_x PASSED              [ 33%]\n"
+            "test_a.py::test_y PASSED              [ 66%]\n"
+            "test_b.py::test_z ERROR               [100%]\n"
+            "=== 2 passed, 1 error in 0.10s ===\n"
+        )
+        assert self.outcomes(files, output) == {
+            "test_a.py": True,
+            "test_b.py": False,
+        }
+
+    def test_collection_error_summary(self, files) -> None:
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py .                           [100%]\n"
+            "=== short test summary info ===\n"
+            "ERROR test_c.py - ImportError: nope\n"
+            "=== 1 passed, 1 error in 0.10s ===\n"
+        )
+        assert self.outcomes(files, output) == {
+            "test_a.py": True,
+            "test_c.py": False,
+        }
+
+    def test_partial_output_drops_running_file(self, files) -> None:
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py ...                         [ 30%]\n"
+            "test_b.py .."
+        )
+        assert self.outcomes(files, output) == {"test_a.py": True}
+
+    def test_sessions_parsed_separately(self, files) -> None:
+        # Two shards: the first finished, the second was cut short
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py .                           [100%]\n"
+            "=== 1 passed in 0.01s ===\n"
+            "=== test session starts ===\n"
+            "test_b.py ..                          [ 50%]\n"
+            "test_c.py ."
+        )
+        assert self.outcomes(files, output) == {
+            "test_a.py": True,
+            "test_b.py": True,
+        }
+
+    def test_warnings_summary_ignored(self, files) -> None:
+        output = (
+            "=== test session starts ===\n"
+            "test_a.py .                           [100%]\n"
+            "=== warnings summary ===\n"
+            "test_c.py::test_w\n"
+            "  UserWarning: careful\n"
+            "=== 1 passed, 1 warning in 0.01s ===\n"
+        )
+        assert self.outcomes(files, output) == {"test_a.py": True}
+
+
+# ---------------------------------------------------------------------------
+# 3. Cached runs
+# ---------------------------------------------------------------------------
+
+
+class TestCachedRun:
+    def test_first_run_executes_everything(self, project) -> None:
+        cached_run, returncode = run(project)
+        assert returncode == 0
+        assert cached_run.cached == []
+        assert "-q" not in cached_run.cmd
+
+    def test_unchanged_files_ignored(self, project) -> None:
+        run(project)
+        cached_run, returncode = run(project)
+        assert names(cached_run.cached) == ["test_app.py", "test_util.py"]
+        assert f"--ignore={project / 'test_app.py'}" in cached_run.cmd
+        # Nothing left for pytest to collect still counts as a pass
+        assert returncode == pytest_results.NO_TESTS_COLLECTED
+        assert cached_run.passed(returncode)
+        assert cached_run.note() == "2 unchanged test files cached"
+
+    def test_edited_import_reruns_its_tests(self, project) -> None:
+        run(project)
+        (project / "util.py").write_text("def double(x):\n    return x + x\n")
+        cached_run, returncode = run(project)
+        assert names(cached_run.cached) == ["test_app.py"]
+        assert returncode == 0
+
+    def test_conftest_edit_reruns_everything(self, project) -> None:
+        run(project)
+        (project / "conftest.py").write_text("# changed\n")
+        cached_run, _ = run(project)
+        assert cached_run.cached == []
+
+    def test_config_edit_reruns_everything(self, project) -> None:
+        run(project)
+        (project / "pytest.ini").write_text("[pytest]\naddopts = -rfE\n")
+        cached_run, _ = run(project)
+        assert cached_run.cached == []
+
+    def test_failing_file_not_cached(self, project) -> None:
+        (project / "test_app.py").write_text(
+            "from app import VALUE\n\ndef test_value():\n    assert VALUE == 2\n"
+        )
+        _, returncode = run(project)
+        assert returncode == 1
+        cached_run, returncode = run(project)
+        assert names(cached_run.cached) == ["test_util.py"]
+        assert not cached_run.passed(returncode)
+
+    def test_explicit_tests_all_cached(self, project) -> None:
+        run(project)
+        cached_run, _ = run(project, [str(project / "test_app.py")])
+        assert cached_run.cmd is None
+        assert cached_run.note() == "1 unchanged test file cached"
+
+    def test_explicit_tests_only_stale_run(self, project) -> None:
+        run(project)
+        (project / "app.py").write_text("VALUE = 1  # edited\n")
+        tests = [str(project / "test_app.py"), str(project / "test_util.py")]
+        cached_run, returncode = run(project, tests)
+        assert cached_run.cmd[-1] == str(project / "test_app.py")
+        assert str(project / "test_util.py") not in cached_run.cmd
+        assert returncode == 0
+
+    def test_partial_run_records_finished_files(self, project) -> None:
+        cached_run = pytest_results.plan(PYTEST_CMD, str(project))
+        cached_run.record(
+            b"=== test session starts ===\n"
+            b"test_app.py .                     [ 50%]\n"
+            b"test_util.py ",
+            None,
+        )
+        assert names(pytest_results.plan(PYTEST_CMD, str(project)).cached) == [
+            "test_app.py"
+        ]
+
+    def test_aborted_run_not_recorded(self, project) -> None:
+        cached_run = pytest_results.plan(PYTEST_CMD, str(project))
+        cached_run.record("=== x ===\ntest_app.py .   [100%]\n", 2)
+        assert pytest_results.plan(PYTEST_CMD, str(project)).cached == []
+
+    def test_expired_pass_reruns(self, project, monkeypatch) -> None:
+        run(project)
+        monkeypatch.setattr(pytest_results, "MAX_AGE", 0)
+        assert pytest_results.plan(PYTEST_CMD, str(project)).cached == []
+
+    def test_too_large_project(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(import_graph, "MAX_FILES", 2)
+        assert pytest_results.plan(PYTEST_CMD, str(project)) is None
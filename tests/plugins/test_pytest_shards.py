@@ -0,0 +1,159 @@
+"""Tests for sharded parallel pytest runs.
+
+Verifies that the vendored copies stay identical, that test files are
+balanced across shards, that explicit and whole-suite runs are split
+correctly, and that a planned whole-suite run executes every test file
+once across its shards.
+"""
+
+import sys
+
+import pytest
+
+from tests.conftest import (
+    PLUGINS_ROOT,
+    import_graph,
+    pytest_results,
+    pytest_shards,
+    result_stream,
+)
+
+VENDORED_PLUGINS = ["auto-code-quality", "agent-system"]
+
+PYTEST_CMD = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(import_graph, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(pytest_results, "STORE_DIR", str(cache_dir))
+    monkeypatch.setattr(pytest_shards, "cpu_count", lambda: 4)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Four test files of different sizes; test_slow.py sleeps."""
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "pytest.ini").write_text("[pytest]\n")
+    for name, body in {
+        "test_a.py": "def test_a():\n    pass\n",
+        "test_b.py": "def test_b():\n    pass\n" + "# pad\n" * 50,
+        "test_c.py": "def test_c():\n    pass\n",
+        "test_slow.py": "import time\n\ndef test_slow():\n    time.sleep(0.5)\n",
+    }.items():
+        (root / name).write_text(body)
+    return root
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+def test_copies_identical() -> None:
+    sources = {
+        plugin: (PLUGINS_ROOT / plugin / "scripts" / "pytest_shards.py").read_text()
+        for plugin in VENDORED_PLUGINS
+    }
+    reference = sources[VENDORED_PLUGINS[0]]
+    for plugin, source in sources.items():
+        assert source == reference, f"{plugin}/scripts/pytest_shards.py has drifted"
+
+
+# ---------------------------------------------------------------------------
+# 2. Planning
+# ---------------------------------------------------------------------------
+
+
+class TestPlan:
+    def test_balanced_by_size(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(pytest_shards, "cpu_count", lambda: 2)
+        files = [str(project / n) for n in ("test_a.py", "test_b.py", "test_c.py")]
+        shards = pytest_shards.plan(["pytest"], files, str(project))
+        # The large file gets a shard of its own
+        assert sorted(len(s) for s in shards) == [2, 3]
+        assert ["pytest", str(project / "test_b.py")] in shards
+
+    def test_explicit_files_split(self, project) -> None:
+        files = [str(p) for p in sorted(project.glob("test_*.py"))]
+        shards = pytest_shards.plan(["pytest", "-x"], files, str(project))
+        assert len(shards) == 4
+        assert sorted(s[-1] for s in shards) == files
+        assert all(s[:2] == ["pytest", "-x"] for s in shards)
+
+    def test_whole_suite_file_lists(self, project) -> None:
+        graph = import_graph.load(str(project))
+        skipped = f"--ignore={project / 'test_c.py'}"
+        shards = pytest_shards.plan(["pytest", skipped], None, str(project), graph)
+        assert len(shards) == 3
+        assert all(shard[:2] == ["pytest", skipped] for shard in shards)
+        explicit = [s for s in shards if not s[-1].startswith("--ignore=")]
+        catch_all = [s for s in shards if s[-1].startswith("--ignore=")]
+        # Two shards list their own file; the lightest ignores just those
+        assert len(explicit) == 2 and len(catch_all) == 1
+        assert sorted(f"--ignore={s[-1]}" for s in explicit) == catch_all[0][2:]
+        assert str(project / "test_b.py") in [s[-1] for s in explicit]
+
+    def test_whole_suite_argv_bounded(self, project) -> None:
+        for i in range(40):
+            (project / f"test_more_{i}.py").write_text("def test_x():\n    pass\n")
+        graph = import_graph.load(str(project))
+        shards = pytest_shards.plan(["pytest"], None, str(project), graph)
+        # At most twice per file (own shard + catch-all ignore), not once
+        # per other shard
+        assert sum(len(s) - 1 for s in shards) < 2 * 44
+
+    def test_single_cpu_not_sharded(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(pytest_shards, "cpu_count", lambda: 1)
+        files = [str(p) for p in project.glob("test_*.py")]
+        assert pytest_shards.plan(["pytest"], files, str(project)) is None
+
+    def test_single_file_not_sharded(self, project) -> None:
+        files = [str(project / "test_a.py")]
+        assert pytest_shards.plan(["pytest"], files, str(project)) is None
+
+    def test_whole_suite_needs_graph(self, project) -> None:
+        assert pytest_shards.plan(["pytest"], None, str(project)) is None
+
+    def test_workers_capped(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(pytest_shards, "MAX_WORKERS", 2)
+        files = [str(p) for p in project.glob("test_*.py")]
+        assert len(pytest_shards.plan(["pytest"], files, str(project))) == 2
+
+
+# ---------------------------------------------------------------------------
+# 3. Running
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    def test_real_suite_runs_in_parallel(self, project) -> None:
+        graph = import_graph.load(str(project))
+        shards = pytest_shards.plan(PYTEST_CMD, None, str(project), graph)
+        result = result_stream.run_shards_completed(
+            shards, PYTEST_CMD, str(project), timeout=60
+        )
+        assert result.returncode == 0
+        assert result.args == PYTEST_CMD
+        assert result.stdout.count("test session starts") == 4
+        outcomes = pytest_results.parse_outcomes(result.stdout, str(project))
+        assert len(outcomes) == 4
+        assert all(outcomes.values())
+
+    def test_unplanned_file_runs_once(self, project) -> None:
+        graph = import_graph.load(str(project))
+        (project / "test_new.py").write_text("def test_new():\n    pass\n")
+        shards = pytest_shards.plan(PYTEST_CMD, None, str(project), graph)
+        result = result_stream.run_shards_completed(
+            shards, PYTEST_CMD, str(project), timeout=60
+        )
+        assert result.returncode == 0
+        assert result.stdout.count("test_new.py") == 1
@@ -0,0 +1,327 @@
+"""Tests for the streaming test runs and the shared sharded pytest runner.
+
+Verifies that the vendored copies stay identical, that passed/failed
+counts and failed test names are read from each framework's output, that
+a run stops shortly after its first failure, that a run cut off at the
+deadline still reports what it saw, and that shard runs merge into one
+result, as a CompletedProcess for callers that want one.
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, result_stream
+
+VENDORED_PLUGINS = ["auto-code-quality", "agent-system"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def tally(framework: str, output: str) -> "result_stream.Tally":
+    result = result_stream.Tally(framework)
+    for line in output.splitlines():
+        result.feed(line)
+    return result
+
+
+def script(*lines: str) -> list[str]:
+    """A command that prints each line (flushed), sleeping on "SLEEP n"."""
+    body = ["import sys, time"]
+    for line in lines:
+        if line.startswith("SLEEP "):
+            body.append(f"time.sleep({line.split()[1]})")
+        else:
+            body.append(f"print({line!r}, flush=True)")
+    return [sys.executable, "-c", "\n".join(body)]
+
+
+def exits(code: int, text: str = "", delay: float = 0.0) -> list[str]:
+    """A command that sleeps, prints text and exits with code."""
+    return [
+        sys.executable,
+        "-c",
+        f"import sys, time; time.sleep({delay}); print({text!r}); sys.exit({code})",
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 1. Vendored copies
+# ---------------------------------------------------------------------------
+
+
+def test_copies_identical() -> None:
+    sources = {
+        plugin: (PLUGINS_ROOT / plugin / "scripts" / "result_stream.py").read_text()
+        for plugin in VENDORED_PLUGINS
+    }
+    reference = sources[VENDORED_PLUGINS[0]]
+    for plugin, source in sources.items():
+        assert source == reference, f"{plugin}/scripts/result_stream.py has drifted"
+
+
+# ---------------------------------------------------------------------------
+# 2. Parsing
+# ---------------------------------------------------------------------------
+
+
+class TestPytest:
+    def test_progress_lines(self) -> None:
+        result = tally(
+            "pytest",
+            "============ test session starts ============\n"
+            "tests/test_a.py ..s.                  [ 50%]\n"
+            "tests/test_b.py .F                    [100%]\n",
+        )
+        assert (result.passed, result.failures) == (4, 1)
+        assert result.summary() == "4 passed, 1 failed: tests/test_b.py"
+
+    def test_summary_names_failures(self) -> None:
+        result = tally(
+            "pytest",
+            "tests/test_b.py .F                    [100%]\n"
+            "================= FAILURES ==================\n"
+            "tests/test_b.py:3: in helper\n"
+            "=========== short test summary info =========\n"
+            "FAILED tests/test_b.py::test_x - assert 0\n"
+            "========= 1 failed, 1 passed in 0.05s =======\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: tests/test_b.py::test_x"
+
+    def test_quiet_totals(self) -> None:
+        result = tally("pytest", "...\n3 passed, 1 warning in 0.01s\n")
+        assert (result.passed, result.failures) == (3, 0)
+
+    def test_verbose_lines(self) -> None:
+        result = tally(
+            "pytest",
+            "tests/test_a.py::test_x PASSED        [ 50%]\n"
+            "tests/test_a.py::test_y FAILED        [100%]\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: tests/test_a.py::test_y"
+
+    def test_collection_error(self) -> None:
+        result = tally(
+            "pytest",
+            "ERROR tests/test_c.py - ImportError\n"
+            "!!! Interrupted: 1 error during collection !!!\n"
+            "=========== 1 error in 0.10s ===========\n",
+        )
+        assert result.summary() == "0 passed, 1 failed: tests/test_c.py"
+
+
+class TestJavaScript:
+    def test_jest(self) -> None:
+        result = tally(
+            "jest",
+            "PASS src/a.test.js\n"
+            "  ✓ adds (3 ms)\n"
+            "  ✕ subtracts (2 ms)\n"
+            "Tests:       1 failed, 1 passed, 2 total\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: subtracts"
+
+    def test_vitest(self) -> None:
+        result = tally(
+            "vitest",
+            " ✓ src/a.test.ts > math > adds 1ms\n"
+            " × src/a.test.ts > math > divides 3ms\n"
+            " ✓ src/b.test.ts (2 tests) 4ms\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: src/a.test.ts > math > divides"
+
+    def test_mocha(self) -> None:
+        result = tally(
+            "mocha",
+            "  math\n"
+            "    ✔ adds\n"
+            "    1) divides\n"
+            "\n"
+            "  1 passing (5ms)\n"
+            "  1 failing\n"
+            "\n"
+            "  1) math\n"
+            "       divides:\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: divides"
+
+
+class TestCompiled:
+    def test_go(self) -> None:
+        result = tally(
+            "go",
+            "=== RUN   TestAdd\n"
+            "--- PASS: TestAdd (0.00s)\n"
+            "=== RUN   TestDiv\n"
+            "--- FAIL: TestDiv (0.00s)\n"
+            "FAIL\texample.com/m/b [build failed]\n",
+        )
+        assert result.summary() == "1 passed, 2 failed: TestDiv, example.com/m/b"
+
+    def test_cargo(self) -> None:
+        result = tally(
+            "cargo",
+            "test tests::adds ... ok\ntest tests::divides ... FAILED\n",
+        )
+        assert result.summary() == "1 passed, 1 failed: tests::divides"
+
+    def test_nothing_recognised(self) -> None:
+        assert tally("cargo", "error[E0425]: cannot find value\n").summary() == ""
+
+    def test_names_capped(self) -> None:
+        output = "".join(f"test t{i} ... FAILED\n" for i in range(7))
+        assert tally("cargo", output).summary().endswith("t4 (+2 more)")
+
+
+# ---------------------------------------------------------------------------
+# 3. Streaming runs
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    def test_completed_run(self, tmp_path) -> None:
+        cmd = script("test a ... ok", "test b ... ok")
+        result = result_stream.run(cmd, str(tmp_path), "cargo", timeout=10)
+        assert result.returncode == 0
+        assert not result.timed_out
+        assert result.tally.summary() == "2 passed, 0 failed"
+        assert "test b ... ok" in result.output
+
+    def test_deadline_keeps_partial_results(self, tmp_path) -> None:
+        cmd = script("test a ... ok", "test b ... ok", "SLEEP 30")
+        start = time.monotonic()
+        result = result_stream.run(cmd, str(tmp_path), "cargo", timeout=1)
+        assert time.monotonic() - start < 10
+        assert result.returncode is None
+        assert result.timed_out
+        assert result.tally.summary() == "2 passed, 0 failed"
+
+    def test_stops_after_first_failure(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(result_stream, "FAILURE_GRACE", 0.3)
+        cmd = script("test a ... ok", "test b ... FAILED", "SLEEP 30", "test c ... ok")
+        start = time.monotonic()
+        result = result_stream.run(cmd, str(tmp_path), "cargo", timeout=20)
+        assert time.monotonic() - start < 10
+        assert result.returncode is None
+        assert not result.timed_out
+        assert result.tally.summary() == "1 passed, 1 failed: b"
+
+    def test_unfinished_line_counted(self, tmp_path) -> None:
+        cmd = [
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "sys.stdout.write('test_a.py ..'); sys.stdout.flush()\n"
+            "time.sleep(30)",
+        ]
+        result = result_stream.run(cmd, str(tmp_path), "pytest", timeout=1)
+        assert result.timed_out
+        assert result.tally.passed == 2
+
+    def test_stderr_included(self, tmp_path) -> None:
+        cmd = [sys.executable, "-c", "import sys; sys.stderr.write('✓ adds\\n')"]
+        result = result_stream.run(cmd, str(tmp_path), "jest", timeout=10)
+        assert result.tally.passed == 1
+
+    def test_missing_command(self, tmp_path) -> None:
+        with pytest.raises(FileNotFoundError):
+            result_stream.run(["no-such-runner-x"], str(tmp_path), "jest", timeout=1)
+
+
+# ---------------------------------------------------------------------------
+# 4. Sharded runs
+# ---------------------------------------------------------------------------
+
+
+class TestRunShards:
+    def test_results_merged(self, tmp_path) -> None:
+        shards = [script("test a ... ok"), script("test b ... ok", "test c ... ok")]
+        result = result_stream.run_shards(shards, str(tmp_path), "cargo", timeout=10)
+        assert result.returncode == 0
+        assert result.tally.summary() == "3 passed, 0 failed"
+
+    def test_failure_stops_other_shards(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(result_stream, "FAILURE_GRACE", 0.3)
+        shards = [
+            script("test a ... ok", "SLEEP 30"),
+            script("test b ... FAILED", "SLEEP 30"),
+        ]
+        start = time.monotonic()
+        result = result_stream.run_shards(shards, str(tmp_path), "cargo", timeout=20)
+        assert time.monotonic() - start < 10
+        assert not result.timed_out
+        assert result.tally.summary() == "1 passed, 1 failed: b"
+        # Failing shard's output comes last
+        assert result.output.rstrip().endswith("test b ... FAILED")
+
+    def test_deadline_across_shards(self, tmp_path) -> None:
+        shards = [script("test a ... ok"), script("test b ... ok", "SLEEP 30")]
+        result = result_stream.run_shards(shards, str(tmp_path), "cargo", timeout=1)
+        assert result.returncode is None
+        assert result.timed_out
+        assert result.tally.passed == 2
+
+    def test_empty_shard_ignored(self, tmp_path) -> None:
+        shards = [
+            [sys.executable, "-c", "import sys; sys.exit(5)"],
+            script("test_a.py .  [100%]"),
+        ]
+        result = result_stream.run_shards(shards, str(tmp_path), "pytest", timeout=10)
+        assert result.returncode == 0
+
+    def test_failing_shard_last(self, tmp_path) -> None:
+        shards = [exits(1, "bad"), exits(0, "good")]
+        result = result_stream.run_shards(shards, str(tmp_path), "pytest", timeout=10)
+        assert result.returncode == 1
+        assert result.output.splitlines() == ["good", "bad"]
+
+    def test_all_empty(self, tmp_path) -> None:
+        shards = [exits(5), exits(5)]
+        result = result_stream.run_shards(shards, str(tmp_path), "pytest", timeout=10)
+        assert result.returncode == result_stream.NO_TESTS_COLLECTED
+
+    def test_missing_command(self, tmp_path) -> None:
+        shards = [exits(0), ["no-such-test-runner"]]
+        with pytest.raises(FileNotFoundError):
+            result_stream.run_shards(shards, str(tmp_path), "pytest", timeout=5)
+
+
+# ---------------------------------------------------------------------------
+# 5. Sharded runs to completion
+# ---------------------------------------------------------------------------
+
+
+class TestRunShardsCompleted:
+    def test_completed_process(self, tmp_path) -> None:
+        shards = [exits(1, "bad"), exits(0, "good")]
+        result = result_stream.run_shards_completed(
+            shards, ["pytest"], str(tmp_path), timeout=10
+        )
+        assert result.args == ["pytest"]
+        assert result.returncode == 1
+        assert result.stdout.splitlines() == ["good", "bad"]
+
+    def test_failure_does_not_stop_other_shards(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(result_stream, "FAILURE_GRACE", 0.1)
+        shards = [
+            script("FAILED tests/test_a.py::test_x"),
+            script("SLEEP 1", "tests/test_b.py .  [100%]"),
+        ]
+        result = result_stream.run_shards_completed(
+            shards, ["pytest"], str(tmp_path), timeout=20
+        )
+        assert result.returncode == 0
+        assert "tests/test_b.py ." in result.stdout
+
+    def test_timeout_keeps_finished_output(self, tmp_path) -> None:
+        shards = [exits(0, "done"), exits(0, "late", delay=30)]
+        with pytest.raises(subprocess.TimeoutExpired) as exc:
+            result_stream.run_shards_completed(
+                shards, ["pytest"], str(tmp_path), timeout=1
+            )
+        assert "done" in exc.value.stdout
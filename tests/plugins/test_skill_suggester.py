@@ -0,0 +1,406 @@
+"""Tests for the skill-engine skill suggester, its manifest and its index.
+
+Verifies that the single-scan vocabulary matcher finds overlapping and
+nested entries, applies whole-word rules to terms only, and ranks exactly
+as scoring every skill's phrases, terms, negatives and guards one by one
+did, over a corpus of prompts built from the skills' own vocabulary; that
+long prompts are scanned in bounded slices; that skills are read from the
+`suggest:` block of SKILL.md frontmatter; and that the stored index is
+reused until a skill file changes.
+"""
+
+import functools
+import io
+import json
+import random
+import re
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import PLUGINS_ROOT, skill_index, skill_manifest, skill_suggester
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_index, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(skill_manifest, "USER_SKILLS_DIR", str(tmp_path / "user"))
+    monkeypatch.setattr(skill_suggester, "_INDEX", None)
+    monkeypatch.setattr(skill_index, "_loaded", None)
+
+
+@pytest.fixture
+def plugins_dir(tmp_path, monkeypatch):
+    plugins = tmp_path / "plugins"
+    monkeypatch.setattr(skill_manifest, "PLUGINS_DIR", str(plugins))
+    return plugins
+
+
+@functools.cache
+def shipped_skills() -> dict[str, dict]:
+    paths = sorted(str(p) for p in PLUGINS_ROOT.glob("*/skills/*/SKILL.md"))
+    return skill_manifest.read_skills(paths)
+
+
+def write_skill(root, name: str, suggest: str, header: str = "") -> str:
+    path = root / name / "SKILL.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\n{header}description: test\n{suggest}---\n\n# {name}\n")
+    return str(path)
+
+
+def run_main(prompt: str) -> str:
+    stdout = io.StringIO()
+    payload = json.dumps({"prompt": prompt})
+    with patch("sys.stdin", io.StringIO(payload)), patch("sys.stdout", stdout):
+        skill_suggester.main()
+    return stdout.getvalue()
+
+
+FASTAPI_BLOCK = """suggest:
+  priority: 7
+  phrases:
+    "build a fastapi app": 1.0
+    "fastapi": 0.9
+  terms: ["uvicorn"]
+  negative: ["pydantic-ai"]
+  context_guards: [
+    "api",
+    "endpoint"
+  ]
+"""
+
+
+def reference_match(prompt: str) -> list[str]:
+    """Per-skill substring and regex scoring, as before the shared scan."""
+    lowered = prompt.lower()
+    scored = []
+    for skill, cfg in shipped_skills().items():
+        if any(neg in lowered for neg in cfg.get("negative", [])):
+            continue
+        best = max(
+            (weight for phrase, weight in cfg["phrases"] if phrase in lowered),
+            default=0.0,
+        )
+        term = any(
+            re.search(r"\b" + re.escape(t) + r"\b", prompt, re.IGNORECASE)
+            for t in cfg["terms"]
+        )
+        base = max(best, skill_suggester.TERM_WEIGHT if term else 0.0)
+        if base < skill_suggester.CONTEXT_GUARD_THRESHOLD:
+            guards = cfg.get("context_guards")
+            if guards and not any(g in lowered for g in guards):
+                continue
+        if base > 0.0:
+            scored.append((skill, base, cfg.get("priority", 0)))
+    scored.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    return [name for name, _, _ in scored[: skill_suggester.MAX_SKILLS]]
+
+
+def vocabulary() -> list[str]:
+    words = []
+    for cfg in shipped_skills().values():
+        words += [phrase for phrase, _ in cfg["phrases"]]
+        words += cfg["terms"]
+        words += cfg.get("negative", [])
+        words += cfg.get("context_guards", [])
+    return words
+
+
+def random_prompts(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    words = vocabulary()
+    filler = ["the", "please", "x", "_", "-", "and", "Fix", "\n", "::", "2"]
+    prompts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            word = rng.choice(words) if rng.random() < 0.6 else rng.choice(filler)
+            if rng.random() < 0.2:
+                word = word.upper()
+            parts.append(word)
+        joiner = rng.choice([" ", "", "_", "-", ". "])
+        prompts.append(joiner.join(parts))
+    return prompts
+
+
+# ---------------------------------------------------------------------------
+# 1. Scan
+# ---------------------------------------------------------------------------
+
+
+class TestScan:
+    def test_nested_and_overlapping_entries(self) -> None:
+        hits = skill_suggester._find_hits("use the claude agent sdk with fastapi")
+        assert hits["claude-agent-sdk"]["phrase"] == 1.0
+        assert hits["fastapi"]["phrase"] == 0.9
+
+    def test_term_needs_word_boundaries(self) -> None:
+        assert skill_suggester._find_hits("run uvicorn now")["fastapi"]["term"]
+        found = skill_suggester._find_hits("myuvicorns").get("fastapi")
+        assert found is None or not found["term"]
+
+    def test_phrase_matches_inside_words(self) -> None:
+        found = skill_suggester._find_hits("myfastapiapp")["fastapi"]
+        assert found["phrase"] == 0.9
+
+    def test_negative_disqualifies(self) -> None:
+        assert "fastapi" not in skill_suggester.match_skills(
+            "fastapi with pydantic-ai agents"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 2. Ranking
+# ---------------------------------------------------------------------------
+
+
+class TestRanking:
+    @pytest.mark.parametrize(
+        "prompt",
+        [
+            "build a fastapi app with a sqlite database",
+            "Set up a git worktree for parallel branches",
+            "define pydantic models",
+            "EnterWorktree please",
+            "nothing relevant here",
+            "",
+        ],
+    )
+    def test_examples_match_reference(self, prompt) -> None:
+        assert skill_suggester.match_skills(prompt) == reference_match(prompt)
+
+    def test_ties_go_to_load_order(self, plugins_dir, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(skill_suggester, "MAX_SKILLS", 4)
+        block = 'suggest:\n  priority: 5\n  terms: ["zig"]\n'
+        write_skill(tmp_path / "user", "aaa", block)
+        write_skill(plugins_dir / "b-plugin" / "skills", "alpha", block)
+        write_skill(plugins_dir / "a-plugin" / "skills", "zeta", block)
+        write_skill(plugins_dir / "a-plugin" / "skills", "beta", block)
+        assert skill_suggester.match_skills("zig") == ["beta", "zeta", "alpha", "aaa"]
+
+    def test_generated_prompts_match_reference(self) -> None:
+        for prompt in random_prompts(2000, seed=7):
+            assert skill_suggester.match_skills(prompt) == reference_match(
+                prompt
+            ), prompt
+
+    def test_long_prompt(self) -> None:
+        line = 'ERROR File "/app/main.py", line 12, in handler: ValueError\n'
+        prompt = "why does my fastapi endpoint fail?\n" + line * 5000
+        assert skill_suggester.match_skills(prompt) == reference_match(prompt)
+
+
+# ---------------------------------------------------------------------------
+# 3. Long prompts
+# ---------------------------------------------------------------------------
+
+
+LOG_LINE = 'ERROR File "/app/main.py", line 12, in handler: ValueError\n'
+
+
+class TestLongPrompt:
+    def test_short_prompt_scanned_whole(self) -> None:
+        assert skill_suggester._scan_spans(100) == [(0, 100)]
+
+    def test_spans_bounded(self) -> None:
+        spans = skill_suggester._scan_spans(2_000_000)
+        assert spans[0] == (0, skill_suggester.SCAN_HEAD)
+        assert spans[-1] == (2_000_000 - skill_suggester.SCAN_TAIL, 2_000_000)
+        assert len(spans) == skill_suggester.SCAN_SAMPLES + 2
+        assert all(a[1] < b[0] for a, b in zip(spans, spans[1:]))
+
+    def test_tail_scanned(self) -> None:
+        prompt = LOG_LINE * 40_000 + "why does uvicorn crash in this fastapi app?"
+        assert skill_suggester.match_skills(prompt) == ["fastapi"]
+
+    def test_unsampled_middle_ignored(self) -> None:
+        head = LOG_LINE * 1_000
+        prompt = head + "sveltekit" + LOG_LINE * 40_000
+        assert "svelte5" not in skill_suggester.match_skills(prompt)
+
+    def test_term_cut_at_slice_edge(self, monkeypatch) -> None:
+        monkeypatch.setattr(skill_suggester, "SCAN_HEAD", 10)
+        prompt = "x" * 3 + "uvicornd" + LOG_LINE * 2_000
+        found = skill_suggester._find_hits(prompt).get("fastapi")
+        assert found is None or not found["term"]
+
+    def test_stops_after_confident_matches(self) -> None:
+        head = "fastapi, sqlite and a git worktree. " + LOG_LINE * 1_000
+        prompt = head + LOG_LINE * 40_000 + "sveltekit"
+        hits = skill_suggester._find_hits(prompt)
+        assert {"fastapi", "sqlite", "worktree"} <= set(hits)
+        assert "svelte5" not in hits
+
+    def test_memory_independent_of_size(self) -> None:
+        skill_suggester.match_skills(LOG_LINE)
+        peaks = []
+        for lines in (40_000, 160_000):
+            prompt = LOG_LINE * lines
+            tracemalloc.start()
+            skill_suggester.match_skills(prompt)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] < 2 * peaks[0] < len(prompt) / 4
+
+
+# ---------------------------------------------------------------------------
+# 4. Stored index
+# ---------------------------------------------------------------------------
+
+
+class TestIndex:
+    def test_reused_without_reading_skills(self, monkeypatch) -> None:
+        first = skill_index.load()
+        monkeypatch.setattr(skill_manifest, "read_skills", None)
+        assert skill_index.load().skills == first.skills
+        assert first.skills[0][0] == next(iter(shipped_skills()))
+
+    def test_skill_file_change_rebuilds(self, plugins_dir) -> None:
+        path = write_skill(plugins_dir / "p" / "skills", "fastapi", FASTAPI_BLOCK)
+        assert "fastapi" in skill_index.load().vocabulary
+        with open(path, "w") as f:
+            f.write(f"---\n{FASTAPI_BLOCK.replace('fastapi', 'flask')}---\n")
+        vocabulary = skill_index.load().vocabulary
+        assert "flask" in vocabulary
+        assert "fastapi" not in vocabulary
+
+    def test_new_skill_picked_up(self, plugins_dir) -> None:
+        skills = plugins_dir / "p" / "skills"
+        write_skill(skills, "fastapi", FASTAPI_BLOCK)
+        skill_index.load()
+        write_skill(skills, "other", 'suggest:\n  terms: ["zig"]\n')
+        assert [s[0] for s in skill_index.load().skills] == ["fastapi", "other"]
+
+    def test_corrupt_index_rebuilt(self) -> None:
+        with open(skill_index.index_path(), "w") as f:
+            f.write("{not json")
+        assert skill_index.load().vocabulary
+
+    def test_regex_covers_words_present(self, plugins_dir) -> None:
+        write_skill(plugins_dir / "p" / "skills", "fastapi", FASTAPI_BLOCK)
+        index = skill_index.load()
+        assert index.regex_for("nothing to see") is None
+        regex = index.regex_for("a fastapi endpoint")
+        assert regex.findall("a fastapi endpoint") == ["fastapi", "api", "endpoint"]
+        assert "uvicorn" not in regex.pattern
+
+    def test_kept_in_process_until_changed(self, plugins_dir, monkeypatch) -> None:
+        path = write_skill(plugins_dir / "p" / "skills", "fastapi", FASTAPI_BLOCK)
+        first = skill_index.load()
+        with monkeypatch.context() as m:
+            m.setattr(skill_index, "_read", None)
+            assert skill_index.load() is first
+        with open(path, "a") as f:
+            f.write("\n")
+        assert skill_index.load() is not first
+
+    def test_checked_again_on_each_prompt(self, plugins_dir) -> None:
+        skills = plugins_dir / "p" / "skills"
+        write_skill(skills, "fastapi", FASTAPI_BLOCK)
+        run_main("build a fastapi app")
+        write_skill(skills, "zig", 'suggest:\n  terms: ["zig"]\n')
+        assert "zig" in run_main("a zig build")
+
+    def test_not_loaded_for_empty_prompt(self, monkeypatch) -> None:
+        monkeypatch.setattr(skill_index, "load", None)
+        stdout = io.StringIO()
+        with patch("sys.stdin", io.StringIO('{"prompt": ""}')), patch(
+            "sys.stdout", stdout
+        ):
+            skill_suggester.main()
+        assert stdout.getvalue() == ""
+
+
+# ---------------------------------------------------------------------------
+# 5. Manifest
+# ---------------------------------------------------------------------------
+
+
+class TestManifest:
+    def test_suggest_block(self) -> None:
+        cfg = skill_manifest.parse_suggest(f"name: fastapi\n{FASTAPI_BLOCK}")
+        assert cfg == {
+            "phrases": [("build a fastapi app", 1.0), ("fastapi", 0.9)],
+            "terms": ["uvicorn"],
+            "priority": 7,
+            "negative": ["pydantic-ai"],
+            "context_guards": ["api", "endpoint"],
+        }
+
+    def test_block_ends_at_next_key(self) -> None:
+        frontmatter = 'suggest:\n  terms: ["zig"]\nversion: 1.0\n'
+        assert skill_manifest.parse_suggest(frontmatter)["terms"] == ["zig"]
+
+    def test_without_block(self) -> None:
+        assert skill_manifest.parse_suggest("name: x\ndescription: y\n") is None
+
+    @pytest.mark.parametrize(
+        "block",
+        [
+            "suggest:\n  terms: [zig]\n",
+            "suggest:\n  terms: [\"zig\"\n",
+            "suggest:\n  phrases:\n    zig: 1.0\n",
+            'suggest:\n  phrases:\n    "zig": high\n',
+            'suggest:\n  priority: "7"\n',
+            "suggest:\n  - zig\n",
+        ],
+    )
+    def test_malformed_block_rejected(self, block) -> None:
+        with pytest.raises(ValueError):
+            skill_manifest.parse_suggest(block)
+
+    def test_read_skills(self, plugins_dir, tmp_path) -> None:
+        write_skill(plugins_dir / "a" / "skills", "fastapi", FASTAPI_BLOCK)
+        write_skill(plugins_dir / "a" / "skills", "broken", "suggest:\n  terms: [x]\n")
+        write_skill(plugins_dir / "a" / "skills", "manual", "")
+        write_skill(
+            plugins_dir / "b" / "skills",
+            "dup",
+            'suggest:\n  terms: ["dup"]\n',
+            header="name: fastapi\n",
+        )
+        write_skill(tmp_path / "user", "mine", 'suggest:\n  terms: ["mine"]\n')
+        skills = skill_manifest.read_skills(skill_manifest.skill_files())
+        assert list(skills) == ["fastapi", "mine"]
+        assert skills["fastapi"]["terms"] == ["uvicorn"]
+
+    def test_shipped_blocks_parse(self) -> None:
+        defined = [
+            path
+            for path in skill_manifest.skill_files()
+            if "\nsuggest:\n" in open(path).read()
+        ]
+        assert len(shipped_skills()) == len(defined) >= 30
+
+    def test_shipped_blocks_read_as_yaml(self) -> None:
+        yaml = pytest.importorskip("yaml")
+        skills = shipped_skills()
+        for path in PLUGINS_ROOT.glob("*/skills/*/SKILL.md"):
+            text = path.read_text()
+            frontmatter = yaml.safe_load(skill_manifest._frontmatter(text))
+            if "suggest" not in frontmatter:
+                continue
+            block = frontmatter["suggest"]
+            cfg = skills[frontmatter.get("name", path.parent.name)]
+            assert list(block["phrases"].items()) == cfg["phrases"]
+            assert block["terms"] == cfg["terms"]
+            assert block.get("negative") == cfg.get("negative")
+            assert block.get("context_guards") == cfg.get("context_guards")
+
+
+# ---------------------------------------------------------------------------
+# 6. Hook output
+# ---------------------------------------------------------------------------
+
+
+def test_main_output() -> None:
+    output = json.loads(run_main("build a fastapi app"))
+    context = output["hookSpecificOutput"]["additionalContext"]
+    assert '"fastapi"' in context
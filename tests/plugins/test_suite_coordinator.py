@@ -0,0 +1,198 @@
+"""Tests for the agent-system shared test-suite coordinator.
+
+Verifies that the tree key follows HEAD and dirty/untracked file contents,
+that concurrent callers on the same tree share one run, that results are
+replayed until the tree changes, and that timeouts are not stored.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from tests.conftest import suite_coordinator
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(suite_coordinator, "STATE_DIR", str(tmp_path / "state"))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "t")
+    (root / "a.py").write_text("x = 1\n")
+    git("add", "a.py")
+    git("commit", "-qm", "init")
+    return root, git
+
+
+def counting_cmd(tmp_path, delay: float = 0.0, code: int = 0) -> list[str]:
+    """A test command that appends a line to runs.log each time it runs."""
+    log = tmp_path / "runs.log"
+    script = (
+        "import sys, time; "
+        f"open({str(log)!r}, 'a').write('run\\n'); "
+        f"time.sleep({delay}); print('output'); sys.exit({code})"
+    )
+    return [sys.executable, "-c", script]
+
+
+def run_count(tmp_path) -> int:
+    log = tmp_path / "runs.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+# ---------------------------------------------------------------------------
+# 1. Tree key
+# ---------------------------------------------------------------------------
+
+
+class TestTreeKey:
+    def test_stable_for_same_tree(self, repo) -> None:
+        root, _ = repo
+        assert suite_coordinator.tree_key(str(root), ["t"]) == (
+            suite_coordinator.tree_key(str(root), ["t"])
+        )
+
+    def test_dirty_edit_changes_key(self, repo) -> None:
+        root, _ = repo
+        before = suite_coordinator.tree_key(str(root), ["t"])
+        (root / "a.py").write_text("x = 2\n")
+        after = suite_coordinator.tree_key(str(root), ["t"])
+        (root / "a.py").write_text("x = 3\n")
+        assert len({before, after, suite_coordinator.tree_key(str(root), ["t"])}) == 3
+
+    def test_untracked_file_changes_key(self, repo) -> None:
+        root, _ = repo
+        before = suite_coordinator.tree_key(str(root), ["t"])
+        (root / "new.py").write_text("")
+        assert suite_coordinator.tree_key(str(root), ["t"]) != before
+
+    def test_commit_changes_key(self, repo) -> None:
+        root, git = repo
+        (root / "a.py").write_text("x = 2\n")
+        dirty = suite_coordinator.tree_key(str(root), ["t"])
+        git("commit", "-qam", "two")
+        assert suite_coordinator.tree_key(str(root), ["t"]) != dirty
+
+    def test_command_part_of_key(self, repo) -> None:
+        root, _ = repo
+        assert suite_coordinator.tree_key(str(root), ["a"]) != (
+            suite_coordinator.tree_key(str(root), ["b"])
+        )
+
+    def test_not_a_repo(self, tmp_path) -> None:
+        assert suite_coordinator.tree_key(str(tmp_path), ["t"]) is None
+
+
+# ---------------------------------------------------------------------------
+# 2. Coordinated runs
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    def test_result_reused_for_same_tree(self, repo, tmp_path) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path, code=1)
+        first = suite_coordinator.run(cmd, str(root), timeout=10)
+        second = suite_coordinator.run(cmd, str(root), timeout=10)
+        assert run_count(tmp_path) == 1
+        assert (second.returncode, second.stdout) == (1, "output\n")
+        assert (first.returncode, first.stdout) == (second.returncode, second.stdout)
+
+    def test_edit_triggers_new_run(self, repo, tmp_path) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path)
+        suite_coordinator.run(cmd, str(root), timeout=10)
+        (root / "a.py").write_text("x = 2\n")
+        suite_coordinator.run(cmd, str(root), timeout=10)
+        assert run_count(tmp_path) == 2
+
+    def test_concurrent_callers_share_one_run(self, repo, tmp_path) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path, delay=0.5)
+        results = []
+
+        def _call():
+            results.append(suite_coordinator.run(cmd, str(root), timeout=10))
+
+        threads = [threading.Thread(target=_call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert run_count(tmp_path) == 1
+        assert [r.returncode for r in results] == [0, 0, 0]
+
+    def test_waiter_times_out(self, repo, tmp_path) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path, delay=1.0)
+        runner = threading.Thread(
+            target=suite_coordinator.run, args=(cmd, str(root), 10)
+        )
+        runner.start()
+        while run_count(tmp_path) == 0:
+            time.sleep(0.01)
+        with pytest.raises(subprocess.TimeoutExpired):
+            suite_coordinator.run(cmd, str(root), timeout=0.2)
+        runner.join()
+
+    def test_timeout_not_stored(self, repo, tmp_path) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path, delay=1.0)
+        with pytest.raises(subprocess.TimeoutExpired):
+            suite_coordinator.run(cmd, str(root), timeout=0.2)
+        with pytest.raises(subprocess.TimeoutExpired):
+            suite_coordinator.run(cmd, str(root), timeout=0.2)
+        assert run_count(tmp_path) == 2
+
+    def test_expired_result_rerun(self, repo, tmp_path, monkeypatch) -> None:
+        root, _ = repo
+        cmd = counting_cmd(tmp_path)
+        suite_coordinator.run(cmd, str(root), timeout=10)
+        monkeypatch.setattr(suite_coordinator, "RESULT_TTL", -1)
+        suite_coordinator.run(cmd, str(root), timeout=10)
+        assert run_count(tmp_path) == 2
+
+    def test_outside_git_runs_directly(self, tmp_path) -> None:
+        cmd = counting_cmd(tmp_path)
+        suite_coordinator.run(cmd, str(tmp_path), timeout=10)
+        suite_coordinator.run(cmd, str(tmp_path), timeout=10)
+        assert run_count(tmp_path) == 2
+
+    def test_missing_runner_raises(self, repo) -> None:
+        root, _ = repo
+        with pytest.raises(FileNotFoundError):
+            suite_coordinator.run(["no-such-test-runner"], str(root), timeout=5)
+
+    def test_custom_runner_result_shared(self, repo, tmp_path) -> None:
+        root, _ = repo
+        calls = []
+
+        def runner(cmd, cwd, timeout):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 1, "sharded\n", "")
+
+        cmd = counting_cmd(tmp_path)
+        suite_coordinator.run(cmd, str(root), timeout=10, runner=runner)
+        replayed = suite_coordinator.run(cmd, str(root), timeout=10)
+        assert calls == [cmd]
+        assert run_count(tmp_path) == 0
+        assert (replayed.returncode, replayed.stdout) == (1, "sharded\n")
@@ -0,0 +1,299 @@
+"""Tests for the ticket-workflow ticket linker.
+
+Verifies which issue/PR references are extracted from a prompt, that long
+prompts are searched in bounded slices that stop at MAX_REFS, and, against
+a stand-in for `gh` (fake_gh.py), that tickets are fetched concurrently
+and cached per repository with ETag revalidation.
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import ticket_linker
+
+FAKE_GH = Path(__file__).parent / "fake_gh.py"
+
+LOG_LINE = "2024-05-01 12:00:00 ERROR worker-3 request failed id=abc123\n"
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(ticket_linker, "CACHE_DIR", str(cache_dir))
+    monkeypatch.delenv("GH_REPO", raising=False)
+
+
+class FakeGh:
+    """Issues served by fake_gh.py, and the calls it received."""
+
+    def __init__(self, root: Path) -> None:
+        self.issues_path = root / "issues.json"
+        self.log_path = root / "gh.log"
+        self.issues: dict[str, dict] = {}
+
+    def set_issue(self, number: int, etag: str, **fields) -> None:
+        self.issues[str(number)] = {"etag": etag, "state": "open", **fields}
+        self.issues_path.write_text(json.dumps(self.issues))
+
+    def calls(self) -> list[dict]:
+        if not self.log_path.exists():
+            return []
+        return [json.loads(line) for line in self.log_path.read_text().splitlines()]
+
+
+@pytest.fixture
+def gh(tmp_path, monkeypatch) -> FakeGh:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "gh"
+    script.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_GH}" "$@"\n')
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    fake = FakeGh(tmp_path)
+    monkeypatch.setenv("FAKE_GH_ISSUES", str(fake.issues_path))
+    monkeypatch.setenv("FAKE_GH_LOG", str(fake.log_path))
+    fake.set_issue(12, '"a1"', title="Crash on start", body="Steps", labels=[])
+    fake.set_issue(7, '"b1"', title="Add dark mode", body="", labels=[{"name": "ui"}])
+    fake.set_issue(30, '"c1"', title="Flaky test", body="See CI", labels=[])
+    return fake
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(
+        ["git", "remote", "add", "origin", "https://github.com/o/r.git"],
+        cwd=root,
+        check=True,
+    )
+    return root
+
+
+def run_main(prompt: str, cwd) -> str:
+    """Run main() for a prompt in cwd, return the injected context or ""."""
+    payload = json.dumps({"prompt": prompt, "cwd": str(cwd)})
+    stdout = io.StringIO()
+    with patch("sys.stdin", io.StringIO(payload)), patch("sys.stdout", stdout):
+        with pytest.raises(SystemExit) as exc:
+            ticket_linker.main()
+    assert (exc.value.code or 0) == 0
+    if not stdout.getvalue():
+        return ""
+    return json.loads(stdout.getvalue())["hookSpecificOutput"]["additionalContext"]
+
+
+# ---------------------------------------------------------------------------
+# 1. References
+# ---------------------------------------------------------------------------
+
+
+class TestExtractRefs:
+    def test_short_refs(self) -> None:
+        assert ticket_linker.extract_refs("fix #12 and #7, see #12") == [12, 7]
+
+    def test_url_refs(self) -> None:
+        prompt = "https://github.com/o/r/pull/42 and github.com/o/r/issues/9"
+        assert ticket_linker.extract_refs(prompt) == [42, 9]
+
+    def test_short_refs_before_url_refs(self) -> None:
+        prompt = "github.com/o/r/issues/5 then #6"
+        assert ticket_linker.extract_refs(prompt) == [6, 5]
+
+    def test_not_refs(self) -> None:
+        assert ticket_linker.extract_refs("color: #fff; a#1 /#2 #0") == []
+
+    def test_capped(self) -> None:
+        assert ticket_linker.extract_refs("#1 #2 #3 #4 #5") == [1, 2, 3]
+
+
+# ---------------------------------------------------------------------------
+# 2. Long prompts
+# ---------------------------------------------------------------------------
+
+
+class TestLongPrompt:
+    def test_spans_bounded(self) -> None:
+        spans = ticket_linker._scan_spans(2_000_000)
+        assert spans[0] == (0, ticket_linker.SCAN_HEAD)
+        assert spans[-1] == (2_000_000 - ticket_linker.SCAN_TAIL, 2_000_000)
+        assert len(spans) == ticket_linker.SCAN_SAMPLES + 2
+        assert all(a[1] < b[0] for a, b in zip(spans, spans[1:]))
+
+    def test_head_and_tail_searched(self) -> None:
+        prompt = "see #11\n" + LOG_LINE * 40_000 + "and #22"
+        assert ticket_linker.extract_refs(prompt) == [11, 22]
+
+    def test_unsampled_middle_ignored(self) -> None:
+        prompt = LOG_LINE * 1_000 + "#33\n" + LOG_LINE * 40_000
+        assert ticket_linker.extract_refs(prompt) == []
+
+    def test_number_cut_at_slice_edge(self, monkeypatch) -> None:
+        monkeypatch.setattr(ticket_linker, "SCAN_HEAD", 4)
+        prompt = "x #1234 " + LOG_LINE * 2_000
+        assert ticket_linker.extract_refs(prompt) == []
+
+    def test_lookbehind_sees_before_slice(self, monkeypatch) -> None:
+        monkeypatch.setattr(ticket_linker, "SCAN_TAIL", 2)
+        prompt = LOG_LINE * 2_000 + "a#5"
+        assert ticket_linker.extract_refs(prompt) == []
+        assert ticket_linker.extract_refs(prompt.replace("a#5", " #5")) == [5]
+
+    def test_memory_independent_of_size(self) -> None:
+        peaks = []
+        for lines in (40_000, 160_000):
+            prompt = "#1 " + LOG_LINE * lines
+            tracemalloc.start()
+            ticket_linker.extract_refs(prompt)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] < 2 * peaks[0] + 4096 < len(prompt) / 4
+
+
+# ---------------------------------------------------------------------------
+# 3. Fetching
+# ---------------------------------------------------------------------------
+
+
+class TestFetch:
+    def test_tickets_rendered(self, gh, repo) -> None:
+        context = run_main("compare #12 with #7", repo)
+        assert context == (
+            "[Ticket #12] Crash on start\nState: OPEN | Labels: none\nSteps"
+            "\n\n---\n\n"
+            "[Ticket #7] Add dark mode\nState: OPEN | Labels: ui"
+        )
+        assert {call["cwd"] for call in gh.calls()} == {str(repo)}
+
+    def test_body_truncated(self, gh, repo, monkeypatch) -> None:
+        monkeypatch.setattr(ticket_linker, "BODY_CHAR_CAP", 5)
+        gh.set_issue(12, '"a2"', title="Long", body="abcdefgh", labels=[])
+        assert run_main("#12", repo).endswith("\nabcde\n...(truncated)")
+
+    def test_missing_ticket_skipped(self, gh, repo) -> None:
+        assert run_main("#99 and #7", repo).startswith("[Ticket #7]")
+
+    def test_gh_not_installed(self, repo, monkeypatch) -> None:
+        monkeypatch.setenv("PATH", str(repo))
+        assert run_main("#12", repo) == ""
+
+    def test_fetched_concurrently(self, gh, repo) -> None:
+        # Each fetch waits for the other two; serial fetches would time out
+        barrier = threading.Barrier(3, timeout=5)
+        original = ticket_linker.fetch_ticket
+
+        def waiting(number, cwd, etag=None):
+            barrier.wait()
+            return original(number, cwd, etag)
+
+        with patch.object(ticket_linker, "fetch_ticket", waiting):
+            assert run_main("#12 #7 #30", repo).count("[Ticket #") == 3
+
+    @pytest.mark.parametrize(
+        "stdout",
+        ["", "not http\n\n{}", "HTTP/2.0 200 OK\n\n[1, 2]", "HTTP/2.0 200 OK\n\n{"],
+    )
+    def test_bad_response(self, stdout, repo) -> None:
+        result = subprocess.CompletedProcess([], 0, stdout=stdout, stderr="")
+        with patch.object(ticket_linker.subprocess, "run", return_value=result):
+            assert ticket_linker.fetch_ticket(1, str(repo)) is None
+
+
+# ---------------------------------------------------------------------------
+# 4. Cache
+# ---------------------------------------------------------------------------
+
+
+class TestCache:
+    def test_repeat_mentions_not_fetched(self, gh, repo) -> None:
+        first = run_main("#12 and #7", repo)
+        assert run_main("#7, #12", repo).count("[Ticket #") == 2
+        assert run_main("#12 and #7", repo) == first
+        assert len(gh.calls()) == 2
+
+    def test_only_new_refs_fetched(self, gh, repo) -> None:
+        run_main("#12", repo)
+        run_main("#12 #30", repo)
+        assert [call["args"][2] for call in gh.calls()] == [
+            "repos/{owner}/{repo}/issues/12",
+            "repos/{owner}/{repo}/issues/30",
+        ]
+
+    def test_expired_revalidated(self, gh, repo, monkeypatch) -> None:
+        first = run_main("#12", repo)
+        monkeypatch.setattr(ticket_linker, "CACHE_TTL", 0)
+        assert run_main("#12", repo) == first
+        assert gh.calls()[-1]["args"][-2:] == ["-H", 'If-None-Match: "a1"']
+
+    def test_changed_ticket_refetched(self, gh, repo, monkeypatch) -> None:
+        run_main("#12", repo)
+        monkeypatch.setattr(ticket_linker, "CACHE_TTL", 0)
+        gh.set_issue(12, '"a2"', title="Crash on start (fixed)", labels=[])
+        assert run_main("#12", repo).startswith("[Ticket #12] Crash on start (fixed)")
+        assert run_main("#12", repo).startswith("[Ticket #12] Crash on start (fixed)")
+
+    def test_cached_copy_used_when_gh_fails(self, gh, repo, monkeypatch) -> None:
+        first = run_main("#12", repo)
+        monkeypatch.setattr(ticket_linker, "CACHE_TTL", 0)
+        monkeypatch.setattr(ticket_linker, "GH_CMD_TIMEOUT", 0.5)
+        monkeypatch.setenv("FAKE_GH_DELAY", "2")
+        assert run_main("#12", repo) == first
+
+    def test_old_entries_dropped(self, gh, repo, monkeypatch) -> None:
+        run_main("#12", repo)
+        monkeypatch.setattr(ticket_linker, "CACHE_MAX_AGE", 0)
+        run_main("#7", repo)
+        with open(ticket_linker._cache_path()) as f:
+            assert json.load(f)["tickets"] == {}
+
+    def test_corrupt_cache_ignored(self, gh, repo) -> None:
+        with open(ticket_linker._cache_path(), "w") as f:
+            f.write("{not json")
+        assert run_main("#12", repo).startswith("[Ticket #12]")
+
+    def test_keyed_by_repository(self, gh, repo, tmp_path, monkeypatch) -> None:
+        clone = tmp_path / "clone"
+        subprocess.run(["git", "clone", "-q", str(repo), str(clone)], check=True)
+        subprocess.run(
+            ["git", "remote", "set-url", "origin", "https://github.com/o/r.git"],
+            cwd=clone,
+            check=True,
+        )
+        run_main("#12", repo)
+        run_main("#12", clone / ".")
+        assert len(gh.calls()) == 1
+        monkeypatch.setenv("GH_REPO", "o/other")
+        run_main("#12", repo)
+        assert len(gh.calls()) == 2
+
+    def test_worktree_remotes(self, repo, tmp_path) -> None:
+        env = {**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t"}
+        env.update(GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@t")
+        subprocess.run(
+            ["git", "commit", "-q", "--allow-empty", "-m", "x"],
+            cwd=repo,
+            check=True,
+            env=env,
+        )
+        worktree = tmp_path / "wt"
+        subprocess.run(
+            ["git", "worktree", "add", "-q", str(worktree)], cwd=repo, check=True
+        )
+        assert ticket_linker.repo_key(str(worktree)) == "https://github.com/o/r.git"
+        assert ticket_linker.repo_key(str(tmp_path)) == str(tmp_path)
@@ -0,0 +1,280 @@
+"""Tests for the session-context TODO/FIXME index and harvester.
+
+Verifies that markers are counted and cached per file, that only files
+whose mtime or size changed are re-read, that git's ignore rules and the
+walk's skipped directories keep build output out, that the scan budget
+leaves files for the next session, and the harvester's summary.
+"""
+
+import io
+import json
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import todo_harvester, todo_index
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    monkeypatch.setattr(todo_index, "CACHE_DIR", str(cache_dir))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "tests").mkdir()
+    (root / "src" / "app.py").write_text("x = 1  # TODO: tidy\n# FIXME later\n")
+    (root / "src" / "util.py").write_text("def f():\n    pass  # HACK\n")
+    (root / "tests" / "test_app.py").write_text("# XXX flaky\n")
+    (root / "README.md").write_text("TODO: not a source file\n")
+    return root
+
+
+@pytest.fixture
+def scans(monkeypatch) -> list[str]:
+    """Paths passed to scan_file, in order."""
+    seen: list[str] = []
+    original = todo_index.scan_file
+
+    def recording(path):
+        seen.append(os.path.basename(path))
+        return original(path)
+
+    monkeypatch.setattr(todo_index, "scan_file", recording)
+    return seen
+
+
+def git(root, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+def touch_later(path) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def run_harvester(cwd) -> tuple[int, str]:
+    """Run main() in cwd, return (exit_code, stdout_text)."""
+    stdout = io.StringIO()
+    with (
+        patch("sys.stdin", io.StringIO("{}")),
+        patch("sys.stdout", stdout),
+        patch("os.getcwd", return_value=str(cwd)),
+    ):
+        with pytest.raises(SystemExit) as exc:
+            todo_harvester.main()
+    return (exc.value.code or 0, stdout.getvalue())
+
+
+# ---------------------------------------------------------------------------
+# 1. Scanning
+# ---------------------------------------------------------------------------
+
+
+class TestScan:
+    def test_counts_markers_in_source_files(self, project) -> None:
+        index = todo_index.load(str(project))
+        assert index.total == 4
+        assert index.file_count == 3
+        assert index.pending == 0
+
+    def test_marker_lines(self, project) -> None:
+        count, items = todo_index.scan_file(str(project / "src" / "app.py"))
+        assert count == 2
+        assert items == [[1, "x = 1  # TODO: tidy"], [2, "# FIXME later"]]
+
+    def test_word_boundary(self, tmp_path) -> None:
+        path = tmp_path / "a.py"
+        path.write_text("TODOS = []\nMY_FIXMES = 1\n")
+        assert todo_index.scan_file(str(path)) == (0, [])
+
+    def test_large_file_skipped(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(todo_index, "MAX_FILE_BYTES", 10)
+        path = tmp_path / "a.py"
+        path.write_text("# TODO: this line is longer than ten bytes\n")
+        assert todo_index.scan_file(str(path)) == (0, [])
+
+    def test_items_per_file_capped(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setattr(todo_index, "MAX_PER_FILE", 2)
+        path = tmp_path / "a.py"
+        path.write_text("# TODO\n" * 5)
+        count, items = todo_index.scan_file(str(path))
+        assert count == 5
+        assert len(items) == 2
+
+
+# ---------------------------------------------------------------------------
+# 2. Incremental updates
+# ---------------------------------------------------------------------------
+
+
+class TestIncremental:
+    def test_unchanged_files_not_reread(self, project, scans) -> None:
+        todo_index.load(str(project))
+        scans.clear()
+        index = todo_index.load(str(project))
+        assert scans == []
+        assert index.total == 4
+
+    def test_edited_file_reread(self, project, scans) -> None:
+        todo_index.load(str(project))
+        scans.clear()
+        path = project / "src" / "util.py"
+        path.write_text("pass\n")
+        touch_later(path)
+        index = todo_index.load(str(project))
+        assert scans == ["util.py"]
+        assert index.total == 3
+
+    def test_deleted_file_dropped(self, project) -> None:
+        todo_index.load(str(project))
+        os.unlink(project / "tests" / "test_app.py")
+        assert todo_index.load(str(project)).total == 3
+        assert todo_index.load(str(project)).total == 3
+
+    def test_corrupt_cache_rebuilt(self, project) -> None:
+        with open(todo_index.cache_path(str(project)), "w") as f:
+            f.write("{not json")
+        assert todo_index.load(str(project)).total == 4
+
+    def test_cache_shared_across_paths_to_root(self, project, scans) -> None:
+        todo_index.load(str(project))
+        scans.clear()
+        todo_index.load(str(project / "src" / ".."))
+        assert scans == []
+
+    def test_stored_in_git_dir(self, project, tmp_path) -> None:
+        git(project, "init", "-q")
+        todo_index.load(str(project / "src"))
+        path = todo_index.cache_path(str(project / "src"))
+        assert os.path.dirname(path) == str(project / ".git")
+        assert os.path.exists(path)
+        assert not list((tmp_path / "cache").iterdir())
+
+    def test_outside_git_uses_cache_dir(self, project, tmp_path) -> None:
+        todo_index.load(str(project))
+        assert os.path.dirname(todo_index.cache_path(str(project))) == str(
+            tmp_path / "cache"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 3. Listing
+# ---------------------------------------------------------------------------
+
+
+class TestListing:
+    def test_git_ignored_files_skipped(self, project) -> None:
+        git(project, "init", "-q")
+        (project / ".gitignore").write_text("generated/\n")
+        (project / "generated").mkdir()
+        (project / "generated" / "out.py").write_text("# TODO generated\n")
+        files = todo_index.list_files(str(project))
+        assert os.path.join("generated", "out.py") not in files
+        # Untracked but not ignored files are still listed
+        assert os.path.join("src", "app.py") in files
+
+    def test_walk_skips_vendor_dirs(self, project) -> None:
+        (project / "node_modules" / "pkg").mkdir(parents=True)
+        (project / "node_modules" / "pkg" / "index.js").write_text("// TODO\n")
+        (project / ".cache").mkdir()
+        (project / ".cache" / "x.py").write_text("# TODO\n")
+        with patch.object(todo_index, "_git_files", return_value=None):
+            files = todo_index.list_files(str(project))
+        assert sorted(files) == [
+            os.path.join("src", "app.py"),
+            os.path.join("src", "util.py"),
+            os.path.join("tests", "test_app.py"),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# 4. Scan budget
+# ---------------------------------------------------------------------------
+
+
+class TestBudget:
+    def test_unread_files_left_pending(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(todo_index, "SCAN_BUDGET", -1)
+        index = todo_index.load(str(project))
+        assert index.pending == 3
+        assert index.total == 0
+
+    def test_next_session_picks_up_pending(self, project, monkeypatch) -> None:
+        monkeypatch.setattr(todo_index, "SCAN_BUDGET", -1)
+        todo_index.load(str(project))
+        monkeypatch.setattr(todo_index, "SCAN_BUDGET", 3.0)
+        index = todo_index.load(str(project))
+        assert index.pending == 0
+        assert index.total == 4
+
+    def test_stale_entry_reported_until_reread(self, project, monkeypatch) -> None:
+        todo_index.load(str(project))
+        path = project / "src" / "util.py"
+        path.write_text("pass\n")
+        touch_later(path)
+        monkeypatch.setattr(todo_index, "SCAN_BUDGET", -1)
+        index = todo_index.load(str(project))
+        assert index.pending == 1
+        assert index.total == 4
+
+
+# ---------------------------------------------------------------------------
+# 5. Reporting
+# ---------------------------------------------------------------------------
+
+
+class TestReport:
+    def test_by_directory(self, project) -> None:
+        (project / "setup.py").write_text("# TODO\n")
+        index = todo_index.load(str(project))
+        assert index.by_directory() == [("src", 3), (".", 1), ("tests", 1)]
+
+    def test_top_most_recently_modified_first(self, project) -> None:
+        touch_later(project / "tests" / "test_app.py")
+        index = todo_index.load(str(project))
+        top = index.top(2)
+        assert top[0] == (os.path.join("tests", "test_app.py"), 1, "# XXX flaky")
+        assert len(top) == 2
+
+
+# ---------------------------------------------------------------------------
+# 6. Harvester
+# ---------------------------------------------------------------------------
+
+
+class TestHarvester:
+    def test_summary(self, project) -> None:
+        code, out = run_harvester(project)
+        assert code == 0
+        context = json.loads(out)["hookSpecificOutput"]["additionalContext"]
+        lines = context.splitlines()
+        assert lines[0] == "[Tech Debt] 4 TODO/FIXME items found across 3 files"
+        assert lines[1] == "By directory: src 3, tests 1"
+        assert lines[2] == "Top items:"
+        assert f"  {os.path.join('src', 'app.py')}:1: x = 1  # TODO: tidy" in lines
+
+    def test_no_markers_silent(self, tmp_path) -> None:
+        (tmp_path / "a.py").write_text("x = 1\n")
+        assert run_harvester(tmp_path) == (0, "")
+
+    def test_pending_noted(self, project, monkeypatch) -> None:
+        todo_index.load(str(project))
+        path = project / "src" / "util.py"
+        path.write_text("# TODO: new\n")
+        touch_later(path)
+        monkeypatch.setattr(todo_index, "SCAN_BUDGET", -1)
+        _, out = run_harvester(project)
+        context = json.loads(out)["hookSpecificOutput"]["additionalContext"]
+        assert "(1 changed files not scanned yet)" in context.splitlines()[0]
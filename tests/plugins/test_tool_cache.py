@@ -0,0 +1,172 @@
+"""Tests for the auto-code-quality tool resolution cache.
+
+Verifies that which() and find_local() results are cached across calls and
+processes, and are invalidated when PATH directories, lockfiles or
+node_modules/.bin change.
+"""
+
+import os
+import stat
+
+import pytest
+
+from tests.conftest import tool_cache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point the cache at a temp file and start each test empty."""
+    monkeypatch.setattr(tool_cache, "CACHE_PATH", str(tmp_path / "tools.json"))
+    tool_cache.clear()
+    yield
+    tool_cache.clear()
+
+
+def make_exe(path) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def bump_mtime(path) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def count_calls(monkeypatch, module, attr) -> list:
+    """Wrap module.attr so each call is recorded."""
+    calls = []
+    original = getattr(module, attr)
+
+    def _wrapped(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, attr, _wrapped)
+    return calls
+
+
+# ---------------------------------------------------------------------------
+# 1. PATH lookups
+# ---------------------------------------------------------------------------
+
+
+class TestWhich:
+    def test_found_and_cached(self, tmp_path, monkeypatch) -> None:
+        bin_dir = tmp_path / "bin"
+        tool = make_exe(bin_dir / "mytool")
+        monkeypatch.setenv("PATH", str(bin_dir))
+        calls = count_calls(monkeypatch, tool_cache.shutil, "which")
+
+        assert tool_cache.which("mytool") == tool
+        assert tool_cache.which("mytool") == tool
+        assert len(calls) == 1
+
+    def test_missing_tool_cached(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("PATH", str(tmp_path))
+        calls = count_calls(monkeypatch, tool_cache.shutil, "which")
+
+        assert tool_cache.which("nope") is None
+        assert tool_cache.which("nope") is None
+        assert len(calls) == 1
+
+    def test_path_dir_change_invalidates(self, tmp_path, monkeypatch) -> None:
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        monkeypatch.setenv("PATH", str(bin_dir))
+        assert tool_cache.which("late") is None
+
+        tool = make_exe(bin_dir / "late")
+        bump_mtime(bin_dir)
+        assert tool_cache.which("late") == tool
+
+    def test_path_value_change_invalidates(self, tmp_path, monkeypatch) -> None:
+        tool = make_exe(tmp_path / "b" / "mytool")
+        monkeypatch.setenv("PATH", str(tmp_path / "a"))
+        assert tool_cache.which("mytool") is None
+
+        monkeypatch.setenv("PATH", f"{tmp_path / 'a'}{os.pathsep}{tmp_path / 'b'}")
+        assert tool_cache.which("mytool") == tool
+
+    def test_deleted_binary_not_returned(self, tmp_path, monkeypatch) -> None:
+        bin_dir = tmp_path / "bin"
+        tool = make_exe(bin_dir / "gone")
+        monkeypatch.setenv("PATH", str(bin_dir))
+        assert tool_cache.which("gone") == tool
+
+        st = os.stat(bin_dir)
+        os.unlink(tool)
+        os.utime(bin_dir, ns=(st.st_atime_ns, st.st_mtime_ns))  # same fingerprint
+        assert tool_cache.which("gone") is None
+
+
+# ---------------------------------------------------------------------------
+# 2. Project-local lookups
+# ---------------------------------------------------------------------------
+
+
+class TestFindLocal:
+    @pytest.fixture
+    def project(self, tmp_path):
+        root = tmp_path / "proj"
+        (root / "src" / "deep").mkdir(parents=True)
+        (root / "package.json").write_text("{}")
+        (root / "package-lock.json").write_text("{}")
+        return root
+
+    def test_project_root(self, project) -> None:
+        file_path = str(project / "src" / "deep" / "a.ts")
+        assert tool_cache.project_root(file_path) == str(project)
+
+    def test_found_from_nested_file(self, project) -> None:
+        biome = make_exe(project / "node_modules" / ".bin" / "biome")
+        file_path = str(project / "src" / "deep" / "a.ts")
+        assert tool_cache.find_local(file_path, "biome") == biome
+
+    def test_files_in_project_share_entry(self, project, monkeypatch) -> None:
+        make_exe(project / "node_modules" / ".bin" / "biome")
+        calls = count_calls(monkeypatch, tool_cache, "_walk_up")
+
+        tool_cache.find_local(str(project / "src" / "a.ts"), "biome")
+        tool_cache.find_local(str(project / "src" / "deep" / "b.ts"), "biome")
+        assert len(calls) == 1
+
+    def test_lockfile_change_invalidates(self, project) -> None:
+        file_path = str(project / "src" / "a.ts")
+        assert tool_cache.find_local(file_path, "biome") is None
+
+        biome = make_exe(project / "node_modules" / ".bin" / "biome")
+        bump_mtime(project / "package-lock.json")
+        assert tool_cache.find_local(file_path, "biome") == biome
+
+
+# ---------------------------------------------------------------------------
+# 3. Persistence
+# ---------------------------------------------------------------------------
+
+
+class TestPersistence:
+    def test_survives_process_restart(self, tmp_path, monkeypatch) -> None:
+        bin_dir = tmp_path / "bin"
+        tool = make_exe(bin_dir / "mytool")
+        monkeypatch.setenv("PATH", str(bin_dir))
+        tool_cache.which("mytool")
+        tool_cache.save()
+        assert os.path.isfile(tool_cache.CACHE_PATH)
+
+        tool_cache.clear()  # simulate a fresh hook process
+        calls = count_calls(monkeypatch, tool_cache.shutil, "which")
+        assert tool_cache.which("mytool") == tool
+        assert calls == []
+
+    def test_corrupt_cache_ignored(self, tmp_path, monkeypatch) -> None:
+        with open(tool_cache.CACHE_PATH, "w") as f:
+            f.write("{not json")
+        monkeypatch.setenv("PATH", str(tmp_path))
+        assert tool_cache.which("anything") is None